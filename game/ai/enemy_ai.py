@@ -0,0 +1,334 @@
+"""
+IA del equipo enemigo para BattleScene
+Copia la escena a un BattleSimulator propio, planifica el turno con MCTS y
+devuelve los comandos ya resueltos en formato replay ('m' rutas, 'a' habilidades).
+Todo el trabajo del simulador ocurre en un EventScope aislado: sus listeners de
+energía y sus eventos nunca llegan a las pasivas ni a la UI de la escena.
+Con workers > 0 cada decisión se reparte en un pool de procesos (paralelización
+en la raíz) y el turno avanza desde background_tasks.poll() sin bloquear frames.
+"""
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from game.core.background_tasks import background_tasks
+from game.core.event_system import event_system, EventScope
+from game.core.logger import logger, SILENT
+from game.ai.mcts import MCTSPlanner, best_root_action, merge_root_statistics, resolve_action
+from game.sim.battle_simulator import BattleSimulator, SimAction, greedy_policy
+from game.systems import battle_snapshot
+
+MAX_DECISIONS_PER_TURN = 32  # Red de seguridad: un turno nunca encadena más búsquedas
+MIN_ROUND_MS = 5  # Con menos tiempo restante no se lanza otra ronda: el turno lo acaba la política codiciosa
+
+# Un simulador por proceso worker: se construye una vez en el initializer (como game.sim.batch)
+_worker_simulator = None
+
+
+def _init_search_worker(simulator_kwargs):
+    """Prepara el proceso worker de la IA: sin consola, sin log a archivo y sin historial de eventos"""
+    global _worker_simulator
+    event_system.set_history_enabled(False)
+    logger.log_to_file = False
+    logger.set_level(SILENT)
+    sys.stdout = open(os.devnull, 'w')
+    _worker_simulator = BattleSimulator(**simulator_kwargs)
+
+
+def _search_root(snapshot, team, deadline, seed):
+    """
+    Búsqueda independiente desde la raíz (snapshot portable) hasta deadline (time.time(),
+    comparable entre procesos: el envío y sync_from también gastan el presupuesto).
+    Retorna (estadísticas raíz, partidas)
+    """
+    _worker_simulator.sync_from(snapshot)
+    budget_ms = max(0.0, (deadline - time.time()) * 1000)
+    planner = MCTSPlanner(_worker_simulator, team, budget_ms, seed=seed)
+    planner.plan()
+    return planner.root_statistics(), planner.stats['playouts']
+
+
+class EnemyAI:
+    """Planificador por turnos con presupuesto de tiempo (budget_ms)"""
+    
+    def __init__(self, player_party_ids, enemy_configs, team="enemy", budget_ms=200,
+                 seed=None, grid_size=(10, 8), workers=0):
+        self.team = team
+        self.budget_ms = budget_ms
+        self.seed = seed
+        self.workers = workers  # 0: todo en el hilo principal (plan_turn)
+        self.scope = EventScope()
+        self.last_stats: Dict[str, Any] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._simulator_kwargs = {'player_party_ids': player_party_ids, 'enemy_configs': enemy_configs,
+                                  'seed': seed, 'grid_size': grid_size}
+        with event_system.isolated(self.scope):
+            self.simulator = BattleSimulator(player_party_ids=player_party_ids, enemy_configs=enemy_configs,
+                                             seed=seed, grid_size=grid_size)
+    
+    def plan_turn(self, scene_snapshot, budget_ms=None) -> List[Dict[str, Any]]:
+        """
+        Comandos del turno de self.team para el estado capturado (sin el fin de turno).
+        Las entidades se referencian por índice en el reparto, como en los replays.
+        """
+        from game.sim.replay import ReplayRecorder
+        
+        simulator = self.simulator
+        with event_system.isolated(self.scope):
+            simulator.sync_from(scene_snapshot)
+            planner = MCTSPlanner(simulator, self.team, self.budget_ms if budget_ms is None else budget_ms,
+                                  seed=self.seed)
+            plan = planner.plan()
+            self.last_stats = planner.stats
+            
+            # Se aplica el plan para obtener contextos resueltos (objetivos de cadena, línea...)
+            recorder = ReplayRecorder(None, {}, simulator.roster)
+            simulator.recorder = simulator.movement_system.recorder = recorder
+            previous_level = logger.level
+            try:
+                logger.set_level(SILENT)
+                for action in plan:
+                    simulator.apply_action(action)
+                # Si el presupuesto no alcanzó el fin de turno, el resto lo juega la política codiciosa
+                while not planner.stats['complete'] and simulator.current_team == self.team:
+                    action = greedy_policy(simulator)
+                    if action.kind == SimAction.END_TURN:
+                        break
+                    simulator.apply_action(action)
+            finally:
+                logger.set_level(previous_level)
+                simulator.recorder = simulator.movement_system.recorder = None
+        
+        logger.info("🧠 IA %s: %d acciones, %d partidas en %.0fms (%d nodos)", self.team, len(plan),
+                    self.last_stats['playouts'], self.last_stats['seconds'] * 1000, self.last_stats['nodes'])
+        return [record for record in recorder.records[1:] if record['c'] in ('m', 'a')]
+    
+    def start_turn(self, scene_snapshot, budget_ms=None) -> Future:
+        """
+        Versión asíncrona de plan_turn: el futuro se resuelve con los comandos.
+        budget_ms es el presupuesto del turno completo: con workers cada decisión
+        recibe el tiempo que queda hasta el plazo del turno y la búsqueda avanza en
+        background_tasks.poll(); sin workers se resuelve ya.
+        """
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        if not self.workers:
+            future = Future()
+            future.set_result(self.plan_turn(scene_snapshot, budget_ms))
+            return future
+        
+        search = _ParallelTurnSearch(self, scene_snapshot, budget_ms)
+        search.next_decision()
+        return search.result
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: el juego tiene hilos vivos (logger) y pygame inicializado; fork los heredaría
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_search_worker,
+                                                 initargs=(self._simulator_kwargs,),
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+    
+    def close(self):
+        """Cierra el pool de procesos sin esperar búsquedas pendientes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    @staticmethod
+    def apply_command(scene, command) -> bool:
+        """Ejecuta un comando planificado sobre las entidades de la escena (mismo orden de reparto)"""
+        entities = scene.entities
+        entity = entities[command['u']]
+        if entity.stats['current_hp'] <= 0:
+            return False
+        
+        if command['c'] == 'm':
+            movement = scene.movement_system
+            if not movement.start_movement(entity, entities):
+                return False
+            movement.movement_path = [tuple(cell) for cell in command['p']]
+            movement.dash_targets = [entities[i] for i in command.get('d', ())]
+            return movement.execute_movement()
+        
+        ability_key = command['k']
+        target = entities[command['t']] if 't' in command else None
+        target_position = tuple(command['p']) if 'p' in command else None
+        context = scene.create_ability_context(entity, target, target_position, list(entities))
+        context.entities = [entities[i] for i in command.get('es', ())]
+        for key, value in command.get('x', {}).items():
+            context.extra_data[key] = tuple(value) if isinstance(value, list) else value
+        if context.extra_data.get('effect_system') is None:
+            context.extra_data['effect_system'] = scene.effect_system
+        
+        if scene.recorder is not None:
+            scene.recorder.record_ability(entity, ability_key, context)
+        return entity.perform_action(ability_key, context)
+
+
+class _ParallelTurnSearch:
+    """
+    Un turno con paralelización en la raíz: en cada decisión todos los workers
+    buscan desde el mismo estado con semillas distintas, se suman las visitas
+    de cada acción raíz y la más visitada se aplica al simulador local.
+    Todas las rondas comparten un plazo (inicio + budget_ms): cada una recibe lo
+    que queda y, agotado, el resto del turno lo juega la política codiciosa.
+    Los callbacks llegan por background_tasks, siempre en el hilo principal.
+    """
+    
+    def __init__(self, ai: EnemyAI, scene_snapshot, budget_ms):
+        from game.sim.replay import ReplayRecorder
+        
+        self.ai = ai
+        self.budget_ms = budget_ms
+        self.result = Future()
+        self.decisions = 0
+        self.playouts = 0
+        self.start = time.perf_counter()
+        self.deadline = time.time() + budget_ms / 1000.0  # Reloj de pared: lo comparan también los workers
+        self._round = []
+        self._waiting = 0
+        
+        simulator = ai.simulator
+        with event_system.isolated(ai.scope):
+            simulator.sync_from(scene_snapshot)
+        self.recorder = ReplayRecorder(None, {}, simulator.roster)
+    
+    def next_decision(self):
+        ai = self.ai
+        simulator = ai.simulator
+        if (simulator.is_over() or simulator.current_team != ai.team
+                or self.decisions >= MAX_DECISIONS_PER_TURN):
+            self._finish()
+            return
+        
+        remaining_ms = (self.deadline - time.time()) * 1000
+        if remaining_ms < MIN_ROUND_MS:
+            self._finish_greedy()
+            return
+        
+        snapshot = battle_snapshot.portable(simulator.snapshot(), simulator.roster)
+        executor = ai._get_executor()
+        self._round = []
+        self._waiting = ai.workers
+        for i in range(ai.workers):
+            seed = None if ai.seed is None else ai.seed + self.decisions * ai.workers + i
+            future = executor.submit(_search_root, snapshot, ai.team, self.deadline, seed)
+            background_tasks.watch(future, self._on_worker_done)
+    
+    def _on_worker_done(self, future):
+        if self.result.done():
+            return
+        if future.cancelled() or future.exception() is not None:
+            self.result.set_exception(future.exception() if not future.cancelled()
+                                      else RuntimeError("Búsqueda de la IA cancelada"))
+            return
+        
+        statistics, playouts = future.result()
+        self._round.append(statistics)
+        self.playouts += playouts
+        self._waiting -= 1
+        if self._waiting:
+            return
+        
+        key = best_root_action(merge_root_statistics(self._round))
+        if key is None:  # Ningún worker llegó a jugar una partida antes del plazo
+            self._finish_greedy()
+            return
+        if key[0] == SimAction.END_TURN:
+            self._finish()
+            return
+        
+        self.decisions += 1
+        if self._apply(lambda simulator: resolve_action(key, simulator.roster)):
+            self.next_decision()
+        else:
+            self._finish()
+    
+    def _apply(self, choose_action):
+        """Aplica al simulador local (grabando el comando) la acción que elige choose_action(simulator)"""
+        simulator = self.ai.simulator
+        previous_level = logger.level
+        with event_system.isolated(self.ai.scope):
+            simulator.recorder = simulator.movement_system.recorder = self.recorder
+            try:
+                logger.set_level(SILENT)
+                return simulator.apply_action(choose_action(simulator))
+            finally:
+                logger.set_level(previous_level)
+                simulator.recorder = simulator.movement_system.recorder = None
+    
+    def _finish_greedy(self):
+        """Plazo agotado: el resto del turno con la política codiciosa (como plan_turn), sin más rondas"""
+        simulator = self.ai.simulator
+        for _ in range(MAX_DECISIONS_PER_TURN):
+            if simulator.is_over() or simulator.current_team != self.ai.team:
+                break
+            action = greedy_policy(simulator)
+            if action.kind == SimAction.END_TURN or not self._apply(lambda simulator: action):
+                break
+        self._finish()
+    
+    def _finish(self):
+        elapsed = time.perf_counter() - self.start
+        self.ai.last_stats = {
+            'playouts': self.playouts,
+            'seconds': elapsed,
+            'playouts_per_second': self.playouts / elapsed if elapsed > 0 else 0.0,
+            'decisions': self.decisions,
+            'workers': self.ai.workers
+        }
+        logger.info("🧠 IA %s: %d decisiones, %d partidas en %d procesos (%.0fms)", self.ai.team,
+                    self.decisions, self.playouts, self.ai.workers, elapsed * 1000)
+        self.result.set_result([record for record in self.recorder.records[1:] if record['c'] in ('m', 'a')])
+
+
+def benchmark(workers=(0, 2, 4), budget_ms=100, seed=0) -> List[Dict[str, Any]]:
+    """
+    Un turno enemigo por configuración mientras un bucle de 60 FPS simulado
+    sigue girando: mide partidas totales y el frame más largo del bucle
+    """
+    logger.set_level(SILENT)
+    main = BattleSimulator(seed=seed)
+    while main.current_team != "enemy":
+        main.step()
+    snapshot = battle_snapshot.portable(main.snapshot(), main.roster)  # Hay muertos: índices por reparto
+    
+    results = []
+    for count in workers:
+        ai = EnemyAI(main.player_party_ids, main.enemy_configs, budget_ms=budget_ms, seed=seed, workers=count)
+        if count:
+            # El arranque del pool no cuenta: en el juego ocurre una vez por partida
+            ai._get_executor().submit(int).result()
+        
+        done = []
+        frame_start = start = time.perf_counter()
+        longest_frame = 0.0
+        background_tasks.watch(ai.start_turn(snapshot), done.append)
+        while not done:
+            background_tasks.poll()
+            time.sleep(1 / 60)
+            now = time.perf_counter()
+            longest_frame = max(longest_frame, now - frame_start)
+            frame_start = now
+        
+        results.append(dict(ai.last_stats, workers=count, commands=len(done[0].result()),
+                            wall_seconds=time.perf_counter() - start, longest_frame_ms=longest_frame * 1000))
+        ai.close()
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark de la IA enemiga en paralelo")
+    parser.add_argument("--workers", default="0,2,4", help="Configuraciones a comparar (0 = hilo principal)")
+    parser.add_argument("--budget", type=int, default=100, help="ms por turno")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    for entry in benchmark(tuple(int(w) for w in args.workers.split(",")), args.budget, args.seed):
+        print(f"🧠 {entry['workers']} procesos → {entry['playouts']:>5} partidas, {entry['commands']} comandos "
+              f"en {entry['wall_seconds']:.2f}s | frame más largo {entry['longest_frame_ms']:.0f}ms")
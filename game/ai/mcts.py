@@ -0,0 +1,355 @@
+"""
+IA de enemigos: Monte Carlo Tree Search con presupuesto de tiempo
+El árbol solo contiene decisiones del equipo que planifica dentro de su turno
+(mover, habilidad, fin de turno). Cada iteración restaura el snapshot raíz del
+simulador headless, baja por UCT, expande una acción y juega el resto con la
+política codiciosa durante unos turnos. Cuanto más presupuesto, más partidas.
+Benchmark: python -m game.ai.mcts
+"""
+import math
+import random
+import time
+from typing import Dict, List, Optional, Any, Tuple
+
+from game.core.logger import logger, SILENT
+from game.entities.entity_store import entity_store
+from game.sim.battle_simulator import BattleSimulator, SimAction, greedy_policy
+
+MAX_ROLLOUT_ACTIONS = 400  # Red de seguridad: una partida simulada nunca se alarga más
+
+
+class MCTSNode:
+    """Nodo del árbol: la acción que llevó hasta él y sus estadísticas"""
+    
+    __slots__ = ('parent', 'action', 'children', 'untried', 'visits', 'value', 'terminal')
+    
+    def __init__(self, parent=None, action=None, terminal=False):
+        self.parent = parent
+        self.action = action
+        self.children = []
+        self.untried = None  # Se calcula la primera vez que se visita el nodo
+        self.visits = 0
+        self.value = 0.0
+        self.terminal = terminal
+    
+    def uct_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.value / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+    
+    def most_visited(self):
+        if not self.children:
+            return None
+        return max(self.children, key=lambda child: (child.visits, child.value))
+
+
+class MCTSPlanner:
+    """
+    Planifica el turno de `team` sobre un BattleSimulator.
+    plan() deja el simulador exactamente como estaba (incluida la semilla).
+    """
+    
+    def __init__(self, simulator: BattleSimulator, team="enemy", budget_ms=200, exploration=1.4,
+                 rollout_turns=1, max_moves_per_entity=4, seed=None):
+        self.simulator = simulator
+        self.team = team
+        self.budget_ms = budget_ms
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.max_moves_per_entity = max_moves_per_entity
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, Any] = {}
+        self.root: Optional[MCTSNode] = None
+        
+        # Tope de vida por equipo para puntuar: los muertos ya no están en simulator.entities
+        self._max_hp = {}
+        for entity in simulator.roster:
+            self._max_hp[entity.team] = self._max_hp.get(entity.team, 0) + entity.stats['max_hp']
+    
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+    def plan(self, budget_ms=None, max_iterations=None) -> List[SimAction]:
+        """Acciones del turno (sin el fin de turno) ordenadas, dentro del presupuesto"""
+        simulator = self.simulator
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        if simulator.is_over() or simulator.current_team != self.team:
+            self.stats = {'playouts': 0, 'seconds': 0.0, 'playouts_per_second': 0.0, 'nodes': 0,
+                          'depth': 0, 'complete': True}
+            return []
+        
+        recorder = simulator.recorder
+        previous_level = logger.level
+        root_snapshot = simulator.snapshot(include_rng=True)
+        root = self.root = MCTSNode()
+        nodes = 1
+        max_depth = 0
+        playouts = 0
+        
+        start = time.perf_counter()
+        deadline = start + budget
+        try:
+            # Lo que pasa dentro de la búsqueda no se graba ni se registra
+            self._set_recorder(None)
+            logger.set_level(SILENT)
+            
+            while time.perf_counter() < deadline and (max_iterations is None or playouts < max_iterations):
+                simulator.restore(root_snapshot)
+                # restore() devuelve también la semilla de la raíz: cada partida necesita la suya
+                simulator.rng.seed(self.rng.random())
+                node = root
+                depth = 0
+                
+                # 1. Selección
+                while not node.terminal and node.untried == [] and node.children:
+                    node = node.uct_child(self.exploration)
+                    simulator.apply_action(node.action)
+                    depth += 1
+                
+                # 2. Expansión
+                if not node.terminal:
+                    if node.untried is None:
+                        node.untried = self.candidate_actions()
+                    if node.untried:
+                        action = node.untried.pop(self.rng.randrange(len(node.untried)))
+                        simulator.apply_action(action)
+                        child = MCTSNode(node, action, terminal=self._turn_finished(action))
+                        node.children.append(child)
+                        node = child
+                        nodes += 1
+                        depth += 1
+                
+                # 3. Simulación y 4. retropropagación
+                reward = self._rollout(ended_turn=node.terminal)
+                while node is not None:
+                    node.visits += 1
+                    node.value += reward
+                    node = node.parent
+                playouts += 1
+                max_depth = max(max_depth, depth)
+        finally:
+            simulator.restore(root_snapshot)
+            logger.set_level(previous_level)
+            self._set_recorder(recorder)
+        
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            'playouts': playouts,
+            'seconds': elapsed,
+            'playouts_per_second': playouts / elapsed if elapsed > 0 else 0.0,
+            'nodes': nodes,
+            'depth': max_depth
+        }
+        line, complete = self._best_line(root)
+        self.stats['complete'] = complete  # False: el árbol no llegó al fin de turno
+        return line
+    
+    def candidate_actions(self) -> List[SimAction]:
+        """
+        Acciones legales podadas: todas las habilidades, pocos destinos por
+        entidad (los que más se acercan al rival) y el fin de turno
+        """
+        simulator = self.simulator
+        actions = simulator.legal_actions()
+        abilities = [a for a in actions if a.kind == SimAction.ABILITY]
+        
+        moves_by_entity = {}
+        for action in actions:
+            if action.kind == SimAction.MOVE:
+                moves_by_entity.setdefault(action.entity, []).append(action)
+        
+        moves = []
+        for entity, entity_moves in moves_by_entity.items():
+            enemies = [e.position for e in simulator.entities if e.team != entity.team]
+            if enemies:
+                entity_moves.sort(key=lambda a: (min(simulator._distance(a.path[-1], p) for p in enemies),
+                                                 a.path[-1]))
+            moves.extend(entity_moves[:self.max_moves_per_entity])
+        
+        return abilities + moves + [SimAction(SimAction.END_TURN)]
+    
+    def _rollout(self, ended_turn) -> float:
+        """Termina el turno propio y juega rollout_turns fines de turno más con la política codiciosa"""
+        simulator = self.simulator
+        turns_left = self.rollout_turns + (0 if ended_turn else 1)
+        
+        for _ in range(MAX_ROLLOUT_ACTIONS):
+            if turns_left <= 0 or simulator.is_over():
+                break
+            action = greedy_policy(simulator)
+            simulator.apply_action(action)
+            if action.kind == SimAction.END_TURN:
+                turns_left -= 1
+        return self.evaluate()
+    
+    def evaluate(self) -> float:
+        """1 victoria, 0 derrota; si no, 0.5 ± la diferencia de vida relativa entre equipos"""
+        simulator = self.simulator
+        winner = simulator.winner
+        if winner is not None:
+            return 1.0 if winner == self.team else 0.0
+        
+        hp = entity_store.totals_by_team([entity._row for entity in simulator.entities])
+        own = hp.get(self.team, 0) / max(1, self._max_hp.get(self.team, 1))
+        rivals = [team for team in self._max_hp if team != self.team]
+        other = (sum(hp.get(team, 0) for team in rivals)
+                 / max(1, sum(self._max_hp[team] for team in rivals)))
+        return 0.5 + 0.5 * (own - other)
+    
+    def _turn_finished(self, action) -> bool:
+        simulator = self.simulator
+        return (action.kind == SimAction.END_TURN or simulator.is_over()
+                or simulator.current_team != self.team)
+    
+    def _best_line(self, root):
+        """Rama más visitada hasta el fin de turno; indica si llegó a él"""
+        line = []
+        node = root.most_visited()
+        while node is not None:
+            if node.terminal:
+                if node.action.kind != SimAction.END_TURN:
+                    line.append(node.action)
+                return line, True
+            line.append(node.action)
+            node = node.most_visited()
+        return line, False
+    
+    def root_statistics(self) -> Dict[Tuple, Tuple[int, float]]:
+        """Visitas y valor acumulado de cada acción raíz, con claves portables entre procesos"""
+        if self.root is None:
+            return {}
+        index = {id(entity): i for i, entity in enumerate(self.simulator.roster)}
+        return {action_key(child.action, index): (child.visits, child.value) for child in self.root.children}
+    
+    def _set_recorder(self, recorder):
+        self.simulator.recorder = recorder
+        self.simulator.movement_system.recorder = recorder
+
+
+def action_key(action: SimAction, index) -> Tuple:
+    """Clave hashable y serializable de una acción: las entidades van por índice en el reparto"""
+    if action.kind == SimAction.END_TURN:
+        return (SimAction.END_TURN,)
+    entity = index[id(action.entity)]
+    if action.kind == SimAction.MOVE:
+        return (SimAction.MOVE, entity, tuple(tuple(cell) for cell in action.path),
+                tuple(index[id(e)] for e in action.dash_targets))
+    target = index[id(action.target)] if action.target is not None else None
+    position = tuple(action.target_position) if action.target_position is not None else None
+    return (SimAction.ABILITY, entity, action.ability_key, target, position,
+            tuple(index[id(e)] for e in action.targets), action.direction)
+
+
+def resolve_action(key: Tuple, roster) -> SimAction:
+    """Inversa de action_key sobre las entidades de otro simulador con el mismo reparto"""
+    kind = key[0]
+    if kind == SimAction.END_TURN:
+        return SimAction(SimAction.END_TURN)
+    if kind == SimAction.MOVE:
+        _, entity, path, dash_targets = key
+        return SimAction(SimAction.MOVE, entity=roster[entity], path=list(path),
+                         dash_targets=[roster[i] for i in dash_targets])
+    _, entity, ability_key, target, position, targets, direction = key
+    return SimAction(SimAction.ABILITY, entity=roster[entity], ability_key=ability_key,
+                     target=roster[target] if target is not None else None, target_position=position,
+                     targets=[roster[i] for i in targets], direction=direction)
+
+
+def merge_root_statistics(results) -> Dict[Tuple, Tuple[int, float]]:
+    """Paralelización en la raíz: suma visitas y valor de cada acción entre búsquedas independientes"""
+    merged: Dict[Tuple, Tuple[int, float]] = {}
+    for statistics in results:
+        for key, (visits, value) in statistics.items():
+            total_visits, total_value = merged.get(key, (0, 0.0))
+            merged[key] = (total_visits + visits, total_value + value)
+    return merged
+
+
+def best_root_action(statistics) -> Optional[Tuple]:
+    """Acción más visitada (desempate por valor acumulado)"""
+    if not statistics:
+        return None
+    return max(statistics, key=lambda key: statistics[key])
+
+
+class MCTSPolicy:
+    """
+    Política para BattleSimulator: `team` planifica con MCTS una vez por turno
+    y el resto juega codicioso. Cuando se agota el plan, sigue la codiciosa.
+    """
+    
+    def __init__(self, team="enemy", budget_ms=100, **planner_kwargs):
+        self.team = team
+        self.budget_ms = budget_ms
+        self.planner_kwargs = planner_kwargs
+        self._pending: List[SimAction] = []
+        self._planned_turn = None
+        self.total_playouts = 0
+    
+    def __call__(self, simulator: BattleSimulator) -> SimAction:
+        if simulator.current_team != self.team:
+            return greedy_policy(simulator)
+        
+        turn = (simulator.seed, simulator.turn_count)
+        if turn != self._planned_turn:
+            planner = MCTSPlanner(simulator, self.team, self.budget_ms, **self.planner_kwargs)
+            self._pending = planner.plan()
+            self._planned_turn = turn
+            self.total_playouts += planner.stats['playouts']
+        
+        while self._pending:
+            action = self._pending.pop(0)
+            if action.entity in simulator.entities:
+                return action
+        return greedy_policy(simulator)
+
+
+def benchmark(budgets=(50, 100, 200, 400), seed=0, battles=0) -> Dict[str, Any]:
+    """
+    Partidas por segundo y tamaño del árbol según el presupuesto en el turno
+    enemigo de una batalla de referencia; con battles > 0 también compara la
+    tasa de victorias enemiga de MCTS frente a la política codiciosa
+    """
+    logger.set_level(SILENT)
+    simulator = BattleSimulator(seed=seed)
+    while simulator.current_team != "enemy":
+        simulator.step()
+    
+    results: Dict[str, Any] = {'budgets': []}
+    for budget in budgets:
+        planner = MCTSPlanner(simulator, "enemy", budget, seed=seed)
+        plan = planner.plan()
+        results['budgets'].append(dict(planner.stats, budget_ms=budget, plan=[repr(a) for a in plan]))
+    
+    if battles:
+        for name, make_policy in (("greedy", lambda: greedy_policy),
+                                  ("mcts", lambda: MCTSPolicy("enemy", budgets[0], seed=seed))):
+            wins = 0
+            for i in range(battles):
+                simulator.policy = make_policy()
+                simulator.reset(seed + i)
+                if simulator.run()['winner'] == "enemy":
+                    wins += 1
+            results[f'{name}_enemy_wins'] = wins
+        results['battles'] = battles
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark del planificador MCTS")
+    parser.add_argument("--budgets", default="50,100,200,400", help="Presupuestos en ms separados por comas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--battles", type=int, default=0,
+                        help="Batallas completas MCTS vs codiciosa (usa el primer presupuesto)")
+    args = parser.parse_args()
+    
+    stats = benchmark(tuple(int(b) for b in args.budgets.split(",")), args.seed, args.battles)
+    for entry in stats['budgets']:
+        print(f"🌳 {entry['budget_ms']:>4}ms → {entry['playouts']:>5} partidas "
+              f"({entry['playouts_per_second']:.0f}/s), {entry['nodes']} nodos, profundidad {entry['depth']}")
+        print(f"   plan: {', '.join(entry['plan']) or '(pasar turno)'}")
+    if 'battles' in stats:
+        print(f"🏆 Victorias enemigas en {stats['battles']} batallas: "
+              f"codiciosa {stats['greedy_enemy_wins']} | MCTS {stats['mcts_enemy_wins']}")
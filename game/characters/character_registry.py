@@ -1,17 +1,27 @@
 from game.core.config_manager import ConfigManager
+from game.core.logger import config_log
+
+# Personajes conocidos: se registran (config + import de su clase) en su primer uso, no al importar
+KNOWN_CHARACTERS = ("ricchard", "red_thunder", "zoe")
 
 class CharacterRegistry:
     """Registro central con imports dinámicos para evitar circularidad"""
     
     _characters = {}
-    _config_manager = ConfigManager.get_instance()
+    _config_manager = None
+    
+    @classmethod
+    def _get_config_manager(cls):
+        if cls._config_manager is None:
+            cls._config_manager = ConfigManager.get_instance()
+        return cls._config_manager
     
     @classmethod
     def register_from_config(cls, character_id: str):
         """Registra un personaje usando imports dinámicos"""
-        config = cls._config_manager.get_character_config(character_id)
+        config = cls._get_config_manager().get_character_config(character_id)
         if not config:
-            print(f"❌ No se pudo cargar configuración para: {character_id}")
+            config_log.error("No se pudo cargar configuración para: %s", character_id)
             return False
         
         try:
@@ -25,27 +35,31 @@ class CharacterRegistry:
                 from .zoe import Zoe
                 cls._characters[character_id] = Zoe
             else:
-                print(f"❌ Clase no encontrada para: {character_id}")
+                config_log.error("Clase no encontrada para: %s", character_id)
                 return False
                 
-            print(f"✅ Registrado desde config: {character_id}")
+            config_log.debug("✅ Registrado desde config: %s", character_id)
             return True
             
         except ImportError as e:
-            print(f"❌ Error importando {character_id}: {e}")
+            config_log.error("Error importando %s: %s", character_id, e)
             return False
     
     @classmethod
     def get_character_config(cls, character_id: str):
         """Obtiene la configuración de un personaje"""
-        return cls._config_manager.get_character_config(character_id)
+        return cls._get_config_manager().get_character_config(character_id)
     
     @classmethod
     def get_character_class(cls, character_id: str):
+        if character_id not in cls._characters and character_id in KNOWN_CHARACTERS:
+            cls.register_from_config(character_id)
         return cls._characters.get(character_id)
     
     @classmethod
     def get_available_characters(cls):
+        for character_id in KNOWN_CHARACTERS:
+            cls.get_character_class(character_id)
         return list(cls._characters.keys())
     
     @classmethod
@@ -53,9 +67,4 @@ class CharacterRegistry:
         character_class = cls.get_character_class(character_id)
         if character_class:
             return character_class(position, team, **kwargs)
-        raise ValueError(f"Personaje no encontrado: {character_id}")
-
-# ✅ REGISTRO AUTOMÁTICO DESDE CONFIGURACIONES
-CharacterRegistry.register_from_config("ricchard")
-CharacterRegistry.register_from_config("red_thunder")
-CharacterRegistry.register_from_config("zoe")
\ No newline at end of file
+        raise ValueError(f"Personaje no encontrado: {character_id}")
\ No newline at end of file
@@ -2,6 +2,8 @@ from game.entities.battle_entity import BattleEntity
 from game.characters.character_registry import CharacterRegistry
 
 class RedThunder(BattleEntity):
+    __slots__ = ()
+    
     def __init__(self, position, team="player"):
         super().__init__(
             character_id="red_thunder",
@@ -31,14 +31,17 @@ class BaseAction:
         self.range = range
         self.current_cooldown = 0
     
-    def can_execute(self, context):
-        """Validaciones base - overrideable por subclases si necesitan más validaciones"""
+    def can_execute(self, context, state=None):
+        """
+        Validaciones base - overrideable por subclases si necesitan más validaciones.
+        state: estado por entidad (cooldown) cuando la acción es un prototipo compartido
+        """
         # PH suficiente
         if context.caster.stats['current_ph'] < self.cost_ph:
             return False
         
         # Cooldown activo
-        if self.current_cooldown > 0:
+        if (self if state is None else state).current_cooldown > 0:
             return False
         
         # Estado del turno
@@ -50,7 +53,7 @@ class BaseAction:
             
         return True
     
-    def execute(self, context):
+    def execute(self, context, state=None):
         """
         Método de ejecución principal.
         Las subclases DEBEN override este método para su comportamiento específico.
@@ -0,0 +1,56 @@
+"""
+Tareas en segundo plano sin congelar el bucle principal
+Se vigilan futuros (de hilos o de procesos) y sus callbacks se ejecutan en el
+hilo principal, entre frames, cuando Game.run llama a poll(). Así ningún
+callback toca la escena ni el bus de eventos desde otro hilo.
+"""
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+
+from game.core.logger import logger
+
+
+class BackgroundTasks:
+    """Futuros pendientes y lo que hay que hacer cuando se resuelvan"""
+    
+    def __init__(self):
+        self._pending: List[Tuple[Future, Callable[[Future], None]]] = []
+    
+    def watch(self, future: Future, callback: Callable[[Future], None]):
+        """callback(future) se ejecutará en el hilo principal en el primer poll() tras resolverse"""
+        self._pending.append((future, callback))
+        return future
+    
+    def poll(self) -> int:
+        """Despacha los futuros terminados. Llamar una vez por frame; retorna cuántos despachó"""
+        if not self._pending:
+            return 0
+        
+        # Una sola pasada: un futuro que termine durante el reparto no se pierde
+        ready, pending = [], []
+        for entry in self._pending:
+            (ready if entry[0].done() else pending).append(entry)
+        if not ready:
+            return 0
+        self._pending = pending
+        
+        for future, callback in ready:
+            try:
+                callback(future)
+            except Exception as e:
+                logger.error("Error en callback de tarea en segundo plano", exception=e)
+        return len(ready)
+    
+    def cancel_all(self):
+        """Cancela lo que aún no empezó y olvida el resto (al cerrar el juego)"""
+        for future, _ in self._pending:
+            future.cancel()
+        self._pending = []
+    
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+
+# Instancia global
+background_tasks = BackgroundTasks()
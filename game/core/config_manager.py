@@ -1,10 +1,96 @@
-import json
+"""
+ConfigManager - configs de personajes, habilidades y efectos desde un bundle precompilado
+Todas las fuentes (game/characters/*.json y game/data/effects.py) se leen, validan e
+indexan una sola vez y se guardan en un bundle pickle (game/data/__pycache__). Los
+arranques siguientes cargan el bundle, salvo que el mtime de alguna fuente haya
+cambiado: entonces se reconstruye. Las configs se entregan congeladas en profundidad
+(freeze_config: dicts anidados como FrozenConfig, listas como tuplas), una sola
+vez por bundle; para modificar una, thaw_config(config) devuelve una copia editable.
+Recarga en caliente: start_watching() vigila las fuentes en un hilo (watchdog si está
+instalado; si no, sondeo de mtimes) y reload_if_changed(), llamado entre frames,
+reconstruye el bundle y emite CONFIG_RELOADED con las claves que cambiaron.
+Desactivada por defecto: el juego solo la arranca con GAME_HOT_RELOAD=1 (desarrollo).
+"""
 import os
+import pickle
+import threading
+import time
+from collections.abc import Mapping
 from typing import Dict, Any, Optional
 
+from game.core.event_system import event_system, EventTypes
+from game.core.logger import config_log
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHARACTERS_DIR = os.path.join(GAME_DIR, "characters")
+EFFECTS_SOURCE = os.path.join(GAME_DIR, "data", "effects.py")
+BUNDLE_PATH = os.path.join(GAME_DIR, "data", "__pycache__", "config_bundle.pickle")
+BUNDLE_VERSION = 1
+
+class FrozenConfig(Mapping):
+    """Dict de solo lectura (ver freeze_config) que se copia y serializa por sí mismo"""
+    
+    __slots__ = ('_data',)
+    
+    def __init__(self, data=()):
+        self._data = dict(data)
+    
+    def __getitem__(self, key):
+        return self._data[key]
+    
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+    
+    def __contains__(self, key):
+        return key in self._data
+    
+    def __iter__(self):
+        return iter(self._data)
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __repr__(self):
+        return f"FrozenConfig({self._data!r})"
+    
+    def __reduce__(self):
+        return FrozenConfig, (self._data,)
+    
+    # Inmutable en profundidad (freeze_config): las copias pueden compartir la misma instancia
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze_config(value):
+    """Copia de solo lectura en profundidad: dicts -> FrozenConfig, listas -> tuplas"""
+    if isinstance(value, FrozenConfig):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenConfig({key: freeze_config(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+
+def thaw_config(value):
+    """Inversa de freeze_config: dicts y listas normales (JSON, pickle o una copia para editar)"""
+    if isinstance(value, Mapping):
+        return {key: thaw_config(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw_config(item) for item in value]
+    return value
+
+
+def _changed_keys(old: Dict, new: Dict) -> list:
+    """Claves añadidas, eliminadas o con valor distinto entre dos índices del bundle"""
+    return sorted(key for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+
+
 class ConfigManager:
     _instance = None
-    _config_cache = {}
     
     @classmethod
     def get_instance(cls):
@@ -12,49 +98,297 @@ class ConfigManager:
             cls._instance = ConfigManager()
         return cls._instance
     
-    def _find_config_file(self, character_id: str) -> str:
-        """Busca el archivo de configuración en las ubicaciones correctas"""
-        possible_paths = [
-            # TU ESTRUCTURA ACTUAL - archivos en game/characters/
-            f"game/characters/{character_id}.json",
-            # Otras ubicaciones por si acaso
-            f"./game/characters/{character_id}.json",
-            f"{os.getcwd()}/game/characters/{character_id}.json",
-        ]
+    def __init__(self, bundle_path: str = BUNDLE_PATH):
+        self.bundle_path = bundle_path
+        self._overrides = {}   # character_id -> config instalada con set_character_config
+        self._fallbacks = {}   # character_id -> config de respaldo ya avisada
+        self._views = {}       # character_id, (character_id, clave) o 'effects' -> config congelada
+        self._changed = threading.Event()  # Lo marca el hilo vigilante; lo consume reload_if_changed
+        self._stop_watcher = None
+        self.bundle = self._load_bundle()
+    
+    # ------------------------------------------------------------------
+    # Bundle
+    # ------------------------------------------------------------------
+    def _source_files(self) -> Dict[str, int]:
+        """Fuentes del bundle con su mtime (ns): un JSON por personaje y el módulo de efectos"""
+        sources = {}
+        with os.scandir(CHARACTERS_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    sources[entry.path] = entry.stat().st_mtime_ns
+        if os.path.exists(EFFECTS_SOURCE):
+            sources[EFFECTS_SOURCE] = os.stat(EFFECTS_SOURCE).st_mtime_ns
+        return sources
+    
+    def _load_bundle(self) -> Dict[str, Any]:
+        sources = self._source_files()
+        try:
+            with open(self.bundle_path, 'rb') as f:
+                bundle = pickle.load(f)
+            if bundle.get('version') == BUNDLE_VERSION and bundle.get('sources') == sources:
+                return bundle
+            config_log.info("🔄 Configuración modificada: reconstruyendo bundle")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            config_log.warning("Bundle de configuración ilegible (%s): reconstruyendo", e)
+        return self.rebuild(sources)
+    
+    def is_stale(self) -> bool:
+        """True si alguna fuente cambió (o apareció/desapareció) desde que se construyó el bundle"""
+        return self._source_files() != self.bundle['sources']
+    
+    def refresh(self) -> bool:
+        """Reconstruye el bundle si alguna fuente cambió. Retorna True si lo hizo"""
+        if not self.is_stale():
+            return False
+        self.rebuild()
+        return True
+    
+    def rebuild(self, sources: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Lee, valida e indexa todas las fuentes y guarda el bundle. Un personaje o efecto
+        que deja de validar conserva su versión anterior (si la había)
+        """
+        start = time.perf_counter()
+        sources = self._source_files() if sources is None else sources
+        previous = getattr(self, 'bundle', None) or {'characters': {}, 'effects': {}}
         
-        for path in possible_paths:
-            if os.path.exists(path):
-                print(f"🔍 Encontrado: {path}")
-                return path
-            else:
-                print(f"❌ No existe: {path}")
+        characters = {}
+        for path in sorted(sources):
+            if not path.endswith('.json'):
+                continue
+            character_id = os.path.splitext(os.path.basename(path))[0]
+            config = self._load_json_file(path)
+            errors = self._validate_character(character_id, config) if config else ["archivo vacío o ilegible"]
+            if errors:
+                for error in errors:
+                    config_log.error("%s: %s", character_id, error)
+                if character_id in previous['characters']:
+                    config_log.warning("↩️  %s: se mantiene la versión anterior", character_id)
+                    characters[character_id] = previous['characters'][character_id]
+                continue  # Sin config válida: get_character_config usará la de respaldo
+            characters[character_id] = config
         
-        return None
+        effects = self._load_effects()
+        if effects is None:
+            effects = dict(previous['effects'])
+        for effect_id, error in self._validate_effects(effects).items():
+            config_log.error("%s", error)
+            if effect_id in previous['effects']:
+                config_log.warning("↩️  %s: se mantiene la versión anterior", effect_id)
+                effects[effect_id] = previous['effects'][effect_id]
+        
+        abilities = {(character_id, ability_key): ability
+                     for character_id, config in characters.items()
+                     for ability_key, ability in config.get('abilities', {}).items()}
+        
+        self.bundle = {
+            'version': BUNDLE_VERSION,
+            'sources': sources,
+            'characters': characters,
+            'abilities': abilities,
+            'effects': effects
+        }
+        self._views.clear()
+        self._save_bundle()
+        config_log.info("📦 Bundle de configuración: %s personajes, %s habilidades, %s efectos (%.0fms)",
+                        len(characters), len(abilities), len(effects), (time.perf_counter() - start) * 1000)
+        return self.bundle
     
-    def get_character_config(self, character_id: str) -> Dict[str, Any]:
-        cache_key = f"character_{character_id}"
+    def _save_bundle(self):
+        """Escritura atómica: otro proceso nunca lee un bundle a medias"""
+        tmp_path = f"{self.bundle_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.bundle_path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.bundle_path)
+        except OSError as e:
+            config_log.warning("No se pudo guardar el bundle de configuración: %s", e)
+    
+    def _load_effects(self) -> Optional[Dict[str, Any]]:
+        """
+        Los efectos viven en game/data/effects.py. Se ejecuta el archivo (no el módulo
+        importado) para leer siempre su contenido actual; None si no se puede ejecutar
+        """
+        import runpy  # Solo al reconstruir: el arranque con bundle vigente no lo necesita
         
-        if cache_key not in self._config_cache:
-            file_path = self._find_config_file(character_id)
-            
-            if file_path:
+        try:
+            return dict(runpy.run_path(EFFECTS_SOURCE)['EFFECTS_CONFIG'])
+        except Exception as e:
+            config_log.error("Error en %s: %s", EFFECTS_SOURCE, e)
+            return None
+    
+    def _validate_character(self, character_id: str, config: Dict[str, Any]) -> list:
+        """Estructura básica y efectos de cada habilidad compilables (mismo registro que AbilityFactory)"""
+        from game.systems.ability_factory import EFFECT_COMPONENTS
+        from game.systems.effect_compiler import EffectCompileError
+        
+        errors = []
+        if not isinstance(config.get('stats'), dict):
+            errors.append("falta 'stats'")
+        abilities = config.get('abilities', {})
+        if not isinstance(abilities, dict):
+            return errors + ["'abilities' debe ser un objeto"]
+        for ability_key, ability in abilities.items():
+            if 'name' not in ability:
+                errors.append(f"habilidad '{ability_key}' sin 'name'")
+            for effect in ability.get('effects', []):
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        config = json.load(f)
-                    self._config_cache[cache_key] = config
-                    print(f"✅ Config cargada: {character_id} desde {file_path}")
-                except Exception as e:
-                    print(f"❌ Error cargando {file_path}: {e}")
-                    self._config_cache[cache_key] = self._create_fallback_config(character_id)
-            else:
-                print(f"❌ No se encontró archivo de configuración para: {character_id}")
-                self._config_cache[cache_key] = self._create_fallback_config(character_id)
+                    EFFECT_COMPONENTS.compile(effect, f"habilidad '{ability_key}'")
+                except EffectCompileError as e:
+                    errors.append(str(e))
+        return errors
+    
+    def _validate_effects(self, effects: Dict[str, Any]) -> Dict[str, str]:
+        """effect_id -> error de los efectos que no compilan"""
+        from game.systems.effect_compiler import EffectCompileError
+        from game.systems.effect_system import compile_effect_definition
         
-        return self._config_cache[cache_key].copy()
+        errors = {}
+        for effect_id, effect in effects.items():
+            try:
+                compile_effect_definition(effect)
+            except EffectCompileError as e:
+                errors[effect_id] = str(e)
+        return errors
     
+    # ------------------------------------------------------------------
+    # Recarga en caliente
+    # ------------------------------------------------------------------
+    def start_watching(self, interval: float = 0.5) -> str:
+        """
+        Vigila las fuentes desde un hilo daemon: watchdog (eventos del sistema de archivos)
+        si está instalado; si no, sondeo de mtimes cada `interval` segundos. El hilo solo
+        marca el cambio: la recarga la hace reload_if_changed() en el hilo principal.
+        Retorna el modo usado ('watchdog' o 'polling')
+        """
+        if self._stop_watcher is not None:
+            return self._watch_mode
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:  # watchdog es opcional: sin él, sondeo
+            Observer = None
+        
+        if Observer is not None:
+            changed = self._changed
+            
+            class SourceHandler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    if not event.is_directory and str(event.src_path).endswith(('.json', '.py')):
+                        changed.set()
+            
+            observer = Observer()
+            for directory in {CHARACTERS_DIR, os.path.dirname(EFFECTS_SOURCE)}:
+                observer.schedule(SourceHandler(), directory, recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._stop_watcher = observer.stop
+            self._watch_mode = 'watchdog'
+        else:
+            stop = threading.Event()
+            threading.Thread(target=self._poll_sources, args=(interval, stop),
+                             name="config-watcher", daemon=True).start()
+            self._stop_watcher = stop.set
+            self._watch_mode = 'polling'
+        config_log.info("👀 Recarga en caliente activa (%s)", self._watch_mode)
+        return self._watch_mode
+    
+    def stop_watching(self):
+        if self._stop_watcher is not None:
+            self._stop_watcher()
+            self._stop_watcher = None
+    
+    def _poll_sources(self, interval: float, stop: threading.Event):
+        """Hilo de sondeo: compara los mtimes con los de la última pasada"""
+        known = self.bundle['sources']
+        while not stop.wait(interval):
+            try:
+                current = self._source_files()
+            except OSError:
+                continue  # Un archivo a medio guardar: se mira en la siguiente pasada
+            if current != known:
+                known = current
+                self._changed.set()
+    
+    def reload_if_changed(self, force: bool = False) -> Optional[Dict[str, list]]:
+        """
+        Entre frames (hilo principal): si el vigilante marcó un cambio (o force), reconstruye
+        el bundle y emite CONFIG_RELOADED con lo que cambió:
+        {'characters': [ids], 'abilities': [(id, clave)], 'effects': [ids]}.
+        Retorna ese diccionario, o None si no hubo nada que recargar
+        """
+        if not (force or self._changed.is_set()):
+            return None
+        self._changed.clear()
+        if not self.is_stale():
+            return None
+        
+        previous = self.bundle
+        self.rebuild()
+        changes = {
+            'characters': _changed_keys(previous['characters'], self.bundle['characters']),
+            'abilities': _changed_keys(previous['abilities'], self.bundle['abilities']),
+            'effects': _changed_keys(previous['effects'], self.bundle['effects'])
+        }
+        if not any(changes.values()):
+            return None
+        config_log.info("🔥 Configuración recargada: %s", changes)
+        event_system.emit(EventTypes.CONFIG_RELOADED, changes)
+        return changes
+    
+    # ------------------------------------------------------------------
+    # Consultas (vistas de solo lectura)
+    # ------------------------------------------------------------------
+    def get_character_config(self, character_id: str) -> FrozenConfig:
+        view = self._views.get(character_id)
+        if view is None:
+            config = self._overrides.get(character_id)
+            if config is None:
+                config = self.bundle['characters'].get(character_id)
+            if config is None:
+                config = self._fallbacks.get(character_id)
+                if config is None:
+                    config_log.error("No se encontró configuración para: %s", character_id)
+                    config = self._fallbacks[character_id] = self._create_fallback_config(character_id)
+            view = self._views[character_id] = freeze_config(config)
+        return view
+    
+    def get_ability_config(self, character_id: str, ability_key: str) -> Optional[FrozenConfig]:
+        """Config de una habilidad por (personaje, clave) sin pasar por la del personaje"""
+        if character_id in self._overrides:
+            return self.get_character_config(character_id).get('abilities', {}).get(ability_key)
+        key = (character_id, ability_key)
+        view = self._views.get(key)
+        if view is None:
+            ability = self.bundle['abilities'].get(key)
+            if ability is None:
+                return None
+            view = self._views[key] = freeze_config(ability)
+        return view
+    
+    def get_character_ids(self):
+        return list(self.bundle['characters'])
+    
+    def set_character_config(self, character_id: str, config: Optional[Dict[str, Any]]):
+        """
+        Reemplaza la config de un personaje (p. ej. las grabadas en un replay).
+        None la descarta y se vuelve a la del bundle. Retorna la anterior sustitución (o None).
+        """
+        previous = self._overrides.get(character_id)
+        if config is None:
+            self._overrides.pop(character_id, None)
+        else:
+            self._overrides[character_id] = config
+        self._views.pop(character_id, None)
+        return previous
+
     def _create_fallback_config(self, character_id: str) -> Dict[str, Any]:
         """Crea una configuración básica si no se encuentra el archivo"""
-        print(f"⚠️  Usando configuración de respaldo para {character_id}")
+        config_log.warning("Usando configuración de respaldo para %s", character_id)
         
         fallback_configs = {
             "ricchard": {
@@ -119,28 +453,25 @@ class ConfigManager:
         
         return fallback_configs.get(character_id, {})
     
-    def get_effect_config(self, effect_id: str) -> Dict[str, Any]:
-        if "effects" not in self._config_cache:
-            effects_path = "game/data/effects.json"
-            self._config_cache["effects"] = self._load_json_file(effects_path)
-        
-        return self._config_cache["effects"].get(effect_id, {}).copy()
+    def get_effect_config(self, effect_id: str) -> FrozenConfig:
+        return self.get_all_effects().get(effect_id, FrozenConfig())
     
-    def get_all_effects(self) -> Dict[str, Any]:
-        if "effects" not in self._config_cache:
-            effects_path = "game/data/effects.json"
-            self._config_cache["effects"] = self._load_json_file(effects_path)
-        
-        return self._config_cache["effects"].copy()
+    def get_all_effects(self) -> FrozenConfig:
+        view = self._views.get('effects')
+        if view is None:
+            view = self._views['effects'] = freeze_config(self.bundle['effects'])
+        return view
     
     def _load_json_file(self, file_path: str) -> Dict[str, Any]:
         """Carga un archivo JSON con manejo de errores"""
+        import json  # Solo al reconstruir el bundle
+        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except FileNotFoundError:
-            print(f"⚠️  Archivo no encontrado: {file_path}")
+            config_log.warning("Archivo no encontrado: %s", file_path)
             return {}
         except json.JSONDecodeError as e:
-            print(f"❌ Error en JSON {file_path}: {e}")
+            config_log.error("Error en JSON %s: %s", file_path, e)
             return {}
\ No newline at end of file
@@ -1,79 +1,293 @@
 """
 Sistema de eventos global para desacoplar componentes del juego
+Tablas de despacho precalculadas: la aridad de cada callback se resuelve al
+suscribirse y emit solo recorre una tupla inmutable.
+Benchmark: python -m game.core.event_system
 """
 import inspect
-from typing import Dict, List, Callable, Any
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Callable, Any, Optional, Tuple, Union
+from game.core.logger import events_log
+
+EventKey = Union[str, int]
+
+# 🔢 Registro global nombre <-> ID entero, compartido por todas las instancias
+_event_ids: Dict[str, int] = {}
+_event_names: List[str] = []
+
+
+def event_id(event_type: EventKey) -> int:
+    """ID entero de un evento (lo registra si es nuevo). Acepta también un ID ya resuelto"""
+    if type(event_type) is int:
+        return event_type
+    resolved = _event_ids.get(event_type)
+    if resolved is None:
+        resolved = len(_event_names)
+        _event_ids[event_type] = resolved
+        _event_names.append(event_type)
+    return resolved
+
+
+def event_name(event_type: EventKey) -> str:
+    """Nombre de un evento a partir de su ID (o el propio nombre)"""
+    if type(event_type) is int:
+        return _event_names[event_type]
+    return event_type
+
+
+def _accepts_data(callback: Callable) -> bool:
+    """True si la callback recibe el diccionario de datos (se calcula una sola vez)"""
+    try:
+        return len(inspect.signature(callback).parameters) > 0
+    except (TypeError, ValueError):
+        return True
+
+
+def _callback_name(callback: Callable) -> str:
+    return getattr(callback, '__name__', repr(callback))
+
+
+class EventScope:
+    """
+    Tablas de suscripción propias para una batalla paralela (p. ej. la copia
+    headless sobre la que busca la IA). Ver EventSystem.isolated
+    """
+    
+    __slots__ = ('dispatch', 'keyed', 'queue')
+    
+    def __init__(self):
+        self.dispatch = {}
+        self.keyed = {}
+        self.queue = deque()
+
 
 class EventSystem:
     """
     Sistema de publicación-suscripción para comunicación entre sistemas
     """
     
-    def __init__(self):
-        self._listeners: Dict[str, List[Callable]] = {}
-        self._event_history: List[Dict] = []
-        self.max_history = 100  # Límite de eventos en historial
+    def __init__(self, max_history: int = 100, record_history: bool = True):
+        # event_id -> tupla de (callback, recibe_datos); se reconstruye al (des)suscribir
+        self._dispatch: Dict[int, Tuple[Tuple[Callable, bool], ...]] = {}
+        # Suscripciones por entidad: event_id -> campo -> id(clave) -> (clave, tupla de (callback, recibe_datos)).
+        # La clave se guarda junto a su id: mientras haya suscripción no se recolecta y su id no se reutiliza
+        self._keyed: Dict[int, Dict[str, Dict[int, Tuple[Any, Tuple[Tuple[Callable, bool], ...]]]]] = {}
+        self._sequence = 0
+        self.max_history = max_history  # Límite de eventos en historial
+        self._event_history: Optional[deque] = deque(maxlen=max_history) if record_history else None
+        self.verbose = False  # True: registra cada emisión en events_log (nivel DEBUG)
+        
+        # 📬 Modo diferido: emit encola y flush() despacha en lote (fin de habilidad, fin de frame)
+        self.queued_mode = False
+        self.max_cascade_depth = 8  # Generaciones de eventos que un flush puede encadenar
+        self._queue: deque = deque()
+        self._flushing = False
+        self.stats = {'flushes': 0, 'dispatched_deferred': 0, 'cascades_capped': 0, 'dropped_events': 0}
+    
+    def set_history_enabled(self, enabled: bool):
+        """Modo rápido sin historial: emit no guarda nada"""
+        if enabled and self._event_history is None:
+            self._event_history = deque(maxlen=self.max_history)
+        elif not enabled:
+            self._event_history = None
+    
+    @contextmanager
+    def isolated(self, scope: Optional[EventScope] = None):
+        """
+        Ejecuta el bloque con las tablas de scope: lo que se suscriba o emita dentro
+        no llega a los listeners de fuera ni al historial, y al salir todo vuelve a
+        estar como estaba. Reutilizar el mismo scope conserva sus suscripciones.
+        """
+        scope = scope if scope is not None else EventScope()
+        saved = (self._dispatch, self._keyed, self._queue, self._flushing,
+                 self.queued_mode, self._event_history)
+        self._dispatch, self._keyed, self._queue = scope.dispatch, scope.keyed, scope.queue
+        self._flushing = False
+        self.queued_mode = False
+        self._event_history = None
+        try:
+            yield scope
+        finally:
+            scope.queue = self._queue  # flush() reemplaza la cola por generaciones
+            (self._dispatch, self._keyed, self._queue, self._flushing,
+             self.queued_mode, self._event_history) = saved
     
-    def subscribe(self, event_type: str, callback: Callable):
+    def subscribe(self, event_type: EventKey, callback: Callable):
         """Suscribe una función a un tipo de evento"""
-        if event_type not in self._listeners:
-            self._listeners[event_type] = []
+        key = event_id(event_type)
+        entries = self._dispatch.get(key, ())
+        if any(existing == callback for existing, _ in entries):
+            return
         
-        if callback not in self._listeners[event_type]:
-            self._listeners[event_type].append(callback)
-            print(f"🔔 {callback.__name__} suscrito a {event_type}")
+        self._dispatch[key] = entries + ((callback, _accepts_data(callback)),)
+        if events_log.debug_enabled:
+            events_log.debug("🔔 %s suscrito a %s", _callback_name(callback), event_name(event_type))
     
-    def unsubscribe(self, event_type: str, callback: Callable):
+    def unsubscribe(self, event_type: EventKey, callback: Callable):
         """Desuscribe una función de un tipo de evento"""
-        if event_type in self._listeners and callback in self._listeners[event_type]:
-            self._listeners[event_type].remove(callback)
-            print(f"🔕 {callback.__name__} desuscrito de {event_type}")
+        key = event_id(event_type)
+        entries = self._dispatch.get(key, ())
+        remaining = tuple(entry for entry in entries if entry[0] != callback)
+        if len(remaining) != len(entries):
+            self._dispatch[key] = remaining
+            if events_log.debug_enabled:
+                events_log.debug("🔕 %s desuscrito de %s", _callback_name(callback), event_name(event_type))
     
-    def emit(self, event_type: str, data: Dict[str, Any] = None):
-        """Emite un evento a todos los suscriptores"""
+    def subscribe_keyed(self, event_type: EventKey, field: str, key: Any, callback: Callable):
+        """
+        Suscribe callback solo a las emisiones donde data[field] es key
+        (p. ej. ENTITY_DAMAGED con attacker == esta entidad). El bus indexa por
+        clave, así que emit solo llama a quien le importa el evento.
+        """
+        key_id = event_id(event_type)
+        fields = self._keyed.get(key_id, {})
+        by_key = fields.get(field)
+        if by_key is None:
+            # Campo nuevo: la tabla del evento se reemplaza (copy-on-write, como _dispatch)
+            # para que un emit en curso siga recorriendo la anterior
+            by_key = {}
+            self._keyed[key_id] = {**fields, field: by_key}
+        _, entries = by_key.get(id(key), (key, ()))
+        if any(existing == callback for existing, _ in entries):
+            return
+        
+        by_key[id(key)] = (key, entries + ((callback, _accepts_data(callback)),))
+        if events_log.debug_enabled:
+            events_log.debug("🔔 %s suscrito a %s (%s=%s)", _callback_name(callback),
+                             event_name(event_type), field, getattr(key, 'name', key))
+    
+    def unsubscribe_keyed(self, event_type: EventKey, field: str, key: Any, callback: Callable):
+        """Desuscribe una suscripción por clave"""
+        by_key = self._keyed.get(event_id(event_type), {}).get(field)
+        if not by_key or id(key) not in by_key:
+            return
+        
+        entries = by_key[id(key)][1]
+        remaining = tuple(entry for entry in entries if entry[0] != callback)
+        if remaining:
+            by_key[id(key)] = (key, remaining)
+        else:
+            del by_key[id(key)]
+        if len(remaining) != len(entries):
+            if events_log.debug_enabled:
+                events_log.debug("🔕 %s desuscrito de %s (%s)", _callback_name(callback),
+                                 event_name(event_type), field)
+    
+    def emit(self, event_type: EventKey, data: Dict[str, Any] = None):
+        """Emite un evento a todos los suscriptores (acepta nombre o ID entero)"""
+        key = event_type if type(event_type) is int else _event_ids.get(event_type)
+        if key is None:
+            key = event_id(event_type)
         if data is None:
             data = {}
         
-        # Registrar evento en historial
-        event_record = {
-            'type': event_type,
-            'data': data,
-            'timestamp': len(self._event_history)
-        }
-        self._event_history.append(event_record)
+        # Registrar evento en historial (tupla: sin diccionarios por emisión)
+        if self._event_history is not None:
+            self._event_history.append((key, data, self._sequence))
+            self._sequence += 1
         
-        # Mantener historial limitado
-        if len(self._event_history) > self.max_history:
-            self._event_history.pop(0)
+        if self.verbose and events_log.debug_enabled:
+            events_log.debug("🎯 EVENTO EMITIDO: %s", event_name(key))
         
-        print(f"🎯 EVENTO EMITIDO: {event_type}")
+        # En modo diferido (o si lo emite un listener durante un flush) se encola
+        if self.queued_mode or self._flushing:
+            self._queue.append((key, data))
+            return
         
+        self._dispatch_event(key, data)
+    
+    def _dispatch_event(self, key, data):
         # Notificar a suscriptores
-        if event_type in self._listeners:
-            for callback in self._listeners[event_type]:
-                try:
-                    # Pasar datos según lo que la callback espera
-                    sig = inspect.signature(callback)
-                    if len(sig.parameters) == 0:
-                        callback()
-                    else:
-                        callback(data)
-                except Exception as e:
-                    print(f"❌ Error en callback {callback.__name__} para evento {event_type}: {e}")
-    
-    def get_event_history(self, event_type: str = None):
+        entries = self._dispatch.get(key)
+        if entries:
+            self._notify(entries, key, data)
+        
+        # Suscriptores por clave: una búsqueda por campo indexado, no una llamada por entidad
+        keyed = self._keyed.get(key)
+        if keyed:
+            for field, by_key in keyed.items():
+                value = data.get(field)
+                if value is not None:
+                    subscribed = by_key.get(id(value))
+                    if subscribed is not None:
+                        self._notify(subscribed[1], key, data)
+    
+    def _notify(self, entries, key, data):
+        for callback, wants_data in entries:
+            try:
+                if wants_data:
+                    callback(data)
+                else:
+                    callback()
+            except Exception as e:
+                events_log.error("Error en callback %s para evento %s: %s",
+                                 _callback_name(callback), event_name(key), e)
+    
+    def flush(self) -> int:
+        """
+        Despacha los eventos encolados. Lo que emitan los listeners se encola como
+        la siguiente generación; pasadas max_cascade_depth generaciones se descarta
+        el resto (cascada probablemente infinita). Retorna los eventos despachados.
+        """
+        if self._flushing or not self._queue:
+            return 0
+        
+        self._flushing = True
+        self.stats['flushes'] += 1
+        dispatched = 0
+        depth = 0
+        try:
+            while self._queue:
+                depth += 1
+                if depth > self.max_cascade_depth:
+                    dropped = len(self._queue)
+                    events_log.warning("Cascada de eventos cortada tras %d niveles: %d eventos descartados",
+                                       self.max_cascade_depth, dropped)
+                    self._queue.clear()
+                    self.stats['cascades_capped'] += 1
+                    self.stats['dropped_events'] += dropped
+                    break
+                
+                generation, self._queue = self._queue, deque()
+                for key, data in generation:
+                    self._dispatch_event(key, data)
+                dispatched += len(generation)
+        finally:
+            self._flushing = False
+        
+        self.stats['dispatched_deferred'] += dispatched
+        return dispatched
+    
+    def get_pending_count(self) -> int:
+        return len(self._queue)
+    
+    def get_event_history(self, event_type: EventKey = None):
         """Obtiene el historial de eventos"""
-        if event_type:
-            return [e for e in self._event_history if e['type'] == event_type]
-        return self._event_history
+        if self._event_history is None:
+            return []
+        wanted = event_id(event_type) if event_type is not None else None
+        return [
+            {'type': _event_names[key], 'data': data, 'timestamp': sequence}
+            for key, data, sequence in self._event_history
+            if wanted is None or key == wanted
+        ]
+    
+    def get_listener_count(self, event_type: EventKey) -> int:
+        key = event_id(event_type)
+        keyed = sum(len(entries) for by_key in self._keyed.get(key, {}).values() for _, entries in by_key.values())
+        return len(self._dispatch.get(key, ())) + keyed
     
     def clear_listeners(self):
         """Limpia todos los suscriptores"""
-        self._listeners.clear()
-        print("🧹 Todos los listeners limpiados")
+        self._dispatch.clear()
+        self._keyed.clear()
+        self._queue.clear()
+        events_log.debug("🧹 Todos los listeners limpiados")
 
     # 🎯 NUEVO: Alias para compatibilidad con register/subscribe
-    def register(self, event_type: str, callback: Callable):
+    def register(self, event_type: EventKey, callback: Callable):
         """Alias de subscribe para compatibilidad"""
         self.subscribe(event_type, callback)
 
@@ -130,6 +344,18 @@ class EventTypes:
     EFFECT_REMOVED = "effect_removed"
     EFFECT_EXPIRED = "effect_expired"
     PASSIVE_TRIGGERED = "passive_triggered"
+    
+    # Sistema de configuración
+    CONFIG_RELOADED = "config_reloaded"  # Recarga en caliente: claves cambiadas por tipo
+
+
+class EventIds:
+    """Mismos nombres que EventTypes pero con IDs enteros (despacho sin hash de strings)"""
+
+
+for _name, _value in list(vars(EventTypes).items()):
+    if _name.isupper():
+        setattr(EventIds, _name, event_id(_value))
 
 
 # Decoradores útiles para suscribir funciones
@@ -138,4 +364,85 @@ def event_listener(event_type: str):
     def decorator(func: Callable):
         event_system.subscribe(event_type, func)
         return func
-    return decorator
\ No newline at end of file
+    return decorator
+
+def benchmark(subscriber_counts=(10, 100, 1000), emits=20000):
+    """Emisiones por segundo con N suscriptores, con historial y en modo rápido"""
+    results = []
+    for count in subscriber_counts:
+        for record_history in (True, False):
+            bus = EventSystem(record_history=record_history)
+            hits = [0]
+            
+            def make_listener():
+                def listener(data):
+                    hits[0] += 1
+                return listener
+            
+            for _ in range(count):
+                bus.subscribe(EventIds.ENTITY_DAMAGED, make_listener())
+            
+            n = max(100, emits // count)
+            payload = {'damage': 1}
+            start = time.perf_counter()
+            for _ in range(n):
+                bus.emit(EventIds.ENTITY_DAMAGED, payload)
+            elapsed = time.perf_counter() - start
+            assert hits[0] == n * count
+            
+            results.append({
+                'subscribers': count,
+                'history': record_history,
+                'emits_per_second': n / elapsed,
+                'callbacks_per_second': n * count / elapsed
+            })
+    return results
+
+
+
+def benchmark_keyed(entity_counts=(10, 100, 1000), emits=20000):
+    """
+    Un ENTITY_DAMAGED con N entidades escuchando su propio daño:
+    difundir-y-filtrar (N callbacks por emit) frente a suscripción por clave (1)
+    """
+    class Dummy:
+        pass
+    
+    results = []
+    for count in entity_counts:
+        entities = [Dummy() for _ in range(count)]
+        timings = {}
+        for mode in ('broadcast', 'keyed'):
+            bus = EventSystem(record_history=False)
+            for entity in entities:
+                if mode == 'broadcast':
+                    def on_damage(data, entity=entity):
+                        if data.get('attacker') == entity:
+                            pass
+                    bus.subscribe(EventIds.ENTITY_DAMAGED, on_damage)
+                else:
+                    def on_damage(data):
+                        pass
+                    bus.subscribe_keyed(EventIds.ENTITY_DAMAGED, 'attacker', entity, on_damage)
+            
+            n = max(100, emits // count)
+            payloads = [{'attacker': entities[i % count]} for i in range(n)]
+            start = time.perf_counter()
+            for payload in payloads:
+                bus.emit(EventIds.ENTITY_DAMAGED, payload)
+            timings[mode] = n / (time.perf_counter() - start)
+        
+        results.append({'entities': count,
+                        'broadcast_emits_per_second': timings['broadcast'],
+                        'keyed_emits_per_second': timings['keyed']})
+    return results
+
+if __name__ == "__main__":
+    events_log.set_level("WARNING")  # Miles de suscripciones: sin una línea de log por cada una
+    for row in benchmark():
+        mode = "con historial" if row['history'] else "modo rápido  "
+        print(f"📡 {row['subscribers']:>5} suscriptores ({mode}): "
+              f"{row['emits_per_second']:>12,.0f} emits/s | {row['callbacks_per_second']:>14,.0f} callbacks/s")
+    for row in benchmark_keyed():
+        print(f"🎯 {row['entities']:>5} entidades: difundir-y-filtrar {row['broadcast_emits_per_second']:>10,.0f} emits/s"
+              f" | por clave {row['keyed_emits_per_second']:>10,.0f} emits/s")
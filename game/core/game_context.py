@@ -2,8 +2,10 @@
 GameContext - Contenedor central de dependencias  
 SINGLE SOURCE OF TRUTH para todos los sistemas
 """
+import time
+from contextlib import contextmanager
 from typing import Dict, Any, Optional
-from game.core.event_system import event_system
+from game.core.event_system import event_system, EventTypes
 from game.core.config_manager import ConfigManager
 from game.core.action_base import ActionContext
 from game.core.logger import logger
@@ -22,10 +24,23 @@ class GameContext:
     def __init__(self):
         self.systems: Dict[str, Any] = {}
         self.event_system = event_system
-        self.config_manager = ConfigManager.get_instance()
         self._initialized = False
+        self.init_times: Dict[str, float] = {}  # Fase de initialize -> segundos (ver --profile-startup)
         logger.debug("GameContext creado")
     
+    @property
+    def config_manager(self) -> ConfigManager:
+        """El bundle de configuración se carga en el primer uso, no al importar el módulo"""
+        return ConfigManager.get_instance()
+    
+    @contextmanager
+    def _phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.init_times[name] = time.perf_counter() - start
+    
     def initialize(self):
         """Inicializa todos los sistemas en ORDEN CORRECTO"""
         if self._initialized:
@@ -33,38 +48,55 @@ class GameContext:
             
         logger.info("🔄 Inicializando GameContext...")
         
-        # FASE 1: Sistemas base (sin dependencias)
-        from game.systems.grid_system import GridSystem
-        from game.systems.turn_system import TurnSystem
-        from game.systems.movement_system import MovementSystem
+        with self._phase('config'):
+            self.config_manager.get_all_effects()
         
-        self.register_system('grid', GridSystem())
-        self.register_system('turn', TurnSystem())
-        self.register_system('movement', MovementSystem(self.get_system('grid')))
+        # FASE 1: Sistemas base (sin dependencias). Cada fase se cronometra con su import
+        with self._phase('grid'):
+            from game.systems.grid_system import GridSystem
+            self.register_system('grid', GridSystem())
+        with self._phase('turn'):
+            from game.systems.turn_system import TurnSystem
+            self.register_system('turn', TurnSystem())
+        with self._phase('movement'):
+            from game.systems.movement_system import MovementSystem
+            self.register_system('movement', MovementSystem(self.get_system('grid')))
         
-        # FASE 2: Sistemas de datos/efectos
-        from game.systems.effect_system import EffectSystem
-        from game.systems.passive_system import PassiveSystem
+        # Caché de fuentes/textos (no toca pygame hasta el primer render)
+        with self._phase('text'):
+            from game.ui.text_cache import text_cache
+            self.register_system('text', text_cache)
         
-        self.register_system('effect', EffectSystem())
-        self.register_system('passive', PassiveSystem())
+        # FASE 2: Sistemas de datos/efectos
+        with self._phase('effect'):
+            from game.systems.effect_system import EffectSystem
+            self.register_system('effect', EffectSystem())
+        with self._phase('passive'):
+            from game.systems.passive_system import PassiveSystem
+            self.register_system('passive', PassiveSystem())
         
         # FASE 3: Sistemas complejos (con todas sus dependencias)
-        from game.systems.ability_system import AbilitySystem
-        
-        self.register_system('ability', AbilitySystem(
-            self.get_system('grid'),
-            self.get_system('effect'),
-            self  # ✅ Inyectar el contexto
-        ))
+        with self._phase('ability'):
+            from game.systems.ability_system import AbilitySystem
+            self.register_system('ability', AbilitySystem(
+                self.get_system('grid'),
+                self.get_system('effect'),
+                self  # ✅ Inyectar el contexto
+            ))
         
-        # Cargar configuración de efectos
-        from game.data.effects import EFFECTS_CONFIG
-        self.get_system('effect').load_effects_config(EFFECTS_CONFIG)
+        # Cargar configuración de efectos (del bundle de configuración)
+        with self._phase('effects_config'):
+            self.get_system('effect').load_effects_config(self.config_manager.get_all_effects())
+            event_system.subscribe(EventTypes.CONFIG_RELOADED, self._on_config_reloaded)
         
         self._initialized = True
         logger.info("✅ GameContext inicializado completamente")
     
+    def _on_config_reloaded(self, data):
+        """Recarga en caliente: el registro de efectos global (del que copian los simuladores de la IA)"""
+        if data['effects']:
+            self.get_system('effect').reload_effects(self.config_manager.get_all_effects(), data['effects'])
+    
     def register_system(self, system_name: str, system_instance: Any):
         """Registra un sistema en el contexto"""
         if system_name in self.systems:
@@ -94,7 +126,8 @@ class GameContext:
             'effect_system': self.get_system('effect'),
             'game_context': self,
             'event_system': self.event_system,
-            'turn_system': self.get_system('turn')
+            'turn_system': self.get_system('turn'),
+            'grid_system': self.get_system('grid')
         }
         
         return context
@@ -3,6 +3,7 @@ Estado global persistente del juego entre escenas
 """
 from typing import List, Dict, Any
 from .event_system import event_system, EventTypes
+from .logger import logger
 
 class GameState:
     """Mantiene el estado persistente del juego"""
@@ -74,16 +75,16 @@ class GameState:
         """Desbloquea un nuevo personaje"""
         if character_name not in self.player_team:
             self.player_team.append(character_name)
-            print(f"🎉 Personaje desbloqueado: {character_name}")
+            logger.info("🎉 Personaje desbloqueado: %s", character_name)
     
     def add_to_party(self, character_name: str):
         """Añade un personaje al equipo actual"""
         if character_name in self.player_team and character_name not in self.current_party:
             if len(self.current_party) < 3:  # Máximo 3 personajes
                 self.current_party.append(character_name)
-                print(f"👥 {character_name} añadido al equipo")
+                logger.info("👥 %s añadido al equipo", character_name)
             else:
-                print("❌ Equipo completo (máximo 3 personajes)")
+                logger.info("Equipo completo (máximo 3 personajes)")
     
     def complete_level(self, level_id: int, rating: int = 3):
         """Marca un nivel como completado"""
@@ -97,21 +98,34 @@ class GameState:
             self.total_experience += exp_reward
             self.player_resources["gold"] += gold_reward
             
-            print(f"🏆 Nivel {level_id} completado!")
-            print(f"💰 +{gold_reward} oro | ⭐ +{exp_reward} experiencia")
+            logger.info("🏆 Nivel %s completado! 💰 +%s oro | ⭐ +%s experiencia", level_id, gold_reward, exp_reward)
     
     def save_game(self):
         """Guarda el estado del juego (placeholder para implementación real)"""
-        print("💾 Guardando partida...")
+        logger.info("💾 Guardando partida...")
         # Aquí iría la lógica real de guardado
         return True
     
     def load_game(self):
         """Carga el estado del juego (placeholder)"""
-        print("📂 Cargando partida...")
+        logger.info("📂 Cargando partida...")
         # Aquí iría la lógica real de carga
         return True
 
 
-# Instancia global del estado del juego
-game_state = GameState()
\ No newline at end of file
+# Instancia global del estado del juego: se crea (y suscribe sus listeners) en el primer acceso
+_game_state = None
+
+
+def get_game_state() -> GameState:
+    global _game_state
+    if _game_state is None:
+        _game_state = GameState()
+    return _game_state
+
+
+def __getattr__(name):
+    """`from game.core.game_state import game_state` sigue funcionando, pero sin crearla al importar"""
+    if name == "game_state":
+        return get_game_state()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
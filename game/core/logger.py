@@ -1,128 +1,345 @@
 """
 Sistema de logging centralizado para manejo de errores
+El hilo del juego solo encola registros; un hilo escritor los formatea,
+los imprime y los vuelca por lotes a un archivo abierto de forma persistente
+con rotación por tamaño.
+Niveles: una llamada por debajo del nivel activo cuesta un test de atributo
+(logger.debug_enabled) y el mensaje solo se formatea si pasa el filtro:
+    logger.debug("%s pierde %s", target.name, effect.name)
+    logger.debug(lambda: costoso())
+Nivel inicial: variable de entorno GAME_LOG_LEVEL (INFO por defecto; GAME_LOG_LEVEL=DEBUG
+para depurar). Los benchmarks y CLIs headless arrancan en SILENT.
+Importar el módulo no toca el disco: el directorio de logs se crea (y se
+podan los antiguos) desde el hilo escritor al escribir la primera línea.
+Benchmark: python -m game.core.logger
 """
-import traceback
-from datetime import datetime
+import atexit
 import os
+import sys
+import threading
+import time
+import weakref
+from queue import SimpleQueue, Empty
 
-class GameLogger:
-    def __init__(self, log_to_file=True):
+# Marcadores de control para el hilo escritor
+_FLUSH = "flush"
+_STOP = "stop"
+
+# Niveles (mismos valores que el módulo logging estándar)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+SILENT = 100  # Ni siquiera errores: simulaciones masivas
+
+LEVEL_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR, "SILENT": SILENT}
+
+# Loggers vivos: los ganchos de salida y de fork se registran una sola vez por proceso
+_LIVE_LOGGERS = weakref.WeakSet()
+
+
+def _close_all_loggers():
+    for live_logger in list(_LIVE_LOGGERS):
+        live_logger.close()
+
+
+def _reset_loggers_after_fork():
+    # Tras un fork (ProcessPoolExecutor) el hilo escritor no existe en el hijo
+    for live_logger in list(_LIVE_LOGGERS):
+        live_logger._reset_after_fork()
+
+
+atexit.register(_close_all_loggers)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_loggers_after_fork)
+
+
+def parse_level(level):
+    """Acepta 10/20/... o 'debug'/'INFO'/..."""
+    if isinstance(level, str):
+        try:
+            return LEVEL_NAMES[level.strip().upper()]
+        except KeyError:
+            raise ValueError(f"Nivel de log desconocido: {level}")
+    return int(level)
+
+
+def _format(message, args):
+    """Formateo diferido: solo se llega aquí si el nivel está habilitado"""
+    if callable(message):
+        message = message()
+    if args:
+        message = message % args
+    return message
+
+
+class _LogWriter(threading.Thread):
+    """
+    Hilo escritor: consume la cola por lotes, formatea las marcas de tiempo
+    (una vez por segundo) y escribe consola + archivo con una llamada por lote.
+    """
+
+    def __init__(self, owner):
+        super().__init__(name="GameLogWriter", daemon=True)
+        self.owner = owner
+        self.queue = SimpleQueue()
+        self._file = None
+        self._second = None
+        self._hms = ""
+        self._ymd_hms = ""
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+
+            console_lines = []
+            file_lines = []
+            waiters = []
+            stop = False
+            for record in batch:
+                if record[0] is _FLUSH:
+                    waiters.append(record[1])
+                    continue
+                if record[0] is _STOP:
+                    waiters.append(record[1])
+                    stop = True
+                    continue
+                created, label, icon, body, context, to_file = record
+                self._update_clock(created)
+                console_lines.append(f"{icon} [{self._hms}] {label}: {body}{context}\n")
+                if to_file:
+                    file_lines.append(f"[{self._ymd_hms}] [{label}] {body}\n")
+
+            self._emit(console_lines, file_lines)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                self._close_file()
+                return
+
+    def _update_clock(self, created):
+        second = int(created)
+        if second != self._second:
+            self._second = second
+            local = time.localtime(second)
+            self._hms = time.strftime("%H:%M:%S", local)
+            self._ymd_hms = time.strftime("%Y-%m-%d %H:%M:%S", local)
+
+    def _emit(self, console_lines, file_lines):
+        if console_lines:
+            try:
+                sys.stdout.write("".join(console_lines))
+                sys.stdout.flush()
+            except Exception:
+                pass
+        if file_lines:
+            try:
+                if self._file is None:
+                    self.owner._prepare_log_directory()
+                    self._file = open(self.owner.log_file, "a", encoding="utf-8")
+                self._file.write("".join(file_lines))
+                self._file.flush()
+                if self._file.tell() > self.owner.max_bytes:
+                    self._rotate()
+            except Exception as e:
+                sys.stdout.write(f"❌ Error escribiendo en log file: {e}\n")
+
+    def _rotate(self):
+        """game_log.txt -> game_log.txt.1 -> ... -> game_log.txt.N (se descarta el más viejo)"""
+        self._close_file()
+        path = self.owner.log_file
+        for index in range(self.owner.backup_count - 1, 0, -1):
+            source = f"{path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{path}.{index + 1}")
+        if self.owner.backup_count > 0:
+            os.replace(path, f"{path}.1")
+        self._file = open(path, "w", encoding="utf-8")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _LevelFlags:
+    """
+    Flags booleanos precalculados por nivel: comprobar si un nivel está activo
+    es leer un atributo, sin comparaciones ni llamadas
+    """
+    
+    def _refresh_flags(self):
+        level = self.get_effective_level()
+        self.debug_enabled = level <= DEBUG
+        self.info_enabled = level <= INFO
+        self.warning_enabled = level <= WARNING
+        self.error_enabled = level <= ERROR
+    
+    def is_enabled_for(self, level):
+        return parse_level(level) >= self.get_effective_level()
+
+
+class GameLogger(_LevelFlags):
+    def __init__(self, log_to_file=True, max_bytes=1_000_000, backup_count=5, level=None):
         self.error_count = 0
         self.warning_count = 0
         self.log_to_file = log_to_file
-        self.log_file = "game_log.txt"
-        
-        # Crear directorio de logs si no existe
-        if log_to_file:
+        self.log_file = os.path.join("logs", "game_log.txt") if log_to_file else "game_log.txt"
+        self._log_dir_pending = log_to_file  # Directorio y poda: a la primera escritura, no al importar
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._children = {}
+        self.set_level(level if level is not None else os.environ.get("GAME_LOG_LEVEL", INFO))
+        _LIVE_LOGGERS.add(self)  # Cierre al salir y reinicio tras fork (ganchos del módulo)
+
+    def _prepare_log_directory(self):
+        """Primera escritura a archivo (hilo escritor): crea el directorio y poda los logs antiguos"""
+        if self._log_dir_pending:
+            self._log_dir_pending = False
             self._ensure_log_directory()
             self._clear_old_logs()
-    
+
     def _ensure_log_directory(self):
         """Asegura que el directorio de logs exista"""
         log_dir = "logs"
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
-        self.log_file = os.path.join(log_dir, "game_log.txt")
-    
+
     def _clear_old_logs(self):
-        """Limpia logs muy antiguos (opcional)"""
+        """
+        Borra los game_log* que la rotación ya no gestiona (restos de otro backup_count
+        o de versiones anteriores). El activo y sus backup_count copias los gestiona _rotate
+        """
         try:
-            # Mantener solo los últimos 5 logs
-            log_dir = "logs"
+            log_dir = os.path.dirname(self.log_file) or "."
+            base = os.path.basename(self.log_file)
+            managed = {base} | {f"{base}.{index}" for index in range(1, self.backup_count + 1)}
             if os.path.exists(log_dir):
-                logs = [f for f in os.listdir(log_dir) if f.startswith("game_log")]
-                if len(logs) > 5:
-                    # Ordenar por fecha de modificación y eliminar los más viejos
-                    logs.sort(key=lambda x: os.path.getmtime(os.path.join(log_dir, x)))
-                    for old_log in logs[:-5]:
-                        os.remove(os.path.join(log_dir, old_log))
+                for name in os.listdir(log_dir):
+                    if name.startswith("game_log") and name not in managed:
+                        os.remove(os.path.join(log_dir, name))
         except Exception as e:
-            print(f"⚠️ No se pudieron limpiar logs antiguos: {e}")
-    
-    def _write_to_file(self, level, message):
-        """Escribe el log en archivo"""
-        if not self.log_to_file:
+            self.warning("No se pudieron limpiar logs antiguos: %s", e)
+
+    # ------------------------------------------------------------------
+    # Niveles y loggers por subsistema
+    # ------------------------------------------------------------------
+    def set_level(self, level):
+        """Cambia el umbral global; los subsistemas sin nivel propio lo heredan"""
+        self.level = parse_level(level)
+        self._refresh_flags()
+        for child in self._children.values():
+            child._refresh_flags()
+
+    def get_effective_level(self):
+        return self.level
+
+    def get_logger(self, name):
+        """Logger de subsistema ('combat', 'effects', 'movement', 'state'...), uno por nombre"""
+        child = self._children.get(name)
+        if child is None:
+            child = SubsystemLogger(self, name)
+            self._children[name] = child
+        return child
+
+    # ------------------------------------------------------------------
+    # Cola hacia el hilo escritor
+    # ------------------------------------------------------------------
+    def _get_writer(self):
+        writer = self._writer
+        if writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = _LogWriter(self)
+                    self._writer.start()
+                writer = self._writer
+        return writer
+
+    def _enqueue(self, label, icon, body, context=None):
+        """Lo único que paga el hilo del juego: una tupla y un put en la cola"""
+        context_text = f" | Contexto: {context}" if context else ""
+        self._get_writer().queue.put((time.time(), label, icon, body, context_text, self.log_to_file))
+
+    def flush(self, timeout=5.0):
+        """Espera a que el hilo escritor vacíe la cola"""
+        if self._writer is None or not self._writer.is_alive():
             return
-            
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] [{level}] {message}\n")
-        except Exception as e:
-            print(f"❌ Error escribiendo en log file: {e}")
-    
-    def error(self, message, exception=None, context=None):
+        done = threading.Event()
+        self._writer.queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Vacía la cola, cierra el archivo y detiene el hilo escritor"""
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        done = threading.Event()
+        writer.queue.put((_STOP, done))
+        done.wait(timeout)
+        self._writer = None
+
+    def _reset_after_fork(self):
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    def error(self, message, *args, exception=None, context=None):
         """Log de errores críticos"""
         self.error_count += 1
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        log_message = f"❌ [{timestamp}] ERROR: {message}"
-        if context:
-            log_message += f" | Contexto: {context}"
-        
-        print(log_message)
-        
+        if not self.error_enabled:
+            return
+        message = _format(message, args)
+
         if exception:
-            print(f"    Exception: {exception}")
-            traceback.print_exc()
-            # Guardar traceback completo en archivo
-            if self.log_to_file:
-                tb_str = traceback.format_exc()
-                self._write_to_file("ERROR", f"{message} | Exception: {exception}\n{tb_str}")
+            # El traceback solo existe en este hilo: se formatea aquí (import local: arranque más ligero)
+            import traceback
+            tb_str = traceback.format_exc()
+            self._enqueue("ERROR", "❌", f"{message} | Exception: {exception}\n{tb_str}", context)
         else:
-            self._write_to_file("ERROR", message)
-    
-    def warning(self, message, context=None):
+            self._enqueue("ERROR", "❌", message, context)
+
+    def warning(self, message, *args, context=None):
         """Log de advertencias"""
         self.warning_count += 1
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        log_message = f"⚠️ [{timestamp}] WARNING: {message}"
-        if context:
-            log_message += f" | Contexto: {context}"
-        
-        print(log_message)
-        self._write_to_file("WARNING", message)
-    
-    def info(self, message, context=None):
+        if self.warning_enabled:
+            self._enqueue("WARNING", "⚠️", _format(message, args), context)
+
+    def info(self, message, *args, context=None):
         """Log informativo"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        log_message = f"ℹ️ [{timestamp}] INFO: {message}"
-        if context:
-            log_message += f" | Contexto: {context}"
-        
-        print(log_message)
-        self._write_to_file("INFO", message)
-    
-    def debug(self, message, context=None):
+        if self.info_enabled:
+            self._enqueue("INFO", "ℹ️", _format(message, args), context)
+
+    def debug(self, message, *args, context=None):
         """Log de depuración"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        log_message = f"🐛 [{timestamp}] DEBUG: {message}"
-        if context:
-            log_message += f" | Contexto: {context}"
-        
-        print(log_message)
-        self._write_to_file("DEBUG", message)
-    
+        if self.debug_enabled:
+            self._enqueue("DEBUG", "🐛", _format(message, args), context)
+
     def ability_used(self, caster, ability_name, target=None, success=True):
-        """Log especializado para uso de habilidades"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        """Log especializado para uso de habilidades (nivel INFO)"""
+        if not self.info_enabled:
+            return
         status = "✅" if success else "❌"
-        
-        message = f"{status} [{timestamp}] ABILITY: {caster.name} -> {ability_name}"
+
+        message = f"{caster.name} -> {ability_name}"
         if target:
             message += f" -> {target.name}"
-        
-        print(message)
-        self._write_to_file("ABILITY", message)
-    
+
+        self._enqueue("ABILITY", status, message)
+
     def combat_event(self, event_type, attacker=None, target=None, damage=0, healing=0):
-        """Log especializado para eventos de combate"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        message = f"⚔️ [{timestamp}] COMBAT: {event_type}"
+        """Log especializado para eventos de combate (nivel INFO)"""
+        if not self.info_enabled:
+            return
+        message = f"{event_type}"
         if attacker:
             message += f" | Atacante: {attacker.name}"
         if target:
@@ -131,39 +348,177 @@ class GameLogger:
             message += f" | Daño: {damage}"
         if healing > 0:
             message += f" | Curación: {healing}"
-        
-        print(message)
-        self._write_to_file("COMBAT", message)
-    
+
+        self._enqueue("COMBAT", "⚔️", message)
+
     def state_change(self, from_state, to_state, entity=None):
-        """Log especializado para cambios de estado"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        message = f"🔄 [{timestamp}] STATE: {from_state} → {to_state}"
+        """Log especializado para cambios de estado (nivel INFO)"""
+        if not self.info_enabled:
+            return
+        message = f"{from_state} → {to_state}"
         if entity:
             message += f" | Entidad: {entity.name}"
-        
-        print(message)
-        self._write_to_file("STATE", message)
-    
+
+        self._enqueue("STATE", "🔄", message)
+
     def get_stats(self):
         """Obtiene estadísticas del logging"""
         return {
             "errors": self.error_count,
             "warnings": self.warning_count,
+            "level": self.level,
             "log_file": self.log_file if self.log_to_file else "No file logging"
         }
-    
+
     def reset_stats(self):
         """Reinicia las estadísticas de logging"""
         self.error_count = 0
         self.warning_count = 0
 
+
+
+class SubsystemLogger(_LevelFlags):
+    """
+    Logger de un subsistema: comparte cola, archivo y contadores con el logger
+    raíz, y puede tener su propio nivel (p. ej. movement en WARNING y combat en DEBUG)
+    """
+
+    def __init__(self, root, name):
+        self.root = root
+        self.name = name
+        self.level = None  # None = hereda del logger raíz
+        self._labels = {lvl: f"{label} {name}" for lvl, label in
+                        ((DEBUG, "DEBUG"), (INFO, "INFO"), (WARNING, "WARNING"), (ERROR, "ERROR"))}
+        self._refresh_flags()
+
+    def set_level(self, level):
+        """Nivel propio del subsistema; None vuelve a heredar el del raíz"""
+        self.level = parse_level(level) if level is not None else None
+        self._refresh_flags()
+
+    def get_effective_level(self):
+        return self.level if self.level is not None else self.root.level
+
+    def error(self, message, *args, exception=None, context=None):
+        self.root.error_count += 1
+        if not self.error_enabled:
+            return
+        message = _format(message, args)
+        if exception:
+            import traceback
+            message = f"{message} | Exception: {exception}\n{traceback.format_exc()}"
+        self.root._enqueue(self._labels[ERROR], "❌", message, context)
+
+    def warning(self, message, *args, context=None):
+        self.root.warning_count += 1
+        if self.warning_enabled:
+            self.root._enqueue(self._labels[WARNING], "⚠️", _format(message, args), context)
+
+    def info(self, message, *args, context=None):
+        if self.info_enabled:
+            self.root._enqueue(self._labels[INFO], "ℹ️", _format(message, args), context)
+
+    def debug(self, message, *args, context=None):
+        if self.debug_enabled:
+            self.root._enqueue(self._labels[DEBUG], "🐛", _format(message, args), context)
+
+
 logger = GameLogger(log_to_file=True)
 
+# Loggers por subsistema (heredan el nivel de logger salvo set_level propio)
+combat_log = logger.get_logger("combat")
+effects_log = logger.get_logger("effects")
+movement_log = logger.get_logger("movement")
+state_log = logger.get_logger("state")
+events_log = logger.get_logger("events")
+turn_log = logger.get_logger("turn")
+config_log = logger.get_logger("config")
+ui_log = logger.get_logger("ui")
+
 def debug_quick(msg, value=None):
     """Función rápida para debug"""
     if value is not None:
-        logger.debug(f"{msg}: {value}")
+        logger.debug("%s: %s", msg, value)
     else:
-        logger.debug(msg)
\ No newline at end of file
+        logger.debug(msg)
+
+
+def benchmark(calls=10000, log_dir=None):
+    """
+    Coste por llamada en el hilo del juego: logger anterior (print + reabrir el
+    archivo en cada línea) frente al logger con cola y hilo escritor, y coste
+    de una llamada debug descartada por nivel (f-string vs %-diferido vs guarda)
+    """
+    import tempfile
+    from datetime import datetime
+
+    log_dir = log_dir or tempfile.mkdtemp(prefix="game_log_bench_")
+    legacy_path = os.path.join(log_dir, "legacy_log.txt")
+
+    def legacy_info(message):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        print(f"ℹ️ [{timestamp}] INFO: {message}")
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(legacy_path, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [INFO] {message}\n")
+
+    bench_logger = GameLogger(log_to_file=False, level=INFO)
+    bench_logger.log_to_file = True
+    bench_logger.log_file = os.path.join(log_dir, "async_log.txt")
+
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        start = time.perf_counter()
+        for i in range(calls):
+            legacy_info(f"Mensaje de prueba {i}")
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(calls):
+            bench_logger.info(f"Mensaje de prueba {i}")
+        enqueue = time.perf_counter() - start
+        bench_logger.close()
+        drained = time.perf_counter() - start
+
+        # debug deshabilitado (nivel INFO): nada llega a la cola
+        target = {'name': 'Dummy', 'hp': 100}
+        start = time.perf_counter()
+        for i in range(calls):
+            bench_logger.debug(f"{target['name']} recibe {i} daño (hp {target['hp']})")
+        disabled_fstring = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(calls):
+            bench_logger.debug("%s recibe %d daño (hp %d)", target['name'], i, target['hp'])
+        disabled_lazy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(calls):
+            if bench_logger.debug_enabled:
+                bench_logger.debug(f"{target['name']} recibe {i} daño (hp {target['hp']})")
+        disabled_guard = time.perf_counter() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    return {
+        'calls': calls,
+        'legacy_us_per_call': legacy / calls * 1e6,
+        'async_us_per_call': enqueue / calls * 1e6,
+        'async_total_with_drain_s': drained,
+        'disabled_fstring_ns_per_call': disabled_fstring / calls * 1e9,
+        'disabled_lazy_ns_per_call': disabled_lazy / calls * 1e9,
+        'disabled_guard_ns_per_call': disabled_guard / calls * 1e9,
+        'log_dir': log_dir
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark()
+    print(f"📝 {stats['calls']} llamadas: anterior {stats['legacy_us_per_call']:.1f}µs/llamada → "
+          f"cola {stats['async_us_per_call']:.2f}µs/llamada "
+          f"(escritor vacía todo en {stats['async_total_with_drain_s']:.2f}s)")
+    print(f"🔇 debug deshabilitado: f-string {stats['disabled_fstring_ns_per_call']:.0f}ns | "
+          f"%-diferido {stats['disabled_lazy_ns_per_call']:.0f}ns | "
+          f"guarda debug_enabled {stats['disabled_guard_ns_per_call']:.0f}ns")
@@ -0,0 +1,106 @@
+"""
+Perfil de arranque: python main.py --profile-startup
+ImportProfiler se instala en sys.meta_path antes de importar el juego y cronometra
+la ejecución de cada módulo (tiempo propio y acumulado, como python -X importtime).
+El informe añade las fases de GameContext.initialize y los hitos del arranque
+(pygame, escena, primer frame). Los imports desde otros hilos no se separan.
+"""
+import sys
+import time
+
+
+class _TimedLoader:
+    """Envuelve el loader real: solo exec_module se cronometra, el resto se delega"""
+    
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+    
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+    
+    def exec_module(self, module):
+        self.profiler._exec(self.loader, module)
+    
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportProfiler:
+    """Finder de sys.meta_path que no encuentra nada propio: pide el spec al resto y envuelve su loader"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.records = []      # (módulo, propio, acumulado) en segundos, en orden de fin de import
+        self.milestones = []   # (hito, segundos desde start)
+        self._children = []    # Tiempo de imports anidados por nivel de la pila
+        self._finding = set()
+    
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+    
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+    
+    def find_spec(self, name, path=None, target=None):
+        if name in self._finding:
+            return None
+        self._finding.add(name)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.discard(name)
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+    
+    def _exec(self, loader, module):
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += total
+            self.records.append((module.__name__, total - children, total))
+            # El módulo queda con su loader real (importlib.resources, pkgutil...)
+            module.__loader__ = loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = loader
+    
+    def mark(self, milestone: str):
+        """Hito del arranque (tiempo desde que se instaló el perfilador)"""
+        self.milestones.append((milestone, time.perf_counter() - self.start))
+    
+    def report(self, phases=None, top=15) -> str:
+        """Informe de texto: módulos más lentos (tiempo propio), fases de initialize e hitos"""
+        total = sum(own for _, own, _ in self.records)
+        game_total = sum(own for name, own, _ in self.records if name == 'game' or name.startswith('game.'))
+        lines = [f"⏱️  Arranque: {len(self.records)} módulos importados en {total * 1000:.1f}ms "
+                 f"({game_total * 1000:.1f}ms en game.*)",
+                 f"   {'propio':>9} {'acumulado':>10}  módulo"]
+        for name, own, cumulative in sorted(self.records, key=lambda record: record[1], reverse=True)[:top]:
+            lines.append(f"   {own * 1000:7.2f}ms {cumulative * 1000:8.2f}ms  {name}")
+        
+        if phases:
+            lines.append(f"🧩 GameContext.initialize: {sum(phases.values()) * 1000:.1f}ms")
+            for phase, seconds in phases.items():
+                lines.append(f"   {seconds * 1000:7.2f}ms  {phase}")
+        
+        if self.milestones:
+            lines.append("🏁 Hitos (desde el inicio):")
+            for milestone, seconds in self.milestones:
+                lines.append(f"   {seconds * 1000:7.1f}ms  {milestone}")
+        return "\n".join(lines)
@@ -1,8 +1,22 @@
 from .game_entity import GameEntity
 from game.core.event_system import event_system, EventTypes
 from game.core.config_manager import ConfigManager
+from game.core.logger import logger, combat_log
+from game.entities.entity_store import entity_store, EnergyView
+
+# Fuentes de energía por defecto: compartidas por todas las entidades sin config (solo lectura)
+DEFAULT_ENERGY_SOURCES = {
+    'on_hit': {'base': 8, 'type': 'flat'},
+    'on_take_damage': {'base': 5, 'type': 'flat'},
+    'on_ability_use': {'base': 10, 'type': 'flat'},
+    'on_kill': {'base': 25, 'type': 'flat'},
+    'per_turn': {'base': 5, 'type': 'flat'}
+}
 
 class BattleEntity(GameEntity):
+    __slots__ = ('character_id', 'character_class', 'abilities_config', 'passives', 'base_movement',
+                 '_energy_listeners', 'energy_stats', 'battle_scene')
+    
     def __init__(self, name=None, position=None, team="player", stats=None, 
                  character_class="damage", abilities_config=None,
                  character_id=None):
@@ -20,7 +34,7 @@ class BattleEntity(GameEntity):
                 abilities_config = config.get('abilities', abilities_config)
                 self.character_id = character_id  # Guardar para referencia
                 config_loaded = True
-                print(f"✅ {name} cargado desde configuración")
+                logger.debug("✅ %s cargado desde configuración", name)
         
         # Validaciones básicas
         if name is None:
@@ -29,7 +43,7 @@ class BattleEntity(GameEntity):
             position = (0, 0)
         
         # El resto del constructor igual...
-        extended_stats = stats or {}
+        extended_stats = dict(stats or {})  # La config es de solo lectura
         if 'max_energy' not in extended_stats:
             extended_stats['max_energy'] = 100
             
@@ -41,13 +55,12 @@ class BattleEntity(GameEntity):
         self.pending_post_action_move = False
         self.post_action_move_range = 0
         self.base_movement = 3
+        self._energy_listeners = []
+        self.battle_scene = None
         
-        # Sistema de energía
-        self.energy_stats = {
-            'current_energy': 0,
-            'max_energy': self.stats.get('max_energy', 100),
-            'energy_sources': self.setup_energy_sources()
-        }
+        # Sistema de energía (energía en columnas; energy_sources compartido con la config, solo lectura)
+        self.energy_stats = EnergyView(entity_store, self._row, 0, self.stats.get('max_energy', 100),
+                                       self.setup_energy_sources())
         
         # Configurar habilidades y pasivas
         self.setup_abilities()
@@ -59,17 +72,27 @@ class BattleEntity(GameEntity):
         if hasattr(self, 'character_id'):
             config = ConfigManager.get_instance().get_character_config(self.character_id)
             if config and 'energy_sources' in config:
-                return config['energy_sources'].copy()
+                return config['energy_sources']
         
         # Fallback a valores por defecto
-        return {
-            'on_hit': {'base': 8, 'type': 'flat'},
-            'on_take_damage': {'base': 5, 'type': 'flat'},  
-            'on_ability_use': {'base': 10, 'type': 'flat'},
-            'on_kill': {'base': 25, 'type': 'flat'},
-            'per_turn': {'base': 5, 'type': 'flat'}
-        }
+        return DEFAULT_ENERGY_SOURCES
 
+    @property
+    def pending_post_action_move(self):
+        return bool(entity_store.pending_move[self._row])
+    
+    @pending_post_action_move.setter
+    def pending_post_action_move(self, value):
+        entity_store.pending_move[self._row] = 1 if value else 0
+    
+    @property
+    def post_action_move_range(self):
+        return entity_store.pending_move_range[self._row]
+    
+    @post_action_move_range.setter
+    def post_action_move_range(self, value):
+        entity_store.pending_move_range[self._row] = value
+    
     @property
     def movement_range(self):
         """Rango de movimiento calculado desde velocidad"""
@@ -77,43 +100,53 @@ class BattleEntity(GameEntity):
         return self.base_movement + speed_bonus
     
     def setup_abilities(self):
-        """Configura habilidades con import local para evitar circularidad"""
+        """
+        Configura habilidades con import local para evitar circularidad.
+        Los prototipos se comparten entre entidades; aquí solo se crea el estado de cooldown
+        """
         from game.systems.ability_factory import AbilityFactory
         
+        owner_id = getattr(self, 'character_id', None) or self.character_class
         for ability_key, ability_config in self.abilities_config.items():
-            ability_config_with_key = ability_config.copy()
-            ability_config_with_key['key'] = ability_key
-            ability_instance = AbilityFactory.create_ability(ability_config_with_key)
-            self.actions[ability_key] = ability_instance
+            self.actions[ability_key] = AbilityFactory.create_state(owner_id, ability_key, ability_config,
+                                                                    self.turn_clock)
         
-        print(f"🎯 {self.name} - Habilidades: {list(self.actions.keys())}")
+        logger.debug("🎯 %s - Habilidades: %s", self.name, list(self.actions))
     
     def setup_energy_listeners(self):
-        """Listeners simplificados para ganar energía"""
+        """Listeners simplificados para ganar energía - suscritos por clave a esta entidad"""
         def on_deal_damage(data):
-            if data.get('attacker') == self:
-                base_energy = self.energy_stats['energy_sources']['on_hit']['base']
-                self.gain_energy(base_energy, "golpear")
+            base_energy = self.energy_stats['energy_sources']['on_hit']['base']
+            self.gain_energy(base_energy, "golpear")
         
         def on_take_damage(data):
-            if data.get('target') == self:
-                base_energy = self.energy_stats['energy_sources']['on_take_damage']['base']
-                self.gain_energy(base_energy, "recibir_daño")
+            base_energy = self.energy_stats['energy_sources']['on_take_damage']['base']
+            self.gain_energy(base_energy, "recibir_daño")
         
         def on_ability_used(data):
-            if data.get('caster') == self and not data.get('is_ultimate', False):
+            if not data.get('is_ultimate', False):
                 base_energy = self.energy_stats['energy_sources']['on_ability_use']['base']
                 self.gain_energy(base_energy, "usar_habilidad")
         
         def on_turn_start(data):
-            if data.get('entity') == self:
-                base_energy = self.energy_stats['energy_sources']['per_turn']['base']
-                self.gain_energy(base_energy, "inicio_turno")
+            base_energy = self.energy_stats['energy_sources']['per_turn']['base']
+            self.gain_energy(base_energy, "inicio_turno")
         
-        event_system.register(EventTypes.ENTITY_DAMAGED, on_deal_damage)
-        event_system.register(EventTypes.ENTITY_DAMAGED, on_take_damage)
-        event_system.register(EventTypes.ABILITY_USED, on_ability_used)
-        event_system.register(EventTypes.TURN_STARTED, on_turn_start)
+        # (evento, campo de data que debe ser esta entidad, callback)
+        self._energy_listeners = [
+            (EventTypes.ENTITY_DAMAGED, 'attacker', on_deal_damage),
+            (EventTypes.ENTITY_DAMAGED, 'target', on_take_damage),
+            (EventTypes.ABILITY_USED, 'caster', on_ability_used),
+            (EventTypes.TURN_STARTED, 'entity', on_turn_start),
+        ]
+        for event_type, field, callback in self._energy_listeners:
+            event_system.subscribe_keyed(event_type, field, self, callback)
+    
+    def remove_energy_listeners(self):
+        """Desuscribe los listeners de energía (al morir o al descartar la batalla)"""
+        for event_type, field, callback in self._energy_listeners:
+            event_system.unsubscribe_keyed(event_type, field, self, callback)
+        self._energy_listeners = []
     
     def gain_energy(self, amount, source="unknown"):
         old_energy = self.energy_stats['current_energy']
@@ -122,7 +155,7 @@ class BattleEntity(GameEntity):
         
         actual_gain = new_energy - old_energy
         if actual_gain > 0:
-            print(f"⚡ {self.name} +{actual_gain} energía ({source})")
+            combat_log.debug("⚡ %s +%s energía (%s)", self.name, actual_gain, source)
             
             # Emitir evento para UI
             event_system.emit(EventTypes.ENERGY_CHANGED, {
@@ -140,7 +173,7 @@ class BattleEntity(GameEntity):
     def consume_ultimate_energy(self, energy_cost):
         if self.energy_stats['current_energy'] >= energy_cost:
             self.energy_stats['current_energy'] -= energy_cost
-            print(f"🔥 {self.name} consumió {energy_cost} de energía!")
+            combat_log.info("🔥 %s consumió %s de energía!", self.name, energy_cost)
             return True
         return False
     
@@ -151,11 +184,8 @@ class BattleEntity(GameEntity):
         return self.energy_stats['current_energy']
     
     def reset_turn(self):
-        """Reset completo del turno"""
-        self.has_moved = False
-        self.has_acted = False
-        self.pending_post_action_move = False
-        self.post_action_move_range = 0
+        """Reset completo del turno (movimiento, acción y movimiento post-acción)"""
+        entity_store.reset_turn((self._row,))
     
     def basic_attack(self, target):
         """Ataque básico usando el sistema de habilidades"""
@@ -165,10 +195,11 @@ class BattleEntity(GameEntity):
             return self.actions["basic_attack"].execute(context)
         else:
             # Fallback
-            damage = max(1, self.stats['attack'] - target.stats['defense'] // 2)
+            from game.systems.formulas import BASE_DAMAGE
+            damage = BASE_DAMAGE.damage(self.stats, target.stats)
             target.stats['current_hp'] -= damage
             self.has_acted = True
-            print(f"⚔️ {self.name} atacó a {target.name} por {damage} daño!")
+            combat_log.info("⚔️ %s atacó a %s por %s daño!", self.name, target.name, damage)
             return True
     
     def get_character_info(self):
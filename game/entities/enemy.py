@@ -1,8 +1,27 @@
 from game.entities.battle_entity import BattleEntity
 
+# Habilidades de todos los enemigos: un único dict compartido (solo lectura)
+ENEMY_ABILITIES = {
+    "basic_attack": {
+        "name": "Ataque Básico",
+        "cost_ph": 0,
+        "range": 1,
+        "selection_mode": "enemy",
+        "effects": [
+            {
+                "type": "damage",
+                "multiplier": 1.0,
+                "damage_type": "physical"
+            }
+        ]
+    }
+}
+
 class Enemy(BattleEntity):  # 🆕 HEREDA DE BATTLEENTITY
     """Enemigo - ahora usa BattleEntity unificada"""
     
+    __slots__ = ()
+    
     def __init__(self, position, team="enemy", name="Enemigo"):
         # 🎯 CONSTRUCTOR SIMPLIFICADO - BattleEntity maneja todo
         super().__init__(
@@ -28,22 +47,8 @@ class Enemy(BattleEntity):  # 🆕 HEREDA DE BATTLEENTITY
         }
     
     def _get_enemy_abilities(self):
-        """Habilidades básicas para enemigos"""
-        return {
-            "basic_attack": {
-                "name": "Ataque Básico",
-                "cost_ph": 0,
-                "range": 1,
-                "selection_mode": "enemy",
-                "effects": [
-                    {
-                        "type": "damage",
-                        "multiplier": 1.0,
-                        "damage_type": "physical"
-                    }
-                ]
-            }
-        }
+        """Habilidades básicas para enemigos (compartidas, solo lectura)"""
+        return ENEMY_ABILITIES
     
     def setup_energy_listeners(self):
         """Enemigos no necesitan listeners de energía"""
@@ -0,0 +1,338 @@
+"""
+Almacén de entidades en columnas (struct-of-arrays)
+Los stats numéricos, la energía, la posición, el equipo y las banderas del
+turno de todas las entidades viven en arrays tipados contiguos, una fila por
+entidad (los stats, en un bloque int64 filas x stats). GameEntity solo guarda su número de fila: entity.stats y
+entity.energy_stats son vistas con interfaz de diccionario sobre esa fila, así
+que el código existente (stats['attack'], stats.get(...)) sigue funcionando.
+Las operaciones en bloque (reinicio de turno, totales por equipo) recorren
+arrays; con NumPy instalado column_view() los expone sin copiar.
+Benchmark: python -m game.entities.entity_store
+"""
+from array import array
+from collections.abc import MutableMapping
+
+try:
+    import numpy
+except ImportError:  # NumPy es opcional: sin él las operaciones en bloque usan los arrays
+    numpy = None
+
+# Stats con hueco propio; cualquier otro stat (o un valor no entero) va al diccionario extra de la fila
+STAT_COLUMNS = ('max_hp', 'current_hp', 'max_ph', 'current_ph', 'attack', 'defense', 'speed', 'max_energy')
+STAT_INDEX = {name: i for i, name in enumerate(STAT_COLUMNS)}
+STRIDE = len(STAT_COLUMNS)
+ABSENT = -2 ** 63  # Marca de "stat no definido" en el bloque int64
+_ABSENT_ROW = array('q', [ABSENT] * STRIDE)
+
+
+class EntityStore:
+    """
+    Arrays tipados con una fila por entidad viva; las filas liberadas se reutilizan.
+    Los stats forman un bloque int64 de STRIDE valores por fila (una matriz filas x stats):
+    capturar o restaurar una fila es un slice y con NumPy cada stat es una columna.
+    """
+    
+    def __init__(self):
+        self.stats = array('q')
+        self.energy = array('q')
+        self.max_energy = array('q')
+        self.x = array('i')
+        self.y = array('i')
+        self.team = array('b')
+        self.moved = array('B')
+        self.acted = array('B')
+        self.pending_move = array('B')
+        self.pending_move_range = array('i')
+        self.extra = []  # Por fila: dict de stats fuera del bloque, o None
+        self._team_codes = {}
+        self._team_names = []
+        self._free = []
+        self.live = 0
+    
+    def __len__(self):
+        return self.live
+    
+    # ------------------------------------------------------------------
+    # Filas
+    # ------------------------------------------------------------------
+    def allocate(self) -> int:
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = len(self.x)
+            self.stats.extend(_ABSENT_ROW)
+            for column in (self.energy, self.max_energy):
+                column.append(0)
+            for column in (self.x, self.y):
+                column.append(-1)
+            for column in (self.team, self.moved, self.acted, self.pending_move):
+                column.append(0)
+            self.pending_move_range.append(0)
+            self.extra.append(None)
+        self.live += 1
+        return row
+    
+    def release(self, row):
+        """Devuelve la fila al almacén (al destruirse la entidad)"""
+        base = row * STRIDE
+        self.stats[base:base + STRIDE] = _ABSENT_ROW
+        self.energy[row] = self.max_energy[row] = 0
+        self.x[row] = self.y[row] = -1
+        self.team[row] = self.moved[row] = self.acted[row] = self.pending_move[row] = 0
+        self.pending_move_range[row] = 0
+        self.extra[row] = None
+        self._free.append(row)
+        self.live -= 1
+    
+    def team_code(self, team) -> int:
+        code = self._team_codes.get(team)
+        if code is None:
+            code = self._team_codes[team] = len(self._team_names)
+            self._team_names.append(team)
+        return code
+    
+    def team_name(self, code):
+        return self._team_names[code]
+    
+    def capture_row(self, row):
+        """Estado de la fila como tupla plana (snapshots): stats, energía, flags del turno y extra"""
+        base = row * STRIDE
+        extra = self.extra[row]
+        return (self.stats[base:base + STRIDE], self.energy[row], self.moved[row], self.acted[row],
+                self.pending_move[row], self.pending_move_range[row], dict(extra) if extra else None)
+    
+    def restore_row(self, row, captured):
+        stats, energy, moved, acted, pending, pending_range, extra = captured
+        base = row * STRIDE
+        self.stats[base:base + STRIDE] = stats
+        self.energy[row] = energy
+        self.moved[row] = moved
+        self.acted[row] = acted
+        self.pending_move[row] = pending
+        self.pending_move_range[row] = pending_range
+        self.extra[row] = dict(extra) if extra else None
+    
+    # ------------------------------------------------------------------
+    # Operaciones en bloque
+    # ------------------------------------------------------------------
+    def reset_turn(self, rows):
+        """Reinicio de turno de varias entidades: banderas de movimiento/acción y movimiento post-acción"""
+        moved, acted, pending, pending_range = self.moved, self.acted, self.pending_move, self.pending_move_range
+        for row in rows:
+            moved[row] = acted[row] = pending[row] = 0
+            pending_range[row] = 0
+    
+    def totals_by_team(self, rows, stat='current_hp'):
+        """Suma de un stat por equipo (los valores negativos cuentan como 0)"""
+        stats, offset, team = self.stats, STAT_INDEX[stat], self.team
+        totals = {}
+        for row in rows:
+            value = stats[row * STRIDE + offset]
+            if value == ABSENT:
+                value = (self.extra[row] or {}).get(stat, 0)
+            code = team[row]
+            totals[code] = totals.get(code, 0) + max(0, value)
+        return {self._team_names[code]: total for code, total in totals.items()}
+    
+    def column_view(self, name):
+        """
+        Vista NumPy sin copia de un stat (columna de la matriz filas x stats) o de otro
+        array por nombre ('energy', 'x', 'team'...). Sin NumPy, una copia en array.
+        Mientras la vista exista el array no puede crecer: soltarla antes de crear entidades
+        """
+        if name in STAT_INDEX:
+            if numpy is None:
+                return self.stats[STAT_INDEX[name]::STRIDE]
+            block = numpy.frombuffer(self.stats, dtype=numpy.int64).reshape(-1, STRIDE)
+            return block[:, STAT_INDEX[name]]
+        column = getattr(self, name)
+        if numpy is None:
+            return column
+        return numpy.frombuffer(column, dtype=numpy.dtype(column.typecode))
+
+
+class StatsView(MutableMapping):
+    """entity.stats: diccionario sobre la fila de la entidad en el almacén"""
+    
+    __slots__ = ('_store', '_row', '_base', '_stats')
+    
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+        self._base = row * STRIDE
+        self._stats = store.stats
+    
+    def __getitem__(self, key):
+        offset = STAT_INDEX.get(key)
+        if offset is not None:
+            value = self._stats[self._base + offset]
+            if value != ABSENT:
+                return value
+        extra = self._store.extra[self._row]
+        if extra is None:
+            raise KeyError(key)
+        return extra[key]
+    
+    def get(self, key, default=None):
+        offset = STAT_INDEX.get(key)
+        if offset is not None:
+            value = self._stats[self._base + offset]
+            if value != ABSENT:
+                return value
+        extra = self._store.extra[self._row]
+        return extra.get(key, default) if extra else default
+    
+    def __setitem__(self, key, value):
+        offset = STAT_INDEX.get(key)
+        extra = self._store.extra[self._row]
+        if offset is not None and type(value) is int and value != ABSENT:
+            self._stats[self._base + offset] = value
+            if extra and key in extra:
+                del extra[key]
+            return
+        # Stat sin hueco o valor no entero (p. ej. un modificador decimal): diccionario extra
+        if offset is not None:
+            self._stats[self._base + offset] = ABSENT
+        if extra is None:
+            extra = self._store.extra[self._row] = {}
+        extra[key] = value
+    
+    def __delitem__(self, key):
+        offset = STAT_INDEX.get(key)
+        extra = self._store.extra[self._row]
+        if offset is not None and self._stats[self._base + offset] != ABSENT:
+            self._stats[self._base + offset] = ABSENT
+            return
+        if not extra or key not in extra:
+            raise KeyError(key)
+        del extra[key]
+    
+    def __contains__(self, key):
+        offset = STAT_INDEX.get(key)
+        if offset is not None and self._stats[self._base + offset] != ABSENT:
+            return True
+        extra = self._store.extra[self._row]
+        return bool(extra) and key in extra
+    
+    def __iter__(self):
+        stats, base = self._stats, self._base
+        for offset, name in enumerate(STAT_COLUMNS):
+            if stats[base + offset] != ABSENT:
+                yield name
+        extra = self._store.extra[self._row]
+        if extra:
+            yield from list(extra)
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def copy(self):
+        return dict(self.items())
+    
+    def clear(self):
+        self._stats[self._base:self._base + STRIDE] = _ABSENT_ROW
+        self._store.extra[self._row] = None
+    
+    def __repr__(self):
+        return repr(self.copy())
+
+
+class EnergyView(MutableMapping):
+    """entity.energy_stats: energía actual y máxima en columnas; energy_sources compartido con la config"""
+    
+    __slots__ = ('_store', '_row', 'energy_sources')
+    
+    def __init__(self, store, row, current_energy, max_energy, energy_sources):
+        self._store = store
+        self._row = row
+        self.energy_sources = energy_sources
+        store.energy[row] = current_energy
+        store.max_energy[row] = max_energy
+    
+    def __getitem__(self, key):
+        if key == 'current_energy':
+            return self._store.energy[self._row]
+        if key == 'max_energy':
+            return self._store.max_energy[self._row]
+        if key == 'energy_sources':
+            return self.energy_sources
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        if key == 'current_energy':
+            self._store.energy[self._row] = int(value)
+        elif key == 'max_energy':
+            self._store.max_energy[self._row] = int(value)
+        elif key == 'energy_sources':
+            self.energy_sources = value
+        else:
+            raise KeyError(key)
+    
+    def __delitem__(self, key):
+        raise TypeError("energy_stats tiene claves fijas")
+    
+    def __iter__(self):
+        return iter(('current_energy', 'max_energy', 'energy_sources'))
+    
+    def __len__(self):
+        return 3
+    
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+# Instancia global
+entity_store = EntityStore()
+
+
+def benchmark(n_entities=1000, rounds=200) -> dict:
+    """Memoria por entidad y coste del reinicio de turno: bucle por entidad frente a columnas"""
+    import gc
+    import time
+    import tracemalloc
+    from game.core.logger import logger, SILENT
+    from game.entities.enemy import Enemy
+    from game.entities.entity_store import entity_store as store  # La del paquete, no la de __main__
+    from game.entities.game_entity import GameEntity
+    
+    logger.set_level(SILENT)
+    GameEntity("calentamiento", (0, 0))
+    Enemy((0, 0))
+    
+    memory = {}
+    for name, make in (("GameEntity", lambda i: GameEntity("e", (i % 10, i // 10))),
+                       ("Enemy", lambda i: Enemy((i % 10, i // 10)))):
+        gc.collect()
+        tracemalloc.start()
+        entities = [make(i) for i in range(n_entities)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory[name] = current / n_entities
+        del entities
+    
+    entities = [Enemy((i % 10, i // 10)) for i in range(n_entities)]
+    rows = [entity._row for entity in entities]
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for entity in entities:
+            entity.reset_turn()
+    loop_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        store.reset_turn(rows)
+    bulk_time = time.perf_counter() - start
+    
+    return {
+        'bytes_per_game_entity': memory["GameEntity"],
+        'bytes_per_enemy': memory["Enemy"],
+        'reset_loop_ns': loop_time / (rounds * n_entities) * 1e9,
+        'reset_bulk_ns': bulk_time / (rounds * n_entities) * 1e9
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark()
+    print(f"🧮 GameEntity {stats['bytes_per_game_entity']:.0f} B | Enemy {stats['bytes_per_enemy']:.0f} B | "
+          f"reset_turn {stats['reset_loop_ns']:.0f}ns/entidad (bucle) vs {stats['reset_bulk_ns']:.0f}ns (columnas)")
@@ -1,10 +1,20 @@
-import pygame
+from game.ui.text_cache import text_cache
+from game.core.logger import movement_log, combat_log
+from game.entities.entity_store import entity_store, StatsView
+from game.systems.turn_system import TurnClock
 
 class GameEntity:
+    # 🧮 Vista sobre una fila de entity_store: stats, banderas de turno y posición viven en columnas
+    __slots__ = ('name', 'team', '_grid', '_position', '_row', 'stats', 'actions', 'turn_clock',
+                 'color', 'size', '_sprite', '__weakref__')
+    
     def __init__(self, name, position, team="player", stats=None):
+        self._row = entity_store.allocate()
         self.name = name
+        self.team = team  # Atributo directo (se lee muchísimo); el equipo no cambia tras crear la entidad
+        entity_store.team[self._row] = entity_store.team_code(team)
+        self._grid = None  # GridSystem que indexa esta entidad (ver GridSystem.register_entity)
         self.position = position  # 🆕 CAMBIO: grid_position -> position para consistencia
-        self.team = team
         
         # 🆕 SISTEMA DE STATS UNIFICADO - todos usan diccionario
         default_stats = {
@@ -17,7 +27,8 @@ class GameEntity:
             'speed': 5
         }
         
-        self.stats = default_stats.copy()
+        self.stats = StatsView(entity_store, self._row)
+        self.stats.update(default_stats)
         if stats:
             self.stats.update(stats)  # 🎯 TUS stats únicas REEMPLAZAN los defaults
         
@@ -27,10 +38,34 @@ class GameEntity:
         
         # 🆕 SISTEMA DE ACCIONES - requerido por Character
         self.actions = {}
+        self.turn_clock = TurnClock()  # Turnos propios: cooldowns y duraciones de efectos se cuentan contra él
         
         # Visual
         self.color = (0, 255, 0) if team == "player" else (255, 0, 0)
         self.size = 40
+        self._sprite = None  # (firma, Surface) - ver _get_sprite
+    
+    def __del__(self):
+        try:
+            entity_store.release(self._row)
+        except (AttributeError, TypeError):
+            pass  # Construcción a medias o cierre del intérprete
+    
+    @property
+    def has_moved(self):
+        return bool(entity_store.moved[self._row])
+    
+    @has_moved.setter
+    def has_moved(self, value):
+        entity_store.moved[self._row] = 1 if value else 0
+    
+    @property
+    def has_acted(self):
+        return bool(entity_store.acted[self._row])
+    
+    @has_acted.setter
+    def has_acted(self, value):
+        entity_store.acted[self._row] = 1 if value else 0
     
     def add_action(self, action_key, action_instance):
         """🆕 AGREGADO: Sistema de acciones que Character espera"""
@@ -42,6 +77,23 @@ class GameEntity:
             return self.actions[action_key].execute(context)
         return False
     
+    @property
+    def position(self):
+        return self._position
+    
+    @position.setter
+    def position(self, value):
+        """Mantiene sincronizado el índice de ocupación del grid"""
+        value = tuple(value) if value is not None else None
+        old_position = getattr(self, '_position', None)
+        self._position = value
+        if value is not None:
+            entity_store.x[self._row], entity_store.y[self._row] = value
+        else:
+            entity_store.x[self._row] = entity_store.y[self._row] = -1
+        if self._grid is not None and old_position != value:
+            self._grid.on_entity_moved(self, old_position, value)
+    
     # 🆕 MÉTODOS COMPATIBILIDAD - para BattleScene existente
     @property
     def grid_position(self):
@@ -79,42 +131,63 @@ class GameEntity:
         if not self.has_moved:
             self.position = new_position
             self.has_moved = True
-            print(f"🎯 {self.name} se movió a {new_position}")
+            movement_log.info("🎯 %s se movió a %s", self.name, new_position)
             return True
         return False
     
     def basic_attack(self, target):
         if not self.has_acted:
-            damage = max(1, self.stats['attack'] - target.stats['defense'] // 2)
+            from game.systems.formulas import BASE_DAMAGE
+            damage = BASE_DAMAGE.damage(self.stats, target.stats)
             target.stats['current_hp'] -= damage
             
             # Regenerar PH
             self.stats['current_ph'] = min(self.stats['max_ph'], self.stats['current_ph'] + 25)
             
             self.has_acted = True
-            print(f"⚔️ {self.name} atacó a {target.name} por {damage} daño! +25 PH")
+            combat_log.info("⚔️ %s atacó a %s por %s daño! +25 PH", self.name, target.name, damage)
             return True
         return False
     
     def reset_turn(self):
-        self.has_moved = False
-        self.has_acted = False
+        entity_store.reset_turn((self._row,))
     
     def draw(self, screen, grid_system):
+        """Dibuja la entidad con su sprite cacheado. Retorna el rectángulo ocupado"""
         screen_pos = grid_system.get_screen_position(self.position)
-        center_x = screen_pos[0] + grid_system.cell_size // 2
-        center_y = screen_pos[1] + grid_system.cell_size // 2
+        sprite = self._get_sprite(grid_system.cell_size)
+        x = screen_pos[0] + grid_system.cell_size // 2 - sprite.get_width() // 2
+        return screen.blit(sprite, (x, screen_pos[1]))
+    
+    def _sprite_signature(self, cell_size):
+        """Todo lo que se ve en el sprite: si no cambia, no se vuelve a renderizar"""
+        return (cell_size, self.name, self.color, self.size,
+                self.stats['current_ph'], self.stats['max_ph'])
+    
+    def _get_sprite(self, cell_size):
+        signature = self._sprite_signature(cell_size)
+        if self._sprite is None or self._sprite[0] != signature:
+            self._sprite = (signature, self._render_sprite(cell_size))
+        return self._sprite[1]
+    
+    def _render_sprite(self, cell_size):
+        """Círculo, nombre y barra de PH en una Surface con alpha del tamaño de la casilla"""
+        import pygame
+        text = text_cache.render(self.name, (255, 255, 255), 24)
+        width = max(cell_size, text.get_width())
+        sprite = pygame.Surface((width, cell_size), pygame.SRCALPHA)
+        center_x = width // 2
+        center_y = cell_size // 2
         
         # Círculo del personaje
-        pygame.draw.circle(screen, self.color, (center_x, center_y), self.size // 2)
+        pygame.draw.circle(sprite, self.color, (center_x, center_y), self.size // 2)
         
         # Nombre
-        font = pygame.font.SysFont(None, 24)
-        text = font.render(self.name, True, (255, 255, 255))
-        screen.blit(text, (center_x - text.get_width() // 2, center_y - 30))
+        sprite.blit(text, (center_x - text.get_width() // 2, center_y - 30))
         
         # Barra de PH
         ph_width = 30
         ph_ratio = self.stats['current_ph'] / self.stats['max_ph']
         ph_rect = pygame.Rect(center_x - ph_width//2, center_y + 20, ph_width * ph_ratio, 5)
-        pygame.draw.rect(screen, (100, 200, 255), ph_rect)
\ No newline at end of file
+        pygame.draw.rect(sprite, (100, 200, 255), ph_rect)
+        return sprite
@@ -1,13 +1,41 @@
+import os
+import time
 import pygame
+from game.core.background_tasks import background_tasks
+from game.core.config_manager import ConfigManager
+from game.core.event_system import event_system
 from game.scenes.battle_scene import BattleScene
 
 class Game:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, profiler=None):
+        self.profiler = profiler  # ImportProfiler de --profile-startup: informe tras el primer frame
+        # Solo los subsistemas que usa el juego: pygame.init() también arrancaría audio y joystick
+        pygame.display.init()
+        pygame.font.init()
         self.screen = pygame.display.set_mode((800, 600))
         pygame.display.set_caption("Fractals - Estrategia por Turnos")
         self.clock = pygame.time.Clock()
+        
+        # 📬 Eventos diferidos: se despachan al final de cada habilidad y de cada frame
+        event_system.queued_mode = True
+        self._mark("pygame (display + font)")
         self.scene = BattleScene(self.screen)
+        self._mark("BattleScene")
+        
+        # 🎞️ Cada partida se graba como replay (GAME_REPLAY_DIR vacío lo desactiva)
+        replay_dir = os.environ.get("GAME_REPLAY_DIR", "replays")
+        if replay_dir:
+            self.scene.start_recording(os.path.join(replay_dir, f"battle_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"))
+        
+        # 🔥 Recarga en caliente de personajes y efectos al guardar: solo en desarrollo (GAME_HOT_RELOAD=1)
+        self.config_manager = ConfigManager.get_instance()
+        self.hot_reload = os.environ.get("GAME_HOT_RELOAD", "0") == "1"
+        if self.hot_reload:
+            self.config_manager.start_watching()
+    
+    def _mark(self, milestone):
+        if self.profiler is not None:
+            self.profiler.mark(milestone)
     
     def run(self):
         running = True
@@ -17,9 +45,33 @@ class Game:
                     running = False
                 self.scene.handle_event(event)
             
+            # 🧵 Resultados de trabajo en segundo plano (IA): callbacks en este hilo, entre frames
+            background_tasks.poll()
             self.scene.update()
-            self.scene.draw()
-            pygame.display.flip()
+            if self.hot_reload:
+                # Los cambios detectados por el vigilante se aplican aquí, entre frames
+                self.config_manager.reload_if_changed()
+            event_system.flush()
+            dirty_rects = self.scene.draw()
+            if dirty_rects is None:
+                pygame.display.flip()
+            elif dirty_rects:
+                # Solo se envían a pantalla las zonas que cambiaron
+                pygame.display.update(dirty_rects)
+            if self.profiler is not None:
+                self._report_startup()
+                running = False
             self.clock.tick(60)
         
-        pygame.quit()
\ No newline at end of file
+        background_tasks.cancel_all()
+        self.config_manager.stop_watching()
+        self.scene.close()
+        pygame.quit()
+    
+    def _report_startup(self):
+        """--profile-startup: informe al terminar el primer frame (y el juego se cierra)"""
+        from game.core.game_context import game_context
+        
+        self.profiler.mark("primer frame")
+        self.profiler.uninstall()
+        print(self.profiler.report(game_context.init_times))
\ No newline at end of file
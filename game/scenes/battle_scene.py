@@ -1,31 +1,31 @@
+import os
 import pygame
-from game.systems.grid_system import GridSystem
+# Los sistemas llegan de game_context; menú de habilidades y targeting se importan al abrirse
 from game.systems.turn_system import TurnSystem
-from game.systems.ability_system import AbilitySystem
-from game.systems.effect_system import EffectSystem  
-from game.systems.passive_system import PassiveSystem
-from game.systems.movement_system import MovementSystem
-from game.ui.ability_menu import AbilityMenu
+from game.systems import battle_snapshot
+from game.entities.entity_store import entity_store
+from game.ui.battle_renderer import BattleRenderer
+from game.ui.text_cache import text_cache
 from game.characters.character_factory import CharacterFactory
 from game.entities.enemy import Enemy
 from game.scenes.battle_states.idle_state import IdleState
 from game.scenes.battle_states.movement_state import MovementState
 from game.scenes.battle_states.ability_state import AbilityState
 from game.scenes.battle_states.menu_state import MenuState
-from game.scenes.battle_states.targeting_state import TargetingState
 from game.core.logger import logger
+from game.core.config_manager import ConfigManager
 
 class BattleScene:
     def __init__(self, screen, player_party_ids=None, enemy_configs=None):
         self.screen = screen
-        self.grid = GridSystem()
         self.turn_system = TurnSystem()
         
         # ✅ INICIALIZAR CONTEXTO GLOBAL PRIMERO
         from game.core.game_context import game_context
         game_context.initialize()
         
-        # ✅ OBTENER SISTEMAS DEL CONTEXTO
+        # ✅ OBTENER SISTEMAS DEL CONTEXTO (un solo grid: su índice de ocupación es compartido)
+        self.grid = game_context.get_system('grid')
         self.effect_system = game_context.get_system('effect')
         self.ability_system = game_context.get_system('ability')
         self.passive_system = game_context.get_system('passive')
@@ -34,13 +34,28 @@ class BattleScene:
         self.entities = []
         self.selected_entity = None
         self.ability_menu = None
+        self.recorder = None  # ReplayRecorder activo (ver start_recording)
+        self.enemy_ai = None  # EnemyAI (MCTS), se crea en el primer turno enemigo
+        self.enemy_ai_budget_ms = 200
+        # Procesos de búsqueda de la IA (GAME_AI_WORKERS=0: en el hilo principal)
+        self.enemy_ai_workers = int(os.environ.get("GAME_AI_WORKERS", min(4, os.cpu_count() or 1)))
+        self.enemy_thinking = False
+        self.enemy_ai_stale = False  # La config cambió: la IA se recrea en el próximo turno enemigo
         
-        logger.info("BattleScene inicializando", {"screen_size": screen.get_size()})
+        # 🖼️ Render con caché: fondo pre-horneado + rectángulos sucios
+        self.renderer = BattleRenderer(screen, self.grid)
+        self._input_received = True
+        
+        logger.info("BattleScene inicializando", context={"screen_size": screen.get_size()})
         
         # ✅ CARGAR CONFIGURACIÓN DE EFECTOS (esto debe ir DESPUÉS de crear effect_system)
-        from game.data.effects import EFFECTS_CONFIG
-        self.effect_system.load_effects_config(EFFECTS_CONFIG)
-        logger.debug("Sistema de efectos cargado", {"effects_count": len(EFFECTS_CONFIG)})
+        effects_config = ConfigManager.get_instance().get_all_effects()
+        self.effect_system.load_effects_config(effects_config)
+        logger.debug("Sistema de efectos cargado", context={"effects_count": len(effects_config)})
+        
+        # 🔥 Recarga en caliente de configs (ver ConfigManager.reload_if_changed)
+        from game.core.event_system import event_system, EventTypes
+        event_system.subscribe(EventTypes.CONFIG_RELOADED, self._on_config_reloaded)
         
         # ✅ SISTEMA DE ESTADOS
         self.states = {
@@ -59,6 +74,8 @@ class BattleScene:
             {"position": (7, 3), "name": "Orco"}, {"position": (7, 5), "name": "Goblin"}
         ]
         
+        self.player_party_ids = player_party_ids
+        self.enemy_configs = enemy_configs
         self.setup_scalable_scenario(player_party_ids, enemy_configs)
         self.turn_system.start_player_turn()
         logger.info("Escenario de batalla configurado y listo")
@@ -85,27 +102,61 @@ class BattleScene:
                       for config in enemy_configs]
             
             self.entities = player_party + enemies
+            self.grid.clear_entities()
+            self.grid.register_entities(self.entities)
             
             logger.info(
                 "Escenario configurado",
-                {
+                context={
                     "equipo": [p.name for p in player_party],
                     "enemigos": [e.name for e in enemies],
                     "total_entidades": len(self.entities)
                 }
             )
-            
+        
         except Exception as e:
             logger.error("Error configurando escenario", exception=e)
             # Fallback básico
             self.entities = []
     
+    # 🎞️ GRABACIÓN DE REPLAYS
+    def start_recording(self, path):
+        """Graba cada comando (habilidades, rutas, fin de turno) para reproducirlo con game.sim.replay"""
+        from game.sim.replay import ReplayRecorder, build_header
+        
+        self.stop_recording()
+        header = build_header(self.player_party_ids, self.enemy_configs,
+                              grid_size=(self.grid.width, self.grid.height))
+        self.recorder = ReplayRecorder(path, header, self.entities)
+        self.movement_system.recorder = self.recorder
+        self.ability_system.recorder = self.recorder
+        logger.info("🎞️ Grabando replay en %s", path)
+    
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+            self.movement_system.recorder = None
+            self.ability_system.recorder = None
+    
+    # ⏪ SNAPSHOTS: deshacer y previsualizar sin reconstruir la escena
+    def snapshot(self):
+        """Captura entidades, efectos y turno (ver game.systems.battle_snapshot)"""
+        return battle_snapshot.capture(self.entities, self.effect_system, self.turn_system)
+    
+    def restore_snapshot(self, snapshot):
+        """Vuelve al estado capturado y descarta selecciones a medias"""
+        battle_snapshot.restore(snapshot, self.effect_system, self.turn_system)
+        self.entities = list(snapshot.entities)
+        self.clear_selections()
+        self.renderer.invalidate()
+    
     # ✅ MÉTODOS DE GESTIÓN DE ESTADOS CON MANEJO DE ERRORES
     def set_state(self, new_state_name):
         """Cambia al estado especificado - CON MANEJO DE ERRORES"""
         try:
             if new_state_name not in self.states or self.states[new_state_name] is None:
-                logger.warning(f"Estado no disponible: {new_state_name}")
+                logger.warning("Estado no disponible: %s", new_state_name)
                 return
             
             if self.current_state.name == new_state_name:
@@ -120,7 +171,7 @@ class BattleScene:
             self.current_state.exit()
             self.current_state = self.states[new_state_name]
             self.current_state.enter()
-            
+        
         except Exception as e:
             logger.error(
                 f"Error crítico cambiando estado a {new_state_name}",
@@ -138,8 +189,13 @@ class BattleScene:
     # ✅ MÉTODOS DELEGADOS A LOS ESTADOS CON LOGGING
     def handle_event(self, event):
         """Delega el manejo de eventos al estado actual"""
+        self._input_received = True
         try:
-            if self.ability_menu and self.ability_menu.visible:
+            if event.type == pygame.USEREVENT and self.turn_system.current_turn == "enemy":
+                # ⏱️ Fin de la pausa del turno enemigo
+                pygame.time.set_timer(pygame.USEREVENT, 0)
+                self.end_turn()
+            elif self.ability_menu and self.ability_menu.visible:
                 self._handle_ability_menu_event(event)
             else:
                 self.current_state.handle_event(event)
@@ -165,30 +221,58 @@ class BattleScene:
             )
     
     def draw(self):
-        """Dibuja elementos comunes y delega al estado actual"""
+        """
+        Dibuja elementos comunes y delega al estado actual.
+        Retorna los rectángulos sucios para pygame.display.update (vacío si nada cambió)
+        """
         try:
-            self.screen.fill((30, 30, 60))
-            self.grid.draw(self.screen)
+            overlay_active = self.current_state.name != "idle" or self.ability_menu is not None
+            if not self.renderer.begin_frame(self._board_signature(), self._ui_signature(),
+                                             overlay_active, self._input_received):
+                return []
+            self._input_received = False
+            
+            # Fondo y grid pre-horneados: un solo blit
+            self.screen.blit(self.renderer.get_background(), (0, 0))
             
             # ✅ El estado actual dibuja sus elementos específicos
             self.current_state.draw()
             
             # Elementos comunes (siempre se dibujan)
-            for entity in self.entities:
-                entity.draw(self.screen, self.grid)
+            entity_rects = [entity.draw(self.screen, self.grid) for entity in self.entities]
             
             if self.ability_menu:
                 self.ability_menu.draw()
             
-            self.draw_ui()
-            
+            ui_rects = self.draw_ui()
+            return self.renderer.end_frame(entity_rects, ui_rects)
+        
         except Exception as e:
             logger.error("Error crítico en draw", exception=e)
             # Intentar recuperación básica
             self.screen.fill((255, 0, 0))  # Fondo rojo de error
-            font = pygame.font.SysFont(None, 36)
-            error_text = font.render("ERROR EN DIBUJADO", True, (255, 255, 255))
+            error_text = text_cache.render("ERROR EN DIBUJADO", (255, 255, 255), 36)
             self.screen.blit(error_text, (100, 100))
+            self.renderer.invalidate()
+            return [self.screen.get_rect()]
+    
+    def _board_signature(self):
+        """Lo que se ve del tablero: posiciones y stats de las entidades"""
+        return tuple(
+            (id(entity), entity.position, entity.stats['current_ph'], entity.stats['max_ph'])
+            for entity in self.entities
+        )
+    
+    def _ui_signature(self):
+        """Lo que muestra draw_ui: turno, estado y datos del seleccionado"""
+        selected = self.selected_entity
+        selected_info = None
+        if selected:
+            selected_info = (id(selected), selected.has_moved, selected.has_acted,
+                             tuple(selected.stats.values()), selected.get_energy_absolute(),
+                             getattr(selected, 'movement_range', 3))
+        return (self.turn_system.current_turn, self.turn_system.turn_count,
+                self.current_state.name, selected_info)
     
     # ✅ MÉTODOS DE COMPATIBILIDAD MEJORADOS
     def open_ability_menu(self):
@@ -198,10 +282,12 @@ class BattleScene:
             return
         
         try:
+            from game.ui.ability_menu import AbilityMenu
+            
             screen_pos = self.grid.get_screen_position(self.selected_entity.position)
             self.ability_menu = AbilityMenu(self.screen, self.selected_entity, screen_pos)
             self.ability_menu.show()
-            logger.debug("Menú de habilidades abierto", {"entidad": self.selected_entity.name})
+            logger.debug("Menú de habilidades abierto", context={"entidad": self.selected_entity.name})
         except Exception as e:
             logger.error("Error abriendo menú de habilidades", exception=e)
     
@@ -209,8 +295,8 @@ class BattleScene:
         """Interface cuando se selecciona habilidad del menú"""
         try:
             logger.info(
-                f"{self.selected_entity.name} prepara {ability_data['name']}",
-                {
+                "%s prepara %s", self.selected_entity.name, ability_data['name'],
+                context={
                     "ability": ability_data['name'],
                     "cost_ph": ability_data.get('cost_ph', 0),
                     "selection_mode": ability_data.get('selection_mode', 'enemy')
@@ -224,7 +310,7 @@ class BattleScene:
                 self.set_state("ability")
             
             self.ability_menu = None
-            
+        
         except Exception as e:
             logger.error(
                 "Error seleccionando habilidad del menú",
@@ -251,24 +337,40 @@ class BattleScene:
     def end_turn(self):
         """Termina el turno actual con logging"""
         try:
-            logger.info("Terminando turno...", {"turno_actual": self.turn_system.current_turn})
+            logger.info("Terminando turno...", context={"turno_actual": self.turn_system.current_turn})
             
             self.effect_system.update_effects(self.entities)
             self.set_state("idle")
             
-            for entity in self.entities:
-                if entity.team == self.turn_system.current_turn:
-                    entity.reset_turn()
+            current_team = self.turn_system.current_turn
+            entity_store.reset_turn([e._row for e in self.entities if e.team == current_team])
             
             self.clear_selections()
             self.turn_system.end_turn()
+            self.start_team_turn(self.turn_system.current_turn)
+            if self.recorder is not None:
+                self.recorder.record_end_turn(self.turn_system.turn_count)
             
             if self.turn_system.current_turn == "enemy":
                 self.do_enemy_turn()
-                
+        
         except Exception as e:
             logger.error("Error terminando turno", exception=e)
     
+    def start_team_turn(self, team):
+        """Inicio de turno de un equipo: reloj de turnos (cooldowns y efectos) y evento TURN_STARTED"""
+        from game.core.event_system import event_system, EventTypes
+        
+        for entity in self.entities:
+            if entity.team != team:
+                continue
+            self.turn_system.start_entity_turn(entity)
+            self.effect_system.on_turn_start(entity)
+            event_system.emit(EventTypes.TURN_STARTED, {
+                'entity': entity,
+                'turn': self.turn_system.turn_count
+            })
+    
     # ✅ MÉTODOS PRIVADOS MEJORADOS
     def _handle_ability_menu_event(self, event):
         """Maneja eventos del menú de habilidades con logging"""
@@ -288,24 +390,93 @@ class BattleScene:
         try:
             logger.info("Iniciando turno del enemigo...")
             
+            # 🧠 MCTS sobre una copia headless de la batalla, repartido entre procesos:
+            # el bucle principal sigue dibujando mientras el futuro se resuelve
+            if self.enemy_ai_stale and self.enemy_ai is not None:
+                self.enemy_ai.close()  # Sus procesos cargaron la config anterior
+                self.enemy_ai = None
+            self.enemy_ai_stale = False
+            if self.enemy_ai is None:
+                from game.ai.enemy_ai import EnemyAI
+                self.enemy_ai = EnemyAI(self.player_party_ids[:3], self.enemy_configs,
+                                        budget_ms=self.enemy_ai_budget_ms,
+                                        grid_size=(self.grid.width, self.grid.height),
+                                        workers=self.enemy_ai_workers)
+            
+            from game.core.background_tasks import background_tasks
+            self.enemy_thinking = True
+            background_tasks.watch(self.enemy_ai.start_turn(self.snapshot()), self._on_enemy_plan_ready)
+        
+        except Exception as e:
+            logger.error("Error en turno del enemigo", exception=e)
+            self.enemy_thinking = False
+            pygame.time.set_timer(pygame.USEREVENT, 1000)
+    
+    def _on_enemy_plan_ready(self, future):
+        """Aplica el turno planificado (en el hilo principal) y arranca la pausa antes de devolver el turno"""
+        from game.core.event_system import event_system
+        
+        self.enemy_thinking = False
+        try:
+            if self.turn_system.current_turn != "enemy":
+                return  # La escena cambió mientras la IA pensaba (p. ej. restore_snapshot)
+            
+            if future.exception() is not None:
+                logger.error("La IA enemiga falló", exception=future.exception())
+            else:
+                for command in future.result():
+                    self.enemy_ai.apply_command(self, command)
+                    event_system.flush()
+            
             for entity in self.entities:
                 if entity.team == "enemy" and not entity.has_acted:
                     entity.has_acted = True
+            self.renderer.invalidate()
             
             pygame.time.set_timer(pygame.USEREVENT, 1000)
             logger.debug("Timer de turno enemigo configurado")
-            
+        
         except Exception as e:
-            logger.error("Error en turno del enemigo", exception=e)
-
+            logger.error("Error aplicando el turno del enemigo", exception=e)
+            pygame.time.set_timer(pygame.USEREVENT, 1000)
+    
+    def _on_config_reloaded(self, data):
+        """
+        Recarga en caliente (emitida entre frames): las habilidades de las entidades vivas
+        cambian de prototipo sin perder cooldowns; los efectos los recarga GameContext.
+        La IA termina el turno que esté pensando y se recrea con la config nueva
+        """
+        from game.systems.ability_factory import AbilityFactory
+        
+        updated = AbilityFactory.reload_abilities(self.entities, data['abilities'], ConfigManager.get_instance())
+        self.enemy_ai_stale = True
+        if self.recorder is not None:
+            logger.warning("🎞️ La configuración cambió: la grabación del replay se detiene aquí")
+            self.stop_recording()
+        self.renderer.invalidate()
+        logger.info("🔥 Configuración recargada en batalla",
+                    context={"entidades": updated, "habilidades": len(data['abilities']),
+                             "efectos": len(data['effects'])})
+    
+    def close(self):
+        """Libera lo que vive fuera de la escena: replay en curso, procesos de la IA y suscripciones"""
+        from game.core.event_system import event_system, EventTypes
+        
+        event_system.unsubscribe(EventTypes.CONFIG_RELOADED, self._on_config_reloaded)
+        self.stop_recording()
+        if self.enemy_ai is not None:
+            self.enemy_ai.close()
+    
     def draw_ui(self):
-        """UI común - ACTUALIZADO para state pattern"""
-        font = pygame.font.SysFont(None, 36)
-        small_font = pygame.font.SysFont(None, 24)
+        """UI común - ACTUALIZADO para state pattern. Retorna los rectángulos dibujados"""
+        rects = []
+        
+        def blit(surface, position):
+            rects.append(self.screen.blit(surface, position))
         
         # Información del turno (se mantiene igual)
         turn_text = f"Turno: {self.turn_system.current_turn} ({self.turn_system.turn_count})"
-        self.screen.blit(font.render(turn_text, True, (255, 255, 255)), (20, 20))
+        blit(text_cache.render(turn_text, (255, 255, 255), 36), (20, 20))
         
         # Información del personaje seleccionado (se mantiene igual)
         if self.selected_entity:
@@ -333,12 +504,12 @@ class BattleScene:
             if energy_percentage >= 100:
                 energy_color = (255, 215, 0)
             pygame.draw.rect(self.screen, energy_color, (20, 210, energy_fill, 20))
-            pygame.draw.rect(self.screen, (200, 200, 200), (20, 210, energy_width, 20), 2)
+            rects.append(pygame.draw.rect(self.screen, (200, 200, 200), (20, 210, energy_width, 20), 2))
             
             energy_text = f"ENERGÍA: {current_energy}/{max_energy}"
             if energy_percentage >= 100:
                 energy_text += " - ULTIMATE LISTA! 🪄"
-            self.screen.blit(small_font.render(energy_text, True, (255, 255, 255)), (25, 212))
+            blit(text_cache.render(energy_text, (255, 255, 255), 24), (25, 212))
             
             # Ultimate costos (se mantiene igual)
             ultimate_cost = None
@@ -352,18 +523,20 @@ class BattleScene:
             if ultimate_cost:
                 cost_text = f"Ultimate: {ultimate_name} - Costo: {ultimate_cost}"
                 cost_color = (100, 255, 100) if current_energy >= ultimate_cost else (255, 100, 100)
-                self.screen.blit(small_font.render(cost_text, True, cost_color), (25, 235))
+                blit(text_cache.render(cost_text, cost_color, 24), (25, 235))
             
             # Dibujar líneas de info
             for i, text in enumerate(info_lines):
-                self.screen.blit(small_font.render(text, True, (255, 255, 255)), (20, 60 + i * 25))
+                blit(text_cache.render(text, (255, 255, 255), 24), (20, 60 + i * 25))
         
         # ✅ INSTRUCCIONES DEL ESTADO ACTUAL
         instructions = self.current_state.get_instructions()
         for i, instruction in enumerate(instructions):
-            self.screen.blit(small_font.render(instruction, True, (150, 200, 255)), 
-                        (20, 500 + i * 30))
-            
+            blit(text_cache.render(instruction, (150, 200, 255), 24), 
+                 (20, 500 + i * 30))
+        
+        return rects
+    
     def open_menu(self, menu_type="pause"):
         """Abre el menú de pausa/inventario"""
         self.states["menu"] = MenuState(self, menu_type)
@@ -371,9 +544,11 @@ class BattleScene:
     
     def start_targeting(self, ability_data, targeting_type="area"):
         """Inicia selección avanzada de objetivos"""
+        from game.scenes.battle_states.targeting_state import TargetingState
+        
         self.states["targeting"] = TargetingState(self, ability_data, targeting_type)
         self.set_state("targeting")
-
+    
     def create_ability_context(self, caster, target=None, target_position=None, entities=None):
         """Crea contexto para habilidades usando GameContext"""
         from game.core.game_context import game_context
@@ -1,15 +1,16 @@
 # game/scenes/battle_states/ability_state.py
 from .base_state import BattleState
+from game.core.logger import state_log
 import pygame
 
 class AbilityState(BattleState):
     """Estado para selección y uso de habilidades"""
     
     def enter(self):
-        print("🔮 Entrando a estado: Ability")
+        state_log.debug("🔮 Entrando a estado: Ability")
     
     def exit(self):
-        print("🔮 Saliendo de estado: Ability")
+        state_log.debug("🔮 Saliendo de estado: Ability")
         self.battle_scene.ability_system.cancel_selection()
     
     def handle_event(self, event):
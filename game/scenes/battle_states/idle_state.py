@@ -1,15 +1,16 @@
 # game/scenes/battle_states/idle_state.py
 from .base_state import BattleState
+from game.core.logger import state_log
 import pygame
 
 class IdleState(BattleState):
     """Estado por defecto - selección de personajes y acciones básicas"""
     
     def enter(self):
-        print("🔄 Entrando a estado: Idle")
+        state_log.debug("🔄 Entrando a estado: Idle")
     
     def exit(self):
-        print("🔄 Saliendo de estado: Idle")
+        state_log.debug("🔄 Saliendo de estado: Idle")
     
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -23,18 +24,18 @@ class IdleState(BattleState):
         if not self.battle_scene.grid.is_valid_position(grid_pos):
             return
         
+        entities_here = self.battle_scene.grid.get_entities_at(grid_pos)
+        
         # Selección de aliado
-        for entity in self.battle_scene.entities:
-            if (entity.position == grid_pos and 
-                self.battle_scene.turn_system.can_select(entity)):
+        for entity in entities_here:
+            if self.battle_scene.turn_system.can_select(entity):
                 self.battle_scene.selected_entity = entity
-                print(f"✅ {entity.name} seleccionado")
+                state_log.info("✅ %s seleccionado", entity.name)
                 return
         
         # Si hay personaje seleccionado, ataque básico a enemigos
         if self.battle_scene.selected_entity:
-            enemy = next((e for e in self.battle_scene.entities 
-                         if e.position == grid_pos and e.team == "enemy"), None)
+            enemy = next((e for e in entities_here if e.team == "enemy"), None)
             if enemy and not self.battle_scene.selected_entity.has_acted:
                 self.battle_scene.selected_entity.basic_attack(enemy)
     
@@ -1,6 +1,8 @@
 # game/scenes/battle_states/menu_state.py
 import pygame
 from .base_state import BattleState
+from game.core.logger import state_log
+from game.ui.text_cache import text_cache
 
 class MenuState(BattleState):
     """Estado para menús contextuales (pausa, inventario, opciones)"""
@@ -12,11 +14,11 @@ class MenuState(BattleState):
         self.selected_index = 0
     
     def enter(self):
-        print(f"📋 Entrando a estado: Menu ({self.menu_type})")
+        state_log.debug("📋 Entrando a estado: Menu (%s)", self.menu_type)
         self.selected_index = 0
     
     def exit(self):
-        print(f"📋 Saliendo de estado: Menu")
+        state_log.debug("📋 Saliendo de estado: Menu")
     
     def _get_menu_options(self):
         """Define las opciones según el tipo de menú"""
@@ -40,15 +42,15 @@ class MenuState(BattleState):
     def _select_option(self):
         """Ejecuta la opción seleccionada"""
         option = self.menu_options[self.selected_index]
-        print(f"🎯 Seleccionado: {option}")
+        state_log.info("🎯 Seleccionado: %s", option)
         
         if self.menu_type == "pause":
             if option == "Continuar":
                 self.battle_scene.set_state("idle")
             elif option == "Habilidades":
-                print("📊 Abriendo menú de habilidades extendido")
+                state_log.info("📊 Abriendo menú de habilidades extendido")
             elif option == "Salir":
-                print("🚪 Saliendo del juego...")
+                state_log.info("🚪 Saliendo del juego...")
                 # Aquí iría la lógica para salir del juego
     
     def update(self):
@@ -74,16 +76,14 @@ class MenuState(BattleState):
         pygame.draw.rect(screen, (100, 100, 200), (menu_x, menu_y, menu_width, menu_height), 3)
         
         # Título
-        font_title = pygame.font.SysFont(None, 32)
         title = "MENÚ DE PAUSA" if self.menu_type == "pause" else "MENÚ"
-        title_text = font_title.render(title, True, (255, 215, 0))
+        title_text = text_cache.render(title, (255, 215, 0), 32)
         screen.blit(title_text, (menu_x + (menu_width - title_text.get_width()) // 2, menu_y + 20))
         
         # Opciones
-        font_option = pygame.font.SysFont(None, 28)
         for i, option in enumerate(self.menu_options):
             color = (255, 215, 0) if i == self.selected_index else (255, 255, 255)
-            option_text = font_option.render(option, True, color)
+            option_text = text_cache.render(option, color, 28)
             screen.blit(option_text, (menu_x + 50, menu_y + 70 + i * 40))
             
             # Indicador de selección
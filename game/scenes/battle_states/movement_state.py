@@ -1,12 +1,13 @@
 # game/scenes/battle_states/movement_state.py
 from .base_state import BattleState
+from game.core.logger import state_log
 import pygame
 
 class MovementState(BattleState):
     """Estado para manejar movimiento de personajes"""
     
     def enter(self):
-        print("🎯 Entrando a estado: Movement")
+        state_log.debug("🎯 Entrando a estado: Movement")
         if self.battle_scene.selected_entity:
             success = self.battle_scene.movement_system.start_movement(
                 self.battle_scene.selected_entity, 
@@ -17,7 +18,7 @@ class MovementState(BattleState):
                 self.battle_scene.set_state("idle")
     
     def exit(self):
-        print("🎯 Saliendo de estado: Movement")
+        state_log.debug("🎯 Saliendo de estado: Movement")
         self.battle_scene.movement_system.cancel()
     
     def handle_event(self, event):
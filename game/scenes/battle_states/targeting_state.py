@@ -1,6 +1,7 @@
 # game/scenes/battle_states/targeting_state.py
 import pygame
 from .base_state import BattleState
+from game.core.logger import state_log
 
 class TargetingState(BattleState):
     """Estado para selección avanzada de objetivos (cono, línea, área)"""
@@ -13,11 +14,11 @@ class TargetingState(BattleState):
         self.current_position = None
     
     def enter(self):
-        print(f"🎯 Entrando a estado: Targeting ({self.targeting_type})")
+        state_log.debug("🎯 Entrando a estado: Targeting (%s)", self.targeting_type)
         self._calculate_valid_positions()
     
     def exit(self):
-        print("🎯 Saliendo de estado: Targeting")
+        state_log.debug("🎯 Saliendo de estado: Targeting")
         self.valid_positions = []
     
     def _calculate_valid_positions(self):
@@ -60,7 +61,7 @@ class TargetingState(BattleState):
         grid_pos = self.battle_scene.grid.get_grid_position(pos)
         
         if grid_pos in self.valid_positions:
-            print(f"🎯 Objetivo seleccionado: {grid_pos}")
+            state_log.info("🎯 Objetivo seleccionado: %s", grid_pos)
             # Aquí ejecutaríamos la habilidad con el objetivo
             self.battle_scene.set_state("idle")
     
@@ -0,0 +1,131 @@
+"""
+Barridos Monte Carlo de balance - N batallas headless repartidas en procesos
+Uso: python -m game.sim.batch --battles 100000 --workers 8 --seed 0 --out resultados.jsonl
+"""
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Any
+
+from game.sim.battle_simulator import BattleSimulator
+
+# Registro compacto por batalla: lo único que viaja de vuelta desde cada worker
+BattleRecord = namedtuple('BattleRecord', ['seed', 'winner', 'turns', 'damage'])
+
+# Un simulador por proceso: se construye una vez en el initializer y se reutiliza
+_worker_simulator = None
+_worker_record_dir = None
+
+
+def _init_worker(simulator_kwargs, quiet, record_dir=None):
+    """Prepara el proceso worker: contexto, configs y simulador se cargan una sola vez"""
+    global _worker_simulator, _worker_record_dir
+    _worker_record_dir = record_dir
+    
+    # Modo rápido del bus: nadie consulta el historial de eventos en los workers
+    from game.core.event_system import event_system
+    event_system.set_history_enabled(False)
+    
+    if quiet:
+        # ✅ Los workers no escriben en consola ni en logs/game_log.txt:
+        # con SILENT ningún mensaje se formatea ni se encola
+        from game.core.logger import logger, SILENT
+        logger.log_to_file = False
+        logger.set_level(SILENT)
+        sys.stdout = open(os.devnull, 'w')
+    
+    _worker_simulator = BattleSimulator(**simulator_kwargs)
+
+
+def _run_chunk(seeds: List[int]) -> List[BattleRecord]:
+    records = []
+    for seed in seeds:
+        _worker_simulator.reset(seed)
+        if _worker_record_dir:
+            _worker_simulator.start_recording(os.path.join(_worker_record_dir, f"battle_{seed}.jsonl"))
+        result = _worker_simulator.run()
+        records.append(BattleRecord(seed, result['winner'], result['turns'], result['damage_by_ability']))
+    return records
+
+
+def run_batch(n_battles, workers=None, base_seed=0, chunk_size=250, quiet=True,
+              record_dir=None, **simulator_kwargs) -> Iterator[BattleRecord]:
+    """
+    Reparte n_battles entre un ProcessPoolExecutor y produce los registros
+    según terminan los bloques. La semilla de cada batalla es base_seed + índice,
+    así que el resultado no depende del número de workers ni del reparto.
+    Con record_dir cada batalla se graba como replay (battle_<semilla>.jsonl).
+    """
+    seeds = range(base_seed, base_seed + n_battles)
+    chunks = [list(seeds[i:i + chunk_size]) for i in range(0, n_battles, chunk_size)]
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(simulator_kwargs, quiet, record_dir)) as executor:
+        futures = [executor.submit(_run_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def summarize(records) -> Dict[str, Any]:
+    """Agrega registros: victorias por equipo, turnos medios y daño medio por habilidad"""
+    battles = 0
+    total_turns = 0
+    wins: Dict[str, int] = {}
+    damage: Dict[str, int] = {}
+    
+    for record in records:
+        battles += 1
+        total_turns += record.turns
+        winner = record.winner or "draw"
+        wins[winner] = wins.get(winner, 0) + 1
+        for key, value in record.damage.items():
+            damage[key] = damage.get(key, 0) + value
+    
+    return {
+        'battles': battles,
+        'win_rate': {team: count / battles for team, count in wins.items()} if battles else {},
+        'avg_turns': total_turns / battles if battles else 0,
+        'avg_damage_by_ability': {key: value / battles for key, value in sorted(damage.items())} if battles else {}
+    }
+
+
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Barrido Monte Carlo de batallas headless")
+    parser.add_argument("--battles", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="Por defecto: os.cpu_count()")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument("--max-turns", type=int, default=50)
+    parser.add_argument("--out", default=None, help="Archivo JSONL con un registro por batalla")
+    parser.add_argument("--record-dir", default=None, help="Directorio donde grabar un replay por batalla")
+    args = parser.parse_args(argv)
+    
+    records = []
+    out_file = open(args.out, 'w', encoding='utf-8') if args.out else None
+    start = time.perf_counter()
+    try:
+        for record in run_batch(args.battles, args.workers, args.seed, args.chunk_size,
+                                record_dir=args.record_dir, max_turns=args.max_turns):
+            records.append(record)
+            if out_file:
+                out_file.write(json.dumps(record._asdict()) + "\n")
+    finally:
+        if out_file:
+            out_file.close()
+    elapsed = time.perf_counter() - start
+    
+    summary = summarize(records)
+    print(f"🏁 {summary['battles']} batallas en {elapsed:.2f}s → {summary['battles'] / elapsed:.1f} batallas/s")
+    print(f"   Victorias: {summary['win_rate']} | Turnos medios: {summary['avg_turns']:.1f}")
+    for key, value in summary['avg_damage_by_ability'].items():
+        print(f"   {key}: {value:.1f} daño medio por batalla")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,647 @@
+"""
+Simulador de batallas HEADLESS - sin pantalla, fuentes ni Surfaces
+Reutiliza GameContext, CharacterFactory, EffectSystem y ComposableAbility
+para resolver combates completos en pruebas de balance
+"""
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple, Any
+
+from game.core.event_system import event_system, EventTypes
+from game.core.action_base import ActionContext
+from game.core.logger import logger, SILENT
+from game.entities.entity_store import entity_store
+from game.systems import battle_snapshot
+from game.systems.targeting import cells_in_range, entities_in_radius, filter_entities
+
+DEFAULT_PLAYER_PARTY = ["ricchard", "red_thunder", "zoe"]
+DEFAULT_ENEMY_CONFIGS = [
+    {"position": (7, 3), "name": "Orco"},
+    {"position": (7, 5), "name": "Goblin"}
+]
+PLAYER_START_POSITIONS = [(2, 2), (2, 4), (2, 6)]
+
+
+class SimAction:
+    """Comando atómico que el simulador sabe aplicar"""
+    
+    MOVE = "move"
+    ABILITY = "ability"
+    END_TURN = "end_turn"
+    
+    def __init__(self, kind, entity=None, ability_key=None, target=None,
+                 target_position=None, targets=None, direction=None,
+                 path=None, dash_targets=None):
+        self.kind = kind
+        self.entity = entity
+        self.ability_key = ability_key
+        self.target = target
+        self.target_position = target_position
+        self.targets = targets or []
+        self.direction = direction
+        self.path = path or []
+        self.dash_targets = dash_targets or []
+    
+    def __repr__(self):
+        if self.kind == SimAction.END_TURN:
+            return "SimAction(end_turn)"
+        if self.kind == SimAction.MOVE:
+            return f"SimAction(move {self.entity.name} -> {self.path})"
+        return f"SimAction(ability {self.entity.name}.{self.ability_key})"
+
+
+class BattleSimulator:
+    """
+    Batalla completa sin pygame.
+    API paso a paso: legal_actions() -> apply_action(action) -> is_over()
+    """
+    
+    def __init__(self, player_party_ids=None, enemy_configs=None, seed=None,
+                 max_turns=50, policy=None, game_context=None, grid_size=(10, 8)):
+        if game_context is None:
+            from game.core.game_context import game_context
+        game_context.initialize()
+        
+        from game.systems.effect_system import EffectSystem
+        from game.systems.grid_system import GridSystem
+        from game.systems.movement_system import MovementSystem
+        from game.systems.turn_system import TurnSystem
+        
+        self.game_context = game_context
+        
+        # ✅ Grid, movimiento y efectos propios: cada simulación tiene su índice de ocupación
+        # y los efectos de una batalla no se filtran a la siguiente
+        self.grid = GridSystem(*grid_size)
+        self.movement_system = MovementSystem(self.grid)
+        self.effect_system = EffectSystem(game_context)
+        self.effect_system.load_effects_config(game_context.get_system('effect').effects_registry)
+        self.turn_system = TurnSystem()
+        
+        self.player_party_ids = player_party_ids or DEFAULT_PLAYER_PARTY
+        self.enemy_configs = enemy_configs or DEFAULT_ENEMY_CONFIGS
+        self.max_turns = max_turns
+        self.policy = policy or greedy_policy
+        
+        self.entities = []
+        self.actions_applied = 0
+        self.damage_by_ability = {}
+        self._failed_actions = set()
+        self.recorder = None  # ReplayRecorder activo (ver start_recording)
+        self.reset(seed)
+    
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def reset(self, seed=None):
+        """Descarta la batalla actual y monta una nueva con la semilla indicada"""
+        self.stop_recording()
+        self._teardown_entities()
+        
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.turn_system.current_turn = "player"
+        self.turn_system.turn_count = 1
+        self.actions_applied = 0
+        self.damage_by_ability = {}
+        self._failed_actions = set()
+        
+        self.entities = self._create_entities()
+        self.roster = tuple(self.entities)  # Orden de creación: referencia estable de replays y de la IA
+        self.grid.register_entities(self.entities)
+        self.turn_system.start_player_turn()
+        self._start_team_turn("player")
+    
+    def snapshot(self, include_rng=False):
+        """
+        Estado completo de la batalla (entidades, efectos, turno y contabilidad)
+        para lookahead o deshacer. include_rng también guarda la semilla en curso.
+        """
+        extra = (self.actions_applied, self.damage_by_ability.copy(), frozenset(self._failed_actions),
+                 self.rng.getstate() if include_rng else None)
+        return battle_snapshot.capture(self.entities, self.effect_system, self.turn_system, extra)
+    
+    def restore(self, snapshot):
+        """Vuelve al snapshot: revive a los muertos desde entonces y reconstruye el índice del grid"""
+        alive = set(self.entities)
+        for entity in alive.difference(snapshot.entities):
+            self._discard_entity(entity)
+        
+        battle_snapshot.restore(snapshot, self.effect_system, self.turn_system)
+        
+        for entity in snapshot.entities:
+            if entity not in alive:
+                self.grid.register_entity(entity)
+                if hasattr(entity, 'setup_energy_listeners'):
+                    entity.setup_energy_listeners()
+        self.entities = list(snapshot.entities)
+        
+        actions_applied, damage_by_ability, failed_actions, rng_state = snapshot.extra
+        self.actions_applied = actions_applied
+        self.damage_by_ability = damage_by_ability.copy()
+        self._failed_actions = set(failed_actions)
+        if rng_state is not None:
+            self.rng.setstate(rng_state)
+    
+    def sync_from(self, snapshot):
+        """
+        Monta en este simulador el estado de otra batalla con el mismo reparto
+        (p. ej. BattleScene.snapshot()), sin compartir objetos con ella
+        """
+        self.reset(self.seed)
+        present = set(battle_snapshot.transfer(snapshot, self.roster, self.effect_system, self.turn_system))
+        for entity in [e for e in self.entities if e not in present or e.stats['current_hp'] <= 0]:
+            self.entities.remove(entity)
+            self._discard_entity(entity)
+    
+    def start_recording(self, path):
+        """
+        Graba la batalla actual (llamar justo después de reset) en un replay
+        reproducible con game.sim.replay
+        """
+        from game.sim.replay import ReplayRecorder, build_header
+        
+        self.stop_recording()
+        header = build_header(self.player_party_ids, self.enemy_configs, seed=self.seed,
+                              max_turns=self.max_turns, grid_size=(self.grid.width, self.grid.height))
+        self.recorder = ReplayRecorder(path, header, self.roster)
+        self.movement_system.recorder = self.recorder
+        return self.recorder
+    
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+            self.movement_system.recorder = None
+    
+    def _create_entities(self):
+        from game.characters.character_factory import CharacterFactory
+        from game.entities.enemy import Enemy
+        
+        players = []
+        for i, entry in enumerate(self.player_party_ids):
+            character_id, position = self._parse_entry(entry, i)
+            players.append(CharacterFactory.create_character(character_id, position, "player"))
+        
+        enemies = []
+        for config in self.enemy_configs:
+            if 'character_id' in config:
+                enemies.append(CharacterFactory.create_character(
+                    config['character_id'], tuple(config['position']), "enemy"
+                ))
+            else:
+                enemies.append(Enemy(tuple(config['position']), "enemy", config.get('name', 'Enemigo')))
+        
+        return players + enemies
+    
+    def _parse_entry(self, entry, index):
+        if isinstance(entry, dict):
+            return entry['character_id'], tuple(entry['position'])
+        if index >= len(PLAYER_START_POSITIONS):
+            raise ValueError(f"Sin posición inicial para el personaje #{index + 1}: usa {{'character_id', 'position'}}")
+        return entry, PLAYER_START_POSITIONS[index]
+    
+    def _teardown_entities(self):
+        for entity in self.entities:
+            self._discard_entity(entity)
+        self.entities = []
+        self.grid.clear_entities()
+    
+    def _discard_entity(self, entity):
+        self.grid.unregister_entity(entity)
+        if hasattr(entity, 'remove_energy_listeners'):
+            entity.remove_energy_listeners()
+        self.effect_system.drop_entity(entity)
+    
+    # ------------------------------------------------------------------
+    # Consultas de estado
+    # ------------------------------------------------------------------
+    @property
+    def current_team(self):
+        return self.turn_system.current_turn
+    
+    @property
+    def turn_count(self):
+        return self.turn_system.turn_count
+    
+    def living_entities(self, team=None):
+        return [e for e in self.entities if team is None or e.team == team]
+    
+    def is_over(self):
+        if self.turn_system.turn_count > self.max_turns:
+            return True
+        teams = {e.team for e in self.entities}
+        return len(teams) < 2
+    
+    @property
+    def winner(self):
+        """Equipo ganador, o None si la batalla sigue o terminó en empate por turnos"""
+        teams = {e.team for e in self.entities}
+        if len(teams) == 1:
+            return next(iter(teams))
+        return None
+    
+    def result(self) -> Dict[str, Any]:
+        return {
+            'seed': self.seed,
+            'winner': self.winner,
+            'turns': self.turn_system.turn_count,
+            'actions': self.actions_applied,
+            'damage_by_ability': dict(self.damage_by_ability)
+        }
+    
+    # ------------------------------------------------------------------
+    # Generación de acciones legales
+    # ------------------------------------------------------------------
+    def legal_actions(self, entity=None) -> List[SimAction]:
+        """Acciones legales del equipo activo (o de una entidad concreta)"""
+        if self.is_over():
+            return []
+        
+        actors = [entity] if entity else self.living_entities(self.current_team)
+        actions = []
+        for actor in actors:
+            if not actor.has_acted:
+                for ability_key, ability in actor.actions.items():
+                    if (actor, ability_key) in self._failed_actions:
+                        continue
+                    actions.extend(self._ability_actions(actor, ability_key, ability))
+            if not actor.has_moved and (actor, SimAction.MOVE) not in self._failed_actions:
+                actions.extend(self._move_actions(actor))
+        
+        actions.append(SimAction(SimAction.END_TURN))
+        return actions
+    
+    def ability_actions(self) -> List[SimAction]:
+        """Solo las habilidades legales del equipo activo (mismo orden que en legal_actions)"""
+        if self.is_over():
+            return []
+        actions = []
+        for actor in self.living_entities(self.current_team):
+            if actor.has_acted:
+                continue
+            for ability_key, ability in actor.actions.items():
+                if (actor, ability_key) not in self._failed_actions:
+                    actions.extend(self._ability_actions(actor, ability_key, ability))
+        return actions
+    
+    def move_destinations(self):
+        """(entidad, casilla) de cada movimiento legal del equipo activo, sin crear SimActions"""
+        if self.is_over():
+            return
+        for actor in self.living_entities(self.current_team):
+            if not actor.has_moved and (actor, SimAction.MOVE) not in self._failed_actions:
+                for cell in self._move_cells(actor):
+                    yield actor, cell
+    
+    def _ability_actions(self, caster, ability_key, ability) -> List[SimAction]:
+        config = getattr(ability, 'ability_config', {})
+        if getattr(ability, 'is_ultimate', False) and not caster.can_use_ultimate(config):
+            return []
+        if not ability.can_execute(ActionContext(caster=caster)):
+            return []
+        
+        mode = ability.selection_mode
+        range_distance = self._as_range(config.get('range', 1))
+        
+        def make(**kwargs):
+            return SimAction(SimAction.ABILITY, entity=caster, ability_key=ability_key, **kwargs)
+        
+        if mode in ('enemy', 'ally'):
+            target_filter = 'enemies' if mode == 'enemy' else 'allies'
+            return [make(target=e) for e in
+                    entities_in_radius(self.entities, caster.position, range_distance, caster, target_filter)]
+        
+        if mode == 'global_ally':
+            return [make(target=e) for e in filter_entities(self.entities, caster, 'allies')]
+        
+        if mode == 'position':
+            return [make(target_position=cell) for cell in cells_in_range(caster.position, range_distance, self.grid)]
+        
+        if mode == 'chain':
+            return [make(targets=chain) for chain in self._chain_options(caster, config, range_distance)]
+        
+        if mode == 'line':
+            return [make(direction=d) for d in ((1, 0), (-1, 0), (0, 1), (0, -1))]
+        
+        # aoe, none, self, global_self: se ejecutan sin elegir objetivo
+        return [make()]
+    
+    def _chain_options(self, caster, config, range_distance):
+        """Cadenas codiciosas: cada objetivo inicial encadena al enemigo más cercano"""
+        max_targets = config.get('max_targets', 3)
+        min_targets = config.get('min_targets', 1)
+        enemies = [e for e in self.entities if e.team != caster.team]
+        
+        options = []
+        for first in enemies:
+            if self._distance(caster.position, first.position) > range_distance:
+                continue
+            chain = [first]
+            while len(chain) < max_targets:
+                candidates = [e for e in enemies if e not in chain
+                              and self._distance(chain[-1].position, e.position) <= range_distance]
+                if not candidates:
+                    break
+                chain.append(min(candidates, key=lambda e: self._distance(chain[-1].position, e.position)))
+            for length in range(min_targets, len(chain) + 1):
+                options.append(chain[:length])
+        return options
+    
+    def _move_actions(self, entity) -> List[SimAction]:
+        """Un destino por casilla libre del área BFS (cacheada por posición y versión del tablero)"""
+        return [SimAction(SimAction.MOVE, entity=entity, path=[cell]) for cell in self._move_cells(entity)]
+    
+    def _move_cells(self, entity) -> List[Tuple[int, int]]:
+        movement_range = int(getattr(entity, 'movement_range', 3))
+        reachable = self.movement_system.pathfinder.reachable(entity, entity.position, movement_range)
+        occupied = self.grid.get_occupied_positions()
+        position = entity.position
+        return [cell for cell in reachable if cell != position and cell not in occupied]
+    
+    # ------------------------------------------------------------------
+    # Aplicación de acciones
+    # ------------------------------------------------------------------
+    def apply_action(self, action: SimAction) -> bool:
+        """Aplica una acción y resuelve muertes. Retorna True si tuvo efecto"""
+        if action.kind == SimAction.END_TURN:
+            hp_before = self._hp_by_entity()
+            self.end_turn()
+            event_system.flush()  # Sin frames: cada acción es un punto de vaciado del modo diferido
+            self._record_damage("effects", None, hp_before)
+            self.actions_applied += 1
+            if self.recorder is not None:
+                self.recorder.record_end_turn(self.turn_system.turn_count)
+                self._record_result_if_over()
+            return True
+        
+        if action.kind == SimAction.MOVE:
+            return self.run_command(action.entity, SimAction.MOVE, lambda: self._apply_move(action))
+        if action.kind == SimAction.ABILITY:
+            return self.run_command(action.entity, action.ability_key, lambda: self._apply_ability(action))
+        raise ValueError(f"Tipo de acción desconocido: {action.kind}")
+    
+    def run_command(self, entity, action_key, apply) -> bool:
+        """
+        Contabilidad común de un comando de entidad: daño por habilidad, muertes
+        y punto de vaciado del bus. apply() ejecuta el comando y retorna el éxito
+        """
+        hp_before = self._hp_by_entity()
+        success = apply()
+        
+        if success:
+            self._record_damage(self.ability_label(entity, action_key), entity.team, hp_before)
+            self.actions_applied += 1
+            self._resolve_deaths(killer=entity)
+        else:
+            # ✅ No volver a ofrecer una acción que ya falló este turno
+            self._failed_actions.add((entity, action_key))
+        event_system.flush()
+        if self.recorder is not None:
+            self._record_result_if_over()
+        return success
+    
+    def _record_result_if_over(self):
+        if self.is_over():
+            self.recorder.record_result(self.result())
+            self.stop_recording()
+    
+    def _apply_move(self, action):
+        movement = self.movement_system
+        if not movement.start_movement(action.entity, self.entities):
+            return False
+        
+        for enemy in action.dash_targets:
+            movement.handle_click(enemy.position, self.entities)
+        for waypoint in action.path:
+            movement.handle_click(tuple(waypoint), self.entities)
+        
+        if not action.path or movement.movement_path[-1] != tuple(action.path[-1]):
+            movement.cancel()
+            return False
+        return movement.execute_movement()
+    
+    def execute_move(self, entity, path, dash_targets=()):
+        """Ejecuta una ruta ya resuelta (casilla a casilla), sin volver a buscar caminos"""
+        movement = self.movement_system
+        if not movement.start_movement(entity, self.entities):
+            return False
+        movement.movement_path = [tuple(cell) for cell in path]
+        movement.dash_targets = list(dash_targets)
+        return movement.execute_movement()
+    
+    def _apply_ability(self, action):
+        caster = action.entity
+        ability = caster.actions.get(action.ability_key)
+        if ability is None:
+            logger.warning("Habilidad %s no encontrada en %s", action.ability_key, caster.name)
+            return False
+        
+        context = self.create_context(caster, target=action.target, target_position=action.target_position)
+        mode = ability.selection_mode
+        
+        if mode == 'chain':
+            context.entities = list(action.targets)
+        elif mode == 'line':
+            context.entities = self._line_targets(caster, action.direction, ability)
+            context.extra_data['direction'] = action.direction
+            context.extra_data['line_length'] = self._line_length(
+                caster.position, action.direction, self._as_range(ability.ability_config.get('range', 10))
+            )
+        elif mode == 'aoe':
+            radius = ability.ability_config.get('aoe_radius', 1)
+            context.entities = entities_in_radius(self.entities, caster.position, radius, caster, 'enemies')
+        
+        return self.execute_ability(caster, action.ability_key, context)
+    
+    def execute_ability(self, caster, ability_key, context):
+        """Ejecuta con el contexto ya resuelto: es lo que se graba y lo que reproduce un replay"""
+        if self.recorder is not None:
+            self.recorder.record_ability(caster, ability_key, context)
+        return caster.perform_action(ability_key, context)
+    
+    def create_context(self, caster, target=None, target_position=None):
+        """Contexto de habilidad con el EffectSystem de ESTA simulación inyectado"""
+        context = self.game_context.create_ability_context(
+            caster, target, target_position, list(self.entities)
+        )
+        context.extra_data['effect_system'] = self.effect_system
+        context.extra_data['turn_system'] = self.turn_system
+        context.extra_data['grid_system'] = self.grid
+        return context
+    
+    def _line_targets(self, caster, direction, ability):
+        range_distance = self._as_range(ability.ability_config.get('range', 10))
+        targets = []
+        current = caster.position
+        for _ in range(range_distance):
+            current = (current[0] + direction[0], current[1] + direction[1])
+            if not self.grid.is_valid_position(current):
+                break
+            targets.extend(self.grid.get_entities_at(current))
+        return targets
+    
+    def _line_length(self, start, direction, max_range):
+        length = 0
+        current = start
+        for _ in range(max_range):
+            current = (current[0] + direction[0], current[1] + direction[1])
+            if not self.grid.is_valid_position(current):
+                break
+            length += 1
+        return length
+    
+    # ------------------------------------------------------------------
+    # Contabilidad de daño
+    # ------------------------------------------------------------------
+    @staticmethod
+    def ability_label(entity, ability_key):
+        """Clave estable por habilidad: 'ricchard.corte_fugaz', 'enemy.basic_attack'..."""
+        owner = getattr(entity, 'character_id', None) or entity.character_class
+        return f"{owner}.{ability_key}"
+    
+    def _hp_by_entity(self):
+        return {e: e.stats['current_hp'] for e in self.entities}
+    
+    def _record_damage(self, key, attacker_team, hp_before):
+        """Acumula el HP perdido por los rivales (o por todos si attacker_team es None)"""
+        damage = 0
+        for entity, hp in hp_before.items():
+            if attacker_team is not None and entity.team == attacker_team:
+                continue
+            damage += max(0, hp - entity.stats['current_hp'])
+        if damage:
+            self.damage_by_ability[key] = self.damage_by_ability.get(key, 0) + damage
+    
+    # ------------------------------------------------------------------
+    # Turnos y muertes
+    # ------------------------------------------------------------------
+    def end_turn(self):
+        """Misma secuencia que BattleScene.end_turn, sin estados de UI"""
+        self.effect_system.update_effects(self.entities)
+        
+        current_team = self.turn_system.current_turn
+        entity_store.reset_turn([e._row for e in self.entities if e.team == current_team])
+        
+        self.turn_system.end_turn()
+        self._failed_actions = set()
+        self._start_team_turn(self.turn_system.current_turn)
+        self._resolve_deaths(killer=None)
+    
+    def _start_team_turn(self, team):
+        for entity in self.entities:
+            if entity.team != team:
+                continue
+            self.turn_system.start_entity_turn(entity)  # Avanza su reloj: cooldowns y duraciones
+            self.effect_system.on_turn_start(entity)
+            event_system.emit(EventTypes.TURN_STARTED, {
+                'entity': entity,
+                'turn': self.turn_system.turn_count
+            })
+    
+    def _resolve_deaths(self, killer=None):
+        dead = [e for e in self.entities if e.stats['current_hp'] <= 0]
+        for entity in dead:
+            self.entities.remove(entity)
+            self._discard_entity(entity)
+            event_system.emit(EventTypes.ENTITY_DIED, {'entity': entity, 'killer': killer})
+    
+    # ------------------------------------------------------------------
+    # Bucle de simulación
+    # ------------------------------------------------------------------
+    def step(self, policy=None) -> Optional[SimAction]:
+        """Elige una acción con la política y la aplica"""
+        if self.is_over():
+            return None
+        action = (policy or self.policy)(self)
+        self.apply_action(action)
+        return action
+    
+    def run(self, policy=None) -> Dict[str, Any]:
+        """Juega la batalla hasta el final y devuelve el resultado"""
+        while not self.is_over():
+            self.step(policy)
+        return self.result()
+    
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+    def _as_range(self, value):
+        """Los rangos en JSON pueden ser int, "10", "global" o "infinite" """
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return self.grid.width + self.grid.height
+    
+    @staticmethod
+    def _distance(pos1, pos2):
+        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+
+
+def greedy_policy(simulator: BattleSimulator) -> SimAction:
+    """
+    Política por defecto: usa habilidades si puede, si no se acerca al enemigo más cercano.
+    Los movimientos solo se enumeran si no hay ninguna habilidad disponible
+    """
+    abilities = simulator.ability_actions()
+    if abilities:
+        return simulator.rng.choice(abilities)
+    
+    # Cada destino se puntúa una vez contra las posiciones enemigas (calculadas una vez)
+    team = simulator.current_team
+    enemy_positions = [e.position for e in simulator.entities if e.team != team]
+    best, closest = None, []
+    for actor, (x, y) in simulator.move_destinations():
+        distance = min((abs(x - ex) + abs(y - ey) for ex, ey in enemy_positions), default=0)
+        if best is None or distance < best:
+            best, closest = distance, [(actor, (x, y))]
+        elif distance == best:
+            closest.append((actor, (x, y)))
+    if closest:
+        actor, cell = simulator.rng.choice(closest)
+        return SimAction(SimAction.MOVE, entity=actor, path=[cell])
+    
+    return SimAction(SimAction.END_TURN)
+
+
+def benchmark(n_battles=100, seed=0, **simulator_kwargs) -> Dict[str, float]:
+    """Mide cuántas batallas completas por segundo resuelve el simulador"""
+    simulator = BattleSimulator(seed=seed, **simulator_kwargs)
+    total_turns = 0
+    total_actions = 0
+    
+    start = time.perf_counter()
+    for i in range(n_battles):
+        simulator.reset(seed + i)
+        result = simulator.run()
+        total_turns += result['turns']
+        total_actions += result['actions']
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'battles': n_battles,
+        'seconds': elapsed,
+        'battles_per_second': n_battles / elapsed if elapsed > 0 else float('inf'),
+        'avg_turns': total_turns / n_battles if n_battles else 0,
+        'avg_actions': total_actions / n_battles if n_battles else 0
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark del simulador de batallas headless")
+    parser.add_argument("--battles", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=50)
+    parser.add_argument("--log-level", default=None,
+                        help="DEBUG/INFO/WARNING/ERROR/SILENT (por defecto GAME_LOG_LEVEL o SILENT)")
+    args = parser.parse_args()
+    
+    # Benchmark: sin consola salvo que se pida (mediría la E/S de los logs, no el simulador)
+    logger.set_level(args.log_level or os.environ.get("GAME_LOG_LEVEL", SILENT))
+    
+    stats = benchmark(args.battles, args.seed, max_turns=args.max_turns)
+    print(f"🏁 {stats['battles']} batallas en {stats['seconds']:.2f}s "
+          f"→ {stats['battles_per_second']:.1f} batallas/s "
+          f"(media {stats['avg_turns']:.1f} turnos, {stats['avg_actions']:.1f} acciones)")
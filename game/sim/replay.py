@@ -0,0 +1,382 @@
+"""
+Replays deterministas: grabación compacta de comandos y reproducción headless
+
+Formato (JSON Lines, solo se añade al final; se puede leer aunque la partida
+se cortara a medias):
+    {"c":"h","v":1,"seed":...,"party":[...],"enemies":[...],"characters":{...},"entities":[...]}
+    {"c":"a","u":0,"k":"corte_fugaz","t":3,"es":[0,1,3,4],"p":[5,3],"x":{"direction":[1,0]}}
+    {"c":"m","u":1,"p":[[2,4],[3,4],[4,4]],"d":[3]}
+    {"c":"e","n":2,"s":[[100,4,4],[80,7,3],...]}
+    {"c":"r","winner":"player","turns":4}
+Las entidades se referencian por su índice en el orden de creación (cabecera
+'entities'). Cada fin de turno guarda HP y posición de todas ellas: el runner
+compara ese estado y reporta la primera divergencia (bug o cambio de reglas).
+
+Uso:
+    python -m game.sim.replay replays/*.jsonl              # máxima velocidad
+    python -m game.sim.replay partida.jsonl --render-turns 3,4
+    python -m game.sim.replay replays/ --current-configs   # re-evaluar tras cambiar reglas
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from game.core.event_system import event_system
+from game.core.logger import logger, SILENT
+
+REPLAY_VERSION = 1
+
+# Datos extra del contexto que dependen de la selección del jugador (el resto son sistemas)
+RECORDED_EXTRA_KEYS = ('direction', 'line_length')
+
+
+def build_header(player_party_ids, enemy_configs, seed=None, max_turns=None, grid_size=None):
+    """Cabecera del replay: composición de la batalla y configs de personaje usadas"""
+    from game.core.config_manager import ConfigManager, thaw_config
+    
+    config_manager = ConfigManager.get_instance()
+    character_ids = [entry['character_id'] if isinstance(entry, dict) else entry for entry in player_party_ids]
+    character_ids += [config['character_id'] for config in enemy_configs if 'character_id' in config]
+    
+    return {
+        'c': 'h',
+        'v': REPLAY_VERSION,
+        'seed': seed,
+        'max_turns': max_turns,
+        'grid': list(grid_size) if grid_size else None,
+        'party': list(player_party_ids),
+        'enemies': list(enemy_configs),
+        'characters': {cid: thaw_config(config_manager.get_character_config(cid))
+                       for cid in dict.fromkeys(character_ids)},
+        'created': time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+class ReplayRecorder:
+    """
+    Escribe un comando por línea y vacía el buffer en cada una (sobrevive a un crash).
+    Con path=None los registros se quedan en memoria (records): la IA obtiene así
+    los comandos de su plan ya resueltos y en el mismo formato.
+    """
+    
+    def __init__(self, path, header, entities):
+        self.path = path
+        self.entities = list(entities)
+        self._index = {id(entity): i for i, entity in enumerate(self.entities)}
+        self.commands = 0
+        self.records = [] if path is None else None
+        self._file = None
+        
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'w', encoding='utf-8')
+        self._write(dict(header, entities=[entity.name for entity in self.entities]))
+    
+    def _write(self, record):
+        if self.records is not None:
+            self.records.append(record)
+            return
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n")
+        self._file.flush()
+    
+    def _ref(self, entity):
+        return self._index.get(id(entity)) if entity is not None else None
+    
+    def record_ability(self, caster, ability_key, context):
+        """Habilidad con su contexto ya resuelto (objetivo, casilla, entidades y dirección)"""
+        record = {'c': 'a', 'u': self._ref(caster), 'k': ability_key,
+                  'es': [self._ref(entity) for entity in context.entities or []]}
+        if context.target is not None:
+            record['t'] = self._ref(context.target)
+        if context.target_position is not None:
+            record['p'] = list(context.target_position)
+        extra = {key: context.extra_data[key] for key in RECORDED_EXTRA_KEYS
+                 if key in (context.extra_data or {})}
+        if extra:
+            record['x'] = extra
+        self._write(record)
+        self.commands += 1
+    
+    def record_move(self, entity, path, dash_targets=()):
+        """Ruta confirmada completa (MovementSystem.movement_path) y objetivos de embestida"""
+        record = {'c': 'm', 'u': self._ref(entity), 'p': [list(cell) for cell in path]}
+        if dash_targets:
+            record['d'] = [self._ref(enemy) for enemy in dash_targets]
+        self._write(record)
+        self.commands += 1
+    
+    def record_end_turn(self, turn_count):
+        """Fin de turno + huella del estado para detectar divergencias al reproducir"""
+        self._write({'c': 'e', 'n': turn_count, 's': state_fingerprint(self.entities)})
+        self.commands += 1
+    
+    def record_result(self, result):
+        self._write({'c': 'r', 'winner': result.get('winner'), 'turns': result.get('turns')})
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def state_fingerprint(entities):
+    """[hp, x, y] por entidad en orden de creación"""
+    return [[entity.stats['current_hp'], *entity.position] for entity in entities]
+
+
+def load_replay(path):
+    """Retorna (cabecera, comandos). Una última línea truncada (crash) se ignora"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    
+    records = []
+    for number, line in enumerate(lines):
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            if number == len(lines) - 1:
+                break
+            raise ValueError(f"{path}:{number + 1}: línea de replay corrupta")
+    
+    if not records or records[0].get('c') != 'h':
+        raise ValueError(f"{path}: falta la cabecera del replay")
+    header = records[0]
+    if header.get('v') != REPLAY_VERSION:
+        raise ValueError(f"{path}: versión de replay no soportada: {header.get('v')}")
+    return header, records[1:]
+
+
+@contextmanager
+def recorded_configs(characters):
+    """Instala temporalmente las configs de personaje grabadas en el ConfigManager"""
+    from game.core.config_manager import ConfigManager
+    
+    config_manager = ConfigManager.get_instance()
+    previous = {cid: config_manager.set_character_config(cid, config) for cid, config in characters.items()}
+    try:
+        yield
+    finally:
+        for cid, config in previous.items():
+            config_manager.set_character_config(cid, config)
+
+
+def render_board(simulator) -> str:
+    """Tablero en texto: mayúscula = jugador, minúscula = enemigo, '.' = libre"""
+    grid = simulator.grid
+    rows = [["." for _ in range(grid.width)] for _ in range(grid.height)]
+    for entity in simulator.entities:
+        x, y = entity.position
+        if 0 <= x < grid.width and 0 <= y < grid.height:
+            letter = entity.name[0]
+            rows[y][x] = letter.upper() if entity.team == "player" else letter.lower()
+    
+    lines = ["".join(row) for row in rows]
+    for entity in simulator.entities:
+        lines.append(f"  {entity.name}: HP {entity.stats['current_hp']}/{entity.stats['max_hp']} "
+                     f"PH {entity.stats['current_ph']} @ {entity.position}")
+    return "\n".join(lines)
+
+
+class ReplayRunner:
+    """
+    Reproduce replays sobre BattleSimulator sin pantalla ni política: cada
+    comando se aplica tal cual se grabó. Con render_turns, solo esos turnos
+    muestran logs y tablero; el resto corre en silencio a máxima velocidad.
+    """
+    
+    def __init__(self, use_recorded_configs=True, render_turns=None, render_level="INFO",
+                 stop_on_desync=False, out=None):
+        self.use_recorded_configs = use_recorded_configs
+        self.render_turns = set(render_turns or ())
+        self.render_level = render_level
+        self.stop_on_desync = stop_on_desync
+        self.out = out or sys.stdout
+        self._simulators = {}
+    
+    def _simulator_for(self, header):
+        """Un simulador por tamaño de grid, reutilizado entre replays"""
+        from game.sim.battle_simulator import BattleSimulator
+        
+        grid_size = tuple(header['grid']) if header.get('grid') else (10, 8)
+        simulator = self._simulators.get(grid_size)
+        if simulator is None:
+            simulator = BattleSimulator(player_party_ids=header['party'], enemy_configs=header['enemies'],
+                                        grid_size=grid_size)
+            self._simulators[grid_size] = simulator
+        
+        simulator.player_party_ids = header['party']
+        simulator.enemy_configs = header['enemies']
+        simulator.max_turns = header.get('max_turns') or simulator.max_turns
+        return simulator
+    
+    def run(self, path) -> Dict[str, Any]:
+        header, commands = load_replay(path)
+        previous_level = logger.level
+        desyncs = []
+        expected_result = None
+        start = time.perf_counter()
+        try:
+            logger.set_level(SILENT)
+            simulator = self._simulator_for(header)
+            configs = recorded_configs(header['characters']) if self.use_recorded_configs else _no_override()
+            with configs:
+                simulator.reset(header.get('seed'))
+            entities = list(simulator.entities)
+            if len(entities) != len(header.get('entities', entities)):
+                raise ValueError(f"{path}: el replay tiene {len(header['entities'])} entidades "
+                                 f"y la batalla recreada {len(entities)}")
+            
+            self._enter_turn(simulator)
+            for index, command in enumerate(commands):
+                kind = command['c']
+                if kind == 'r':
+                    expected_result = {'winner': command.get('winner'), 'turns': command.get('turns')}
+                    continue
+                
+                turn = simulator.turn_count
+                desync = self._apply(simulator, entities, command)
+                if desync:
+                    desyncs.append(dict(desync, command=index, turn=turn))
+                    if self.stop_on_desync:
+                        break
+                
+                if kind != 'e' and turn in self.render_turns:
+                    self._render(simulator, command)
+                if kind == 'e':
+                    self._enter_turn(simulator)
+        finally:
+            logger.flush()
+            logger.set_level(previous_level)
+        elapsed = time.perf_counter() - start
+        
+        result = simulator.result()
+        if expected_result and (expected_result['winner'], expected_result['turns']) != (result['winner'], result['turns']):
+            desyncs.append({'reason': 'result', 'expected': expected_result,
+                            'actual': {'winner': result['winner'], 'turns': result['turns']}})
+        
+        return {
+            'path': path,
+            'commands': len(commands),
+            'winner': result['winner'],
+            'turns': result['turns'],
+            'expected_result': expected_result,
+            'desyncs': desyncs,
+            'seconds': elapsed
+        }
+    
+    def run_many(self, paths) -> List[Dict[str, Any]]:
+        return [self.run(path) for path in paths]
+    
+    def _apply(self, simulator, entities, command) -> Optional[Dict[str, Any]]:
+        """Aplica un comando; retorna la divergencia detectada, si la hay"""
+        from game.sim.battle_simulator import SimAction
+        
+        kind = command['c']
+        if kind == 'e':
+            simulator.apply_action(SimAction(SimAction.END_TURN))
+            actual = state_fingerprint(entities)
+            if 's' in command and actual != command['s']:
+                return {'reason': 'state', 'expected': command['s'], 'actual': actual}
+            return None
+        
+        entity = entities[command['u']]
+        if entity not in simulator.entities:
+            return {'reason': 'dead_actor', 'entity': entity.name}
+        
+        if kind == 'm':
+            path = [tuple(cell) for cell in command['p']]
+            dash_targets = [entities[i] for i in command.get('d', ())]
+            simulator.run_command(entity, SimAction.MOVE,
+                                  lambda: simulator.execute_move(entity, path, dash_targets))
+        elif kind == 'a':
+            ability_key = command['k']
+            target = entities[command['t']] if 't' in command else None
+            target_position = tuple(command['p']) if 'p' in command else None
+            context = simulator.create_context(entity, target=target, target_position=target_position)
+            context.entities = [entities[i] for i in command.get('es', ())]
+            for key, value in command.get('x', {}).items():
+                context.extra_data[key] = tuple(value) if isinstance(value, list) else value
+            # Un comando que falla también falló al grabarse: la huella de fin de turno decide
+            simulator.run_command(entity, ability_key,
+                                  lambda: simulator.execute_ability(entity, ability_key, context))
+        else:
+            raise ValueError(f"Comando de replay desconocido: {kind}")
+        return None
+    
+    def _enter_turn(self, simulator):
+        if simulator.turn_count in self.render_turns:
+            logger.set_level(self.render_level)
+            self._print(f"=== Replay: turno {simulator.turn_count} ({simulator.current_team}) ===")
+            self._print(render_board(simulator))
+        else:
+            logger.set_level(SILENT)
+    
+    def _render(self, simulator, command):
+        logger.flush()
+        self._print(f"--- {json.dumps(command, ensure_ascii=False)}")
+        self._print(render_board(simulator))
+    
+    def _print(self, text):
+        self.out.write(text + "\n")
+
+
+@contextmanager
+def _no_override():
+    yield
+
+
+def _expand_paths(paths):
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                   if name.endswith('.jsonl')))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Reproduce replays de batalla sin pantalla")
+    parser.add_argument("paths", nargs="+", help="Archivos .jsonl o directorios de replays")
+    parser.add_argument("--render-turns", default="", help="Turnos a mostrar con logs y tablero: 3,4")
+    parser.add_argument("--current-configs", action="store_true",
+                        help="Usar las configs actuales en vez de las grabadas (re-evaluar reglas)")
+    parser.add_argument("--stop-on-desync", action="store_true")
+    args = parser.parse_args(argv)
+    
+    logger.set_level(os.environ.get("GAME_LOG_LEVEL", SILENT))  # Los turnos de --render-turns usan render_level
+    event_system.set_history_enabled(False)
+    render_turns = [int(turn) for turn in args.render_turns.split(",") if turn.strip()]
+    runner = ReplayRunner(use_recorded_configs=not args.current_configs,
+                          render_turns=render_turns, stop_on_desync=args.stop_on_desync)
+    
+    paths = _expand_paths(args.paths)
+    start = time.perf_counter()
+    reports = runner.run_many(paths)
+    elapsed = time.perf_counter() - start
+    
+    diverged = [report for report in reports if report['desyncs']]
+    for report in diverged:
+        first = report['desyncs'][0]
+        print(f"⚠️ {report['path']}: {len(report['desyncs'])} divergencias, "
+              f"primera en comando {first.get('command')} (turno {first.get('turn')}): {first['reason']}")
+    commands = sum(report['commands'] for report in reports)
+    print(f"🎞️ {len(reports)} replays ({commands} comandos) en {elapsed:.2f}s "
+          f"→ {len(reports) / elapsed if elapsed else 0:.1f} replays/s | {len(diverged)} con divergencias")
+    return reports
+
+
+if __name__ == "__main__":
+    main()
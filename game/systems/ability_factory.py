@@ -1,13 +1,28 @@
 """
 Sistema de fábrica de habilidades - VERSIÓN CORREGIDA SIN IMPORTACIONES CIRCULARES
+Las habilidades son prototipos inmutables compartidos por todas las entidades con
+la misma config; cada entidad solo guarda un AbilityState con su cooldown.
 """
+from collections.abc import Mapping
 
 from game.core.action_base import BaseAction, ActionContext
+from game.core.config_manager import freeze_config
 from game.core.event_system import event_system, EventTypes
-from game.core.logger import logger 
+from game.core.logger import logger, combat_log
+from game.systems.effect_compiler import EffectCompileError, EffectRegistry
+from game.systems.formulas import BASE_DAMAGE_FORMULA, compile_formula
+from game.systems.targeting import (VECTORIZE_MIN_ENTITIES, entities_in_radius, filter_entities, matches_filter,
+                                    normalize_filter)
+from game.systems.turn_system import TurnClock
+
+# Tipos de componente de habilidad: 'type' de cada efecto en la config -> clase
+EFFECT_COMPONENTS = EffectRegistry("componente de habilidad")
 
 class EffectComponent:
-    """Componente base para todos los efectos de habilidades"""
+    """
+    Componente base para todos los efectos de habilidades.
+    Las subclases leen su config una vez en __init__ y apply() solo usa atributos
+    """
     
     def __init__(self, config):
         self.config = config
@@ -20,27 +35,70 @@ class EffectComponent:
     
     def _calculate_distance(self, pos1, pos2):
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+    
+    # Significado propio de cada componente sobre el vocabulario común de targeting
+    filter_aliases = {}
+    default_filter = 'enemies'
+    
+    def _target_filter(self, target_filter):
+        return normalize_filter(self.filter_aliases.get(target_filter, target_filter), self.default_filter)
+    
+    def _injected_grid(self, context):
+        """Grid compartido (con índice de ocupación) inyectado en el contexto, o None"""
+        return context.extra_data.get('grid_system') if context.extra_data else None
+    
+    def _get_grid(self, context):
+        """Grid para límites del tablero: el inyectado o uno vacío (sin ocupación: no usar para casillas libres)"""
+        grid_system = self._injected_grid(context)
+        if grid_system is None:
+            from game.systems.grid_system import GridSystem
+            grid_system = GridSystem()
+        return grid_system
+    
+    def _is_free(self, context, position, exclude=None):
+        """Casilla sin otra entidad: índice del grid inyectado o, sin él (contextos heredados), context.entities"""
+        grid_system = self._injected_grid(context)
+        if grid_system is not None:
+            return not grid_system.is_occupied(position, exclude=exclude)
+        return not any(entity.position == position and entity is not exclude
+                       for entity in context.entities or ())
 
+# damage_type, pierce_through y range son informativos: no intervienen en el cálculo
+@EFFECT_COMPONENTS.register('damage', fields=('multiplier', 'formula', 'aoe_radius', 'target',
+                                              'damage_type', 'pierce_through', 'range'))
 class DamageEffect(EffectComponent):
     """Efecto de daño genérico - SIN TIPOS DE DAÑO"""
     
+    # En daño y curación 'allies' siempre ha incluido al lanzador
+    filter_aliases = {'allies': 'all_allies'}
+    
+    def __init__(self, config):
+        super().__init__(config)
+        multiplier = config.get('multiplier', 1.0)
+        # Multiplicador por posición del objetivo (cadena) o el mismo para todos
+        self.multipliers = tuple(multiplier) if isinstance(multiplier, (list, tuple)) else None
+        self.multiplier = multiplier
+        self.formula = compile_formula(config.get('formula', BASE_DAMAGE_FORMULA))
+        self.aoe_radius = config.get('aoe_radius', 0)
+        self.target_filter = self._target_filter(config.get('target', 'enemies'))
+    
     def apply(self, context):
-        multiplier = self.config.get('multiplier', 1.0)
-        aoe_radius = self.config.get('aoe_radius', 0)
-        target_filter = self.config.get('target', 'enemies')
-        
-        targets = self._get_targets(context, aoe_radius, target_filter)
+        targets = self._get_targets(context, self.aoe_radius, self.target_filter)
         total_damage = 0
+        caster_stats = context.caster.stats
+        
+        # Muchos objetivos (AoE grande): todo el daño se calcula antes, en una sola evaluación
+        precomputed = None
+        if len(targets) >= VECTORIZE_MIN_ENTITIES:
+            precomputed = self.formula.damage_many(caster_stats, targets, [
+                self._multiplier_at(i) for i in range(len(targets))
+            ])
         
         for i, target in enumerate(targets):
-            if isinstance(multiplier, list):
-                current_multiplier = multiplier[min(i, len(multiplier) - 1)]
+            if precomputed is not None:
+                damage = precomputed[i]
             else:
-                current_multiplier = multiplier
-                
-            damage = max(1, int(
-                (context.caster.stats['attack'] - target.stats['defense'] // 2) * current_multiplier
-            ))
+                damage = self.formula.damage(caster_stats, target.stats, self._multiplier_at(i))
             
             target.stats['current_hp'] -= damage
             total_damage += damage
@@ -56,39 +114,45 @@ class DamageEffect(EffectComponent):
         
         return len(targets) > 0
     
+    def _multiplier_at(self, i):
+        """Multiplicador del objetivo i (en cadena el último se repite)"""
+        multipliers = self.multipliers
+        if multipliers is None:
+            return self.multiplier
+        return multipliers[min(i, len(multipliers) - 1)]
+    
     def _get_targets(self, context, aoe_radius, target_filter):
         targets = []
         
         if aoe_radius > 0 and context.target_position:
-            for entity in context.entities:
-                distance = self._calculate_distance(context.target_position, entity.position)
-                if distance <= aoe_radius and self._is_valid_target(entity, context.caster, target_filter):
-                    targets.append(entity)
+            targets = entities_in_radius(context.entities, context.target_position, aoe_radius,
+                                         context.caster, target_filter, selected=context.target)
         elif context.target and self._is_valid_target(context.target, context.caster, target_filter):
             targets = [context.target]
         elif context.entities:
-            targets = [e for e in context.entities if self._is_valid_target(e, context.caster, target_filter)]
+            targets = filter_entities(context.entities, context.caster, target_filter, selected=context.target)
         
         return targets
     
     def _is_valid_target(self, target, caster, target_filter):
-        if target_filter == 'enemies':
-            return target.team != caster.team
-        elif target_filter == 'allies':
-            return target.team == caster.team
-        elif target_filter == 'all':
-            return True
-        return target.team != caster.team
+        return matches_filter(target, caster, target_filter, selected=target)
 
+@EFFECT_COMPONENTS.register('heal', fields=('amount', 'aoe_radius', 'target'))
 class HealEffect(EffectComponent):
     """Efecto de curación genérico"""
     
+    filter_aliases = {'allies': 'all_allies'}
+    default_filter = 'all_allies'
+    
+    def __init__(self, config):
+        super().__init__(config)
+        self.amount = config.get('amount', 0)
+        self.aoe_radius = config.get('aoe_radius', 0)
+        self.target_filter = self._target_filter(config.get('target', 'allies'))
+    
     def apply(self, context):
-        amount = self.config.get('amount', 0)
-        aoe_radius = self.config.get('aoe_radius', 0)
-        target_filter = self.config.get('target', 'allies')
-        
-        targets = self._get_targets(context, aoe_radius, target_filter)
+        amount = self.amount
+        targets = self._get_targets(context, self.aoe_radius, self.target_filter)
         total_healing = 0
         
         for target in targets:
@@ -108,69 +172,75 @@ class HealEffect(EffectComponent):
                 
                 logger.combat_event("Habilidad de curación", context.caster, target, healing=heal)
         
-        logger.debug(f"{context.caster.name} curó {total_healing} HP a {len(targets)} objetivos")
+        combat_log.debug("%s curó %s HP a %s objetivos", context.caster.name, total_healing, len(targets))
         return len(targets) > 0
     
     def _get_targets(self, context, aoe_radius, target_filter):
         targets = []
         
         if aoe_radius > 0 and context.target_position:
-            for entity in context.entities:
-                distance = self._calculate_distance(context.target_position, entity.position)
-                if distance <= aoe_radius and self._is_valid_target(entity, context.caster, target_filter):
-                    targets.append(entity)
+            targets = entities_in_radius(context.entities, context.target_position, aoe_radius,
+                                         context.caster, target_filter, selected=context.target)
         elif context.target and self._is_valid_target(context.target, context.caster, target_filter):
             targets = [context.target]
-        elif target_filter == 'allies' and context.entities:
-            targets = [e for e in context.entities if e.team == context.caster.team]
-        elif target_filter == 'all' and context.entities:
-            targets = context.entities
+        elif target_filter in ('all_allies', 'all') and context.entities:
+            targets = filter_entities(context.entities, context.caster, target_filter)
         
         return targets
     
     def _is_valid_target(self, target, caster, target_filter):
-        if target_filter == 'allies':
-            return target.team == caster.team
-        elif target_filter == 'all':
-            return True
-        return target.team == caster.team
+        return matches_filter(target, caster, target_filter, selected=target)
 
+@EFFECT_COMPONENTS.register('movement', fields=('move_type', 'range'))
 class MovementEffect(EffectComponent):
     """Efecto de movimiento/teletransporte"""
     
+    def __init__(self, config):
+        super().__init__(config)
+        move_type = config.get('move_type', 'teleport')
+        self.range_distance = config.get('range', 1)
+        # El tipo de movimiento se resuelve aquí: apply() llama directamente al método elegido
+        moves = {
+            'teleport': self._teleport,
+            'line_movement': self._line_movement,
+            'post_action': self._post_action
+        }
+        if move_type not in moves:
+            raise EffectCompileError(f"movimiento de tipo desconocido {move_type!r} (admitidos: {', '.join(moves)})")
+        self._move = moves[move_type]
+    
     def apply(self, context):
-        move_type = self.config.get('move_type', 'teleport')
-        range_distance = self.config.get('range', 1)
-        
-        if move_type == 'teleport' and context.target_position:
-            old_pos = context.caster.position
-            context.caster.position = context.target_position
-            logger.debug(f"{context.caster.name} se teletransportó: {old_pos} → {context.target_position}")
-            return True
-        
-        elif move_type == 'line_movement' and context.extra_data:
-            direction = context.extra_data.get('direction', (0, 0))
-            max_length = context.extra_data.get('line_length', range_distance)
-            
-            old_pos = context.caster.position
-            new_pos = self._calculate_line_end_position(old_pos, direction, max_length)
-            
-            context.caster.position = new_pos
-            logger.debug(f"{context.caster.name} se desplaza en línea: {old_pos} → {new_pos}")
-            return True
+        return self._move(context)
+    
+    def _teleport(self, context):
+        if not context.target_position:
+            return False
+        old_pos = context.caster.position
+        context.caster.position = context.target_position
+        combat_log.debug("%s se teletransportó: %s → %s", context.caster.name, old_pos, context.target_position)
+        return True
+    
+    def _line_movement(self, context):
+        if not context.extra_data:
+            return False
+        direction = context.extra_data.get('direction', (0, 0))
+        max_length = context.extra_data.get('line_length', self.range_distance)
         
-        elif move_type == 'post_action':
-            context.caster.pending_post_action_move = True
-            context.caster.post_action_move_range = range_distance
-            logger.debug(f"{context.caster.name} prepara movimiento posterior de {range_distance} casillas")
-            return True
+        old_pos = context.caster.position
+        new_pos = self._calculate_line_end_position(self._get_grid(context), old_pos, direction, max_length)
         
-        return False
+        context.caster.position = new_pos
+        combat_log.debug("%s se desplaza en línea: %s → %s", context.caster.name, old_pos, new_pos)
+        return True
     
-    def _calculate_line_end_position(self, start_pos, direction, max_length):
-        from game.systems.grid_system import GridSystem
-        grid_system = GridSystem()
-        
+    def _post_action(self, context):
+        range_distance = self.range_distance
+        context.caster.pending_post_action_move = True
+        context.caster.post_action_move_range = range_distance
+        combat_log.debug("%s prepara movimiento posterior de %s casillas", context.caster.name, range_distance)
+        return True
+    
+    def _calculate_line_end_position(self, grid_system, start_pos, direction, max_length):
         current_pos = start_pos
         
         for i in range(max_length):
@@ -183,14 +253,20 @@ class MovementEffect(EffectComponent):
         
         return current_pos
 
+@EFFECT_COMPONENTS.register('buff', fields=('stat_buffs', 'duration', 'target', 'aoe_radius'))
 class BuffEffect(EffectComponent):
     """Efecto de mejora de estadísticas"""
     
+    def __init__(self, config):
+        super().__init__(config)
+        self.stat_buffs = config.get('stat_buffs', {})
+        self.duration = config.get('duration', 1)
+        self.target_type = config.get('target', 'self')
+        self.aoe_radius = config.get('aoe_radius', 0)
+    
     def apply(self, context):
-        stat_buffs = self.config.get('stat_buffs', {})
-        duration = self.config.get('duration', 1)
-        target_type = self.config.get('target', 'self')
-        aoe_radius = self.config.get('aoe_radius', 0)
+        stat_buffs, duration = self.stat_buffs, self.duration
+        target_type, aoe_radius = self.target_type, self.aoe_radius
         
         if target_type == 'self':
             targets = [context.caster]
@@ -208,23 +284,29 @@ class BuffEffect(EffectComponent):
             targets = [context.caster]
         
         for target in targets:
-            logger.debug(f"{target.name} recibe buff: {stat_buffs} por {duration} turnos")
+            combat_log.debug("%s recibe buff: %s por %s turnos", target.name, stat_buffs, duration)
         
         return len(targets) > 0
 
+@EFFECT_COMPONENTS.register('status', fields=('status_type', 'duration', 'value', 'target'))
 class StatusEffect(EffectComponent):
     """Efecto de aplicación de estados"""
     
+    filter_aliases = {'allies': 'all_allies'}
+    
+    def __init__(self, config):
+        super().__init__(config)
+        self.status_type = config.get('status_type')
+        self.duration = config.get('duration', 1)
+        self.value = config.get('value', 0)
+        self.target_filter = self._target_filter(config.get('target', 'enemies'))
+    
     def apply(self, context):
-        status_type = self.config.get('status_type')
-        duration = self.config.get('duration', 1)
-        value = self.config.get('value', 0)
-        target_filter = self.config.get('target', 'enemies')
-        
-        targets = self._get_targets(context, target_filter)
+        targets = self._get_targets(context, self.target_filter)
         
         for target in targets:
-            logger.debug(f"{target.name} recibe {status_type} (valor: {value}) por {duration} turnos")
+            combat_log.debug("%s recibe %s (valor: %s) por %s turnos",
+                             target.name, self.status_type, self.value, self.duration)
         
         return len(targets) > 0
     
@@ -232,31 +314,32 @@ class StatusEffect(EffectComponent):
         if context.target:
             return [context.target] if self._is_valid_target(context.target, context.caster, target_filter) else []
         elif context.entities:
-            return [e for e in context.entities if self._is_valid_target(e, context.caster, target_filter)]
+            return filter_entities(context.entities, context.caster, target_filter)
         return []
     
     def _is_valid_target(self, target, caster, target_filter):
-        if target_filter == 'enemies':
-            return target.team != caster.team
-        elif target_filter == 'allies':
-            return target.team == caster.team
-        elif target_filter == 'all':
-            return True
-        return target.team != caster.team
+        return matches_filter(target, caster, target_filter, selected=target)
 
+# movement_pattern es informativo: la posición final siempre queda tras el último objetivo
+@EFFECT_COMPONENTS.register('chain_movement', fields=('multiplier', 'formula', 'movement_pattern'))
 class ChainMovementEffect(EffectComponent):
     """Efecto de movimiento en cadena"""
     
+    def __init__(self, config):
+        super().__init__(config)
+        self.multipliers = tuple(config.get('multiplier', [1.0]))
+        self.formula = compile_formula(config.get('formula', BASE_DAMAGE_FORMULA))
+    
     def apply(self, context):
         if not context.entities or len(context.entities) == 0:
-            logger.warning("ChainMovement: No hay objetivos para la cadena")
+            combat_log.warning("ChainMovement: No hay objetivos para la cadena")
             return False
         
         caster = context.caster
         targets = context.entities
-        multipliers = self.config.get('multiplier', [1.0])
+        multipliers = self.multipliers
         
-        logger.debug(f"Iniciando movimiento en cadena con {len(targets)} objetivos")
+        combat_log.debug("Iniciando movimiento en cadena con %s objetivos", len(targets))
         
         total_damage = 0
         for i, target in enumerate(targets):
@@ -278,20 +361,18 @@ class ChainMovementEffect(EffectComponent):
         
         final_position = self._calculate_final_position(caster, targets)
         
-        if final_position and self._is_position_valid(final_position, caster, context.entities):
+        if final_position and self._is_position_valid(final_position, caster, context):
             old_pos = caster.position
             caster.position = final_position
-            logger.debug(f"{caster.name} se desplaza: {old_pos} → {final_position}")
+            combat_log.debug("%s se desplaza: %s → %s", caster.name, old_pos, final_position)
         else:
-            logger.warning("No se pudo calcular posición final válida")
+            combat_log.warning("No se pudo calcular posición final válida")
         
-        logger.info(f"Cadena completada: {total_damage} daño total")
+        combat_log.info("Cadena completada: %s daño total", total_damage)
         return True
     
     def _calculate_damage(self, caster, target, multiplier):
-        return max(1, int(
-            (caster.stats['attack'] - target.stats['defense'] // 2) * multiplier
-        ))
+        return self.formula.damage(caster.stats, target.stats, multiplier)
     
     def _calculate_final_position(self, caster, targets):
         if not targets:
@@ -309,26 +390,24 @@ class ChainMovementEffect(EffectComponent):
         
         return (behind_x, behind_y)
     
-    def _is_position_valid(self, position, caster, all_entities):
-        from game.systems.grid_system import GridSystem
-        grid_system = GridSystem()
-        
-        if not grid_system.is_valid_position(position):
+    def _is_position_valid(self, position, caster, context):
+        if not self._get_grid(context).is_valid_position(position):
             return False
         
-        for entity in all_entities:
-            if entity.position == position and entity != caster:
-                return False
-        
-        return True
+        return self._is_free(context, position, exclude=caster)
 
+@EFFECT_COMPONENTS.register('resource_recovery', fields=('ph_recovery', 'energy_recovery', 'target'))
 class ResourceRecoveryEffect(EffectComponent):
     """Efecto para recuperar PH, energía, etc."""
     
+    def __init__(self, config):
+        super().__init__(config)
+        self.ph_recovery = config.get('ph_recovery', 0)
+        self.energy_recovery = config.get('energy_recovery', 0)
+        self.target_type = config.get('target', 'self')
+    
     def apply(self, context):
-        ph_recovery = self.config.get('ph_recovery', 0)
-        energy_recovery = self.config.get('energy_recovery', 0)
-        target_type = self.config.get('target', 'self')
+        ph_recovery, energy_recovery, target_type = self.ph_recovery, self.energy_recovery, self.target_type
         
         if target_type == 'self':
             targets = [context.caster]
@@ -348,24 +427,25 @@ class ResourceRecoveryEffect(EffectComponent):
                 )
                 actual_recovery = target.stats['current_ph'] - old_ph
                 if actual_recovery > 0:
-                    logger.debug(f"{target.name} recuperó {actual_recovery} PH")
+                    combat_log.debug("%s recuperó %s PH", target.name, actual_recovery)
             
             if energy_recovery > 0 and hasattr(target, 'gain_energy'):
                 target.gain_energy(energy_recovery, "ability_recovery")
         
         return True
 
+@EFFECT_COMPONENTS.register('apply_effect', fields=('target', 'aoe_radius'), required=('effect_id',))
 class ApplyEffectComponent(EffectComponent):
     """Componente para aplicar efectos del sistema data-driven - VERSIÓN COMPLETA"""
     
+    def __init__(self, config):
+        super().__init__(config)
+        self.effect_id = config['effect_id']
+        self.target_type = config.get('target', 'enemy')
+        self.aoe_radius = config.get('aoe_radius', 0)
+    
     def apply(self, context):
-        effect_id = self.config.get('effect_id')
-        target_type = self.config.get('target', 'enemy')
-        aoe_radius = self.config.get('aoe_radius', 0)
-        
-        if not effect_id:
-            logger.warning("ApplyEffectComponent: effect_id no especificado")
-            return False
+        effect_id, target_type, aoe_radius = self.effect_id, self.target_type, self.aoe_radius
         
         try:
             # Obtener el sistema de efectos del contexto
@@ -375,13 +455,13 @@ class ApplyEffectComponent(EffectComponent):
                 # Intentar encontrar el effect_system alternativamente
                 effect_system = self._find_effect_system(context)
                 if not effect_system:
-                    logger.warning("No se pudo encontrar EffectSystem en el contexto")
+                    combat_log.warning("No se pudo encontrar EffectSystem en el contexto")
                     return False
             
             # Determinar objetivos basados en target_type y aoe_radius
             targets = self._get_targets(context, target_type, aoe_radius)
             if not targets:
-                logger.warning(f"No se encontraron objetivos para {effect_id} (tipo: {target_type})")
+                combat_log.warning("No se encontraron objetivos para %s (tipo: %s)", effect_id, target_type)
                 return False
             
             # Aplicar efecto a cada objetivo
@@ -389,15 +469,15 @@ class ApplyEffectComponent(EffectComponent):
             for target in targets:
                 if effect_system.apply_effect(target, effect_id, context.caster):
                     success_count += 1
-                    logger.debug(f"✨ {effect_id} aplicado a {target.name}")
+                    combat_log.debug("✨ %s aplicado a %s", effect_id, target.name)
                 else:
-                    logger.warning(f"❌ No se pudo aplicar {effect_id} a {target.name}")
+                    combat_log.warning("❌ No se pudo aplicar %s a %s", effect_id, target.name)
             
-            logger.info(f"ApplyEffect: {success_count}/{len(targets)} objetivos afectados por {effect_id}")
+            combat_log.info("ApplyEffect: %s/%s objetivos afectados por %s", success_count, len(targets), effect_id)
             return success_count > 0
             
         except Exception as e:
-            logger.error(f"Error en ApplyEffectComponent para {effect_id}", exception=e)
+            combat_log.error(f"Error en ApplyEffectComponent para {effect_id}", exception=e)
             return False
     
     def _find_effect_system(self, context):
@@ -415,7 +495,7 @@ class ApplyEffectComponent(EffectComponent):
         if hasattr(context, 'extra_data') and 'effect_system' in context.extra_data:
             return context.extra_data['effect_system']
         
-        logger.warning("No se pudo encontrar EffectSystem mediante ningún método")
+        combat_log.warning("No se pudo encontrar EffectSystem mediante ningún método")
         return None
     
     def _get_targets(self, context, target_type, aoe_radius):
@@ -423,11 +503,9 @@ class ApplyEffectComponent(EffectComponent):
         targets = []
         
         if aoe_radius > 0 and context.target_position:
-            # AOE alrededor de una posición
-            for entity in context.entities:
-                distance = self._calculate_distance(context.target_position, entity.position)
-                if distance <= aoe_radius and self._is_valid_target(entity, context.caster, target_type):
-                    targets.append(entity)
+            # AOE alrededor de una posición (en área 'allies' incluye al lanzador)
+            targets = entities_in_radius(context.entities, context.target_position, aoe_radius, context.caster,
+                                         self._aoe_filter(target_type), selected=context.target)
         elif target_type == 'self':
             targets = [context.caster]
         elif target_type == 'selected' and context.target:
@@ -436,12 +514,8 @@ class ApplyEffectComponent(EffectComponent):
             targets = [context.target] if context.target.team != context.caster.team else []
         elif target_type == 'ally' and context.target:
             targets = [context.target] if context.target.team == context.caster.team else []
-        elif target_type == 'allies':
-            targets = [e for e in context.entities if e.team == context.caster.team and e != context.caster]
-        elif target_type == 'all_allies':
-            targets = [e for e in context.entities if e.team == context.caster.team]
-        elif target_type == 'enemies':
-            targets = [e for e in context.entities if e.team != context.caster.team]
+        elif target_type in ('allies', 'all_allies', 'enemies'):
+            targets = filter_entities(context.entities, context.caster, target_type)
         elif target_type == 'all':
             targets = [e for e in context.entities if e != context.caster]
         else:
@@ -453,23 +527,14 @@ class ApplyEffectComponent(EffectComponent):
         
         return targets
     
+    def _aoe_filter(self, target_type):
+        return 'all_allies' if target_type == 'allies' else normalize_filter(target_type)
+    
     def _is_valid_target(self, target, caster, target_type):
         """Determina si un objetivo es válido para el tipo de objetivo"""
-        if target_type == 'self':
-            return target == caster
-        elif target_type == 'enemy':
-            return target.team != caster.team
-        elif target_type == 'ally':
-            return target.team == caster.team and target != caster
-        elif target_type == 'allies':
-            return target.team == caster.team
-        elif target_type == 'enemies':
-            return target.team != caster.team
-        elif target_type == 'all':
-            return True
-        else:
-            return target.team != caster.team 
+        return matches_filter(target, caster, self._aoe_filter(target_type), selected=target)
 
+@EFFECT_COMPONENTS.register('cleanse_effects')
 class CleanseEffectsComponent(EffectComponent):
     """Limpia efectos negativos del objetivo"""
     
@@ -477,17 +542,21 @@ class CleanseEffectsComponent(EffectComponent):
         if not context.target:
             return False
         
-        logger.debug(f"{context.caster.name} limpia efectos de {context.target.name}")
+        combat_log.debug("%s limpia efectos de %s", context.caster.name, context.target.name)
         return True
 
+@EFFECT_COMPONENTS.register('ultimate_recharge', fields=('target', 'value'))
 class UltimateRechargeComponent(EffectComponent):
     """Recarga la ultimate del objetivo"""
     
+    def __init__(self, config):
+        super().__init__(config)
+        self.target_type = config.get('target', 'self')
+        self.recharge_amount = config.get('value', 100)
+    
     def apply(self, context):
-        target_type = self.config.get('target', 'self')
-        recharge_amount = self.config.get('value', 100)
-        
-        targets = self._get_targets(context, target_type)
+        recharge_amount = self.recharge_amount
+        targets = self._get_targets(context, self.target_type)
         
         for target in targets:
             if hasattr(target, 'energy_stats'):
@@ -495,7 +564,7 @@ class UltimateRechargeComponent(EffectComponent):
                     target.energy_stats['max_energy'],
                     target.energy_stats['current_energy'] + recharge_amount
                 )
-                logger.debug(f"{target.name} recibe {recharge_amount} de energía ultimate")
+                combat_log.debug("%s recibe %s de energía ultimate", target.name, recharge_amount)
         
         return len(targets) > 0
     
@@ -529,47 +598,27 @@ class ComposableAbility(BaseAction):
         
         self.effects_config = ability_config.get('effects', [])
         self.effects = self._build_effects()
+        # Cadena de llamadas ya resuelta: ejecutar la habilidad no consulta la config
+        self._pipeline = tuple(effect.apply for effect in self.effects)
         self.ability_config = ability_config
     
     def _build_effects(self):
-        effects = []
-        for effect_config in self.effects_config:
-            effect_type = effect_config['type']
-            
-            if effect_type == 'damage':
-                effects.append(DamageEffect(effect_config))
-            elif effect_type == 'heal':
-                effects.append(HealEffect(effect_config))
-            elif effect_type == 'movement':
-                effects.append(MovementEffect(effect_config))
-            elif effect_type == 'buff':
-                effects.append(BuffEffect(effect_config))
-            elif effect_type == 'status':
-                effects.append(StatusEffect(effect_config))
-            elif effect_type == 'chain_movement':
-                effects.append(ChainMovementEffect(effect_config))
-            elif effect_type == 'resource_recovery':
-                effects.append(ResourceRecoveryEffect(effect_config))
-            elif effect_type == 'apply_effect':
-                effects.append(ApplyEffectComponent(effect_config))
-            elif effect_type == 'cleanse_effects':
-                effects.append(CleanseEffectsComponent(effect_config))
-            elif effect_type == 'ultimate_recharge':
-                effects.append(UltimateRechargeComponent(effect_config))
-        
-        return effects
+        """Compila cada efecto con el registro de componentes (EffectCompileError si la config es inválida)"""
+        where = f"habilidad '{self.name}'"
+        return [EFFECT_COMPONENTS.compile(effect_config, where) for effect_config in self.effects_config]
     
-    def execute(self, context):
+    def execute(self, context, state=None):
         context.ability_name = self.name
         
         success = False
-        for effect in self.effects:
-            if effect.apply(context):
+        for apply in self._pipeline:
+            if apply(context):
                 success = True
         
         if success:
             context.caster.has_acted = True
             context.caster.stats['current_ph'] -= self.cost_ph
+            (self if state is None else state).start_cooldown()
             
             event_system.emit(EventTypes.ABILITY_USED, {
                 'caster': context.caster,
@@ -579,6 +628,8 @@ class ComposableAbility(BaseAction):
             
             logger.ability_used(context.caster, self.name, context.target, success=True)
         
+        # 📬 Punto de vaciado: en modo diferido los impactos se despachan en un solo lote
+        event_system.flush()
         return success
     
     def get_description(self):
@@ -586,7 +637,7 @@ class ComposableAbility(BaseAction):
         for effect in self.effects:
             if isinstance(effect, DamageEffect):
                 multiplier = effect.config.get('multiplier', 1.0)
-                if isinstance(multiplier, list):
+                if isinstance(multiplier, (list, tuple)):
                     min_dmg = int(multiplier[0] * 100)
                     max_dmg = int(multiplier[-1] * 100)
                     descriptions.append(f"Daño cadena: {min_dmg}%-{max_dmg}% ATQ")
@@ -603,6 +654,12 @@ class ComposableAbility(BaseAction):
                 elif move_type == 'post_action':
                     descriptions.append(f"Movimiento posterior: {range_distance} casillas")
         return " | ".join(descriptions) if descriptions else "Habilidad especial"
+    
+    def __copy__(self):
+        return self  # Los prototipos compartidos son inmutables
+    
+    def __deepcopy__(self, memo):
+        return self
 
 class UltimateAbility(ComposableAbility):
     """Habilidad definitiva que requiere energía específica"""
@@ -612,20 +669,20 @@ class UltimateAbility(ComposableAbility):
         self.energy_cost = ability_config.get('energy_cost', 100)
         self.is_ultimate = True
     
-    def can_execute(self, context):
-        base_can_execute = super().can_execute(context)
+    def can_execute(self, context, state=None):
+        base_can_execute = super().can_execute(context, state)
         if not base_can_execute:
             return False
         
         if not context.caster.can_use_ultimate(self.ability_config):
             current_energy = context.caster.get_energy_absolute()
-            logger.warning(f"Energía insuficiente: {current_energy}/{self.energy_cost}")
+            combat_log.warning("Energía insuficiente: %s/%s", current_energy, self.energy_cost)
             return False
         
         return True
     
-    def execute(self, context):
-        if not self.can_execute(context):
+    def execute(self, context, state=None):
+        if not self.can_execute(context, state):
             return False
         
         if not context.caster.consume_ultimate_energy(self.energy_cost):
@@ -634,13 +691,14 @@ class UltimateAbility(ComposableAbility):
         context.ability_name = self.name
         success = False
         
-        for effect in self.effects:
-            if effect.apply(context):
+        for apply in self._pipeline:
+            if apply(context):
                 success = True
         
         if success:
             context.caster.has_acted = True
             context.caster.stats['current_ph'] -= self.cost_ph
+            (self if state is None else state).start_cooldown()
             
             event_system.emit(EventTypes.ABILITY_USED, {
                 'caster': context.caster,
@@ -650,15 +708,173 @@ class UltimateAbility(ComposableAbility):
             })
             
             logger.ability_used(context.caster, self.name, context.target, success=True)
-            logger.info(f"🪄 ULTIMATE USADA: {self.name}!")
+            combat_log.info("🪄 ULTIMATE USADA: %s!", self.name)
         
+        event_system.flush()
         return success
 
+class AbilityState:
+    """
+    Estado por entidad de una habilidad compartida: solo el cooldown.
+    Nombre, coste, efectos y config se leen del prototipo, así que entity.actions
+    conserva la interfaz de siempre (current_cooldown, execute, can_execute...).
+    El cooldown es el tick del reloj de turnos de la entidad en que vuelve a estar
+    lista: nadie lo decrementa al pasar de turno
+    """
+    
+    __slots__ = ('prototype', 'clock', '_ready_tick', '_own_clock')
+    
+    def __init__(self, prototype, clock=None):
+        self.prototype = prototype
+        self._own_clock = clock is None  # Sin entidad: reloj propio que solo avanza update_cooldown
+        self.clock = TurnClock() if clock is None else clock
+        self._ready_tick = self.clock.ticks
+    
+    def __getattr__(self, name):
+        if name == 'prototype':  # Instancia a medio construir (copy/pickle)
+            raise AttributeError(name)
+        return getattr(self.prototype, name)
+    
+    def can_execute(self, context):
+        return self.prototype.can_execute(context, self)
+    
+    def execute(self, context):
+        return self.prototype.execute(context, self)
+    
+    @property
+    def current_cooldown(self):
+        remaining = self._ready_tick - self.clock.ticks
+        return remaining if remaining > 0 else 0
+    
+    @current_cooldown.setter
+    def current_cooldown(self, value):
+        self._ready_tick = self.clock.ticks + value
+    
+    def start_cooldown(self):
+        cooldown = self.prototype.cooldown
+        if cooldown > 0:
+            self._ready_tick = self.clock.ticks + cooldown
+    
+    def update_cooldown(self):
+        """
+        Un turno más en el reloj propio (estados sin entidad). Con el reloj de la entidad
+        no hace nada: ya lo avanza TurnSystem.start_entity_turn y se contaría dos veces
+        """
+        if self._own_clock:
+            self.clock.ticks += 1
+    
+    def __repr__(self):
+        return f"AbilityState({self.prototype.name!r}, cooldown={self.current_cooldown})"
+
+def _freeze(value):
+    """Config anidada (dicts/listas) como estructura hashable"""
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+MAX_PROTOTYPE_VERSIONS = 4  # Configs distintas de una misma habilidad en caché (recargas, replays)
+
 class AbilityFactory:
     """Factory que crea habilidades normales y definitivas"""
     
+    # (personaje, clave) -> {config congelada (_freeze): prototipo compartido}, de la menos a la más reciente
+    _prototypes = {}
+    
     @staticmethod
     def create_ability(ability_config):
         if ability_config.get('is_ultimate', False):
             return UltimateAbility(ability_config)
-        return ComposableAbility(ability_config)
\ No newline at end of file
+        return ComposableAbility(ability_config)
+    
+    @classmethod
+    def get_prototype(cls, owner_id, ability_key, ability_config):
+        """
+        Prototipo compartido por todas las entidades con la misma habilidad.
+        Una config distinta (otra versión, recarga) genera un prototipo nuevo; de cada
+        habilidad se guardan como mucho MAX_PROTOTYPE_VERSIONS (sale la menos usada)
+        """
+        versions = cls._prototypes.get((owner_id, ability_key))
+        if versions is None:
+            versions = cls._prototypes[(owner_id, ability_key)] = {}
+        frozen = _freeze(ability_config)
+        prototype = versions.pop(frozen, None)
+        if prototype is None:
+            config = dict(ability_config)
+            config['key'] = ability_key
+            prototype = cls.create_ability(freeze_config(config))
+            if len(versions) >= MAX_PROTOTYPE_VERSIONS:
+                del versions[next(iter(versions))]
+        versions[frozen] = prototype  # Al final: la más reciente
+        return prototype
+    
+    @classmethod
+    def create_state(cls, owner_id, ability_key, ability_config, clock=None):
+        """Habilidad para una entidad: prototipo compartido + su propio cooldown (contado con clock)"""
+        return AbilityState(cls.get_prototype(owner_id, ability_key, ability_config), clock)
+    
+    @classmethod
+    def clear_prototypes(cls):
+        cls._prototypes.clear()
+    
+    @classmethod
+    def drop_owner(cls, owner_id):
+        """Olvida los prototipos de un personaje (ya no está en la config)"""
+        for cache_key in [cache_key for cache_key in cls._prototypes if cache_key[0] == owner_id]:
+            del cls._prototypes[cache_key]
+    
+    @classmethod
+    def reload_abilities(cls, entities, ability_keys, config_manager):
+        """
+        Recarga en caliente de las habilidades (personaje, clave) cambiadas en las entidades vivas.
+        Primero se construyen todos los prototipos nuevos (si alguno falla no se toca nada) y
+        luego cada AbilityState cambia de prototipo conservando su cooldown; las habilidades
+        añadidas o eliminadas entran o salen de entity.actions en el orden de la config.
+        Los snapshots anteriores a un cambio de habilidades (no de valores) no se deben restaurar.
+        Retorna el número de entidades actualizadas
+        """
+        changed = {}
+        for owner_id, ability_key in ability_keys:
+            changed.setdefault(owner_id, set()).add(ability_key)
+        
+        configs = {owner_id: config_manager.get_character_config(owner_id) for owner_id in changed}
+        prototypes = {(owner_id, key): cls.get_prototype(owner_id, key, configs[owner_id]['abilities'][key])
+                      for owner_id, keys in changed.items() for key in keys
+                      if key in configs[owner_id].get('abilities', {})}
+        
+        # Fuera de la caché las versiones viejas de lo que cambió (las nuevas se quedan)
+        for cache_key in [(owner_id, key) for owner_id, keys in changed.items() for key in keys]:
+            prototype = prototypes.get(cache_key)
+            if prototype is None:
+                cls._prototypes.pop(cache_key, None)  # Habilidad eliminada de la config
+            else:
+                cls._prototypes[cache_key] = {frozen: version for frozen, version in cls._prototypes[cache_key].items()
+                                              if version is prototype}
+        for owner_id in changed:
+            if owner_id not in config_manager.get_character_ids():
+                cls.drop_owner(owner_id)  # Personaje eliminado: también sus habilidades sin cambios
+        
+        updated = 0
+        for entity in entities:
+            owner_id = getattr(entity, 'character_id', None)
+            if owner_id not in changed:
+                continue
+            abilities = configs[owner_id].get('abilities', {})
+            actions = {}
+            for key in abilities:
+                action = entity.actions.get(key)
+                if key in changed[owner_id]:
+                    if isinstance(action, AbilityState):
+                        action.prototype = prototypes[(owner_id, key)]
+                    else:
+                        action = AbilityState(prototypes[(owner_id, key)], entity.turn_clock)
+                actions[key] = action
+            for key, action in entity.actions.items():
+                if key not in actions and key not in entity.abilities_config:
+                    actions[key] = action  # Acciones añadidas a mano (add_action)
+            entity.actions.clear()
+            entity.actions.update(actions)
+            entity.abilities_config = abilities
+            updated += 1
+        return updated
@@ -1,7 +1,6 @@
 """
 Sistema de habilidades - VERSIÓN REFACTORIZADA
 """
-import pygame
 from game.core.action_base import ActionContext  
 from game.systems.selection_system import SelectionSystem
 from game.core.logger import logger
@@ -13,8 +12,9 @@ class AbilitySystem:
         self.game_context = game_context  # ✅ NUEVO: Contexto central
         self.selected_ability = None
         self.caster = None
+        self.recorder = None  # ReplayRecorder: graba cada habilidad con su contexto resuelto
         self.selection_system = SelectionSystem(self)
-        logger.debug("AbilitySystem inicializado", {
+        logger.debug("AbilitySystem inicializado", context={
             "grid_system": type(grid_system).__name__,
             "effect_system": "provided" if effect_system else "not provided",
             "game_context": "provided" if game_context else "not provided"
@@ -26,13 +26,13 @@ class AbilitySystem:
     
     def select_ability(self, ability_data, caster, entities):
         if caster.has_acted:
-            logger.warning(f"{caster.name} intentó usar habilidad pero ya actuó este turno")
+            logger.warning("%s intentó usar habilidad pero ya actuó este turno", caster.name)
             return False
         
         if caster.stats['current_ph'] < ability_data['cost_ph']:
             logger.warning(
-                f"PH insuficiente para {ability_data['name']}", 
-                {
+                "PH insuficiente para %s", ability_data['name'],
+                context={
                     "current_ph": caster.stats['current_ph'],
                     "required_ph": ability_data['cost_ph'],
                     "caster": caster.name
@@ -48,14 +48,14 @@ class AbilitySystem:
         
         if success:
             logger.info(
-                f"Modo {selection_mode} activado para {ability_data['name']}",
-                {"caster": caster.name, "ability": ability_data['name']}
+                "Modo %s activado para %s", selection_mode, ability_data['name'],
+                context={"caster": caster.name, "ability": ability_data['name']}
             )
             return True
         else:
             logger.warning(
-                f"No se pudo activar modo {selection_mode}",
-                {"ability": ability_data['name'], "caster": caster.name}
+                "No se pudo activar modo %s", selection_mode,
+                context={"ability": ability_data['name'], "caster": caster.name}
             )
             self.clear_selection()
             return False
@@ -106,6 +106,8 @@ class AbilitySystem:
                     elif self.game_context:
                         context.extra_data['effect_system'] = self.game_context.get_system('effect')
                 
+                if self.recorder is not None:
+                    self.recorder.record_ability(self.caster, ability_key, context)
                 success = self.caster.perform_action(ability_key, context)
 
                 if success:
@@ -124,7 +126,7 @@ class AbilitySystem:
                         context.target, 
                         success=False
                     )
-                    logger.warning(f"Habilidad {self.selected_ability['name']} falló al ejecutarse")
+                    logger.warning("Habilidad %s falló al ejecutarse", self.selected_ability['name'])
             else:
                 logger.error(
                     f"Habilidad {ability_key} no encontrada en {self.caster.name}",
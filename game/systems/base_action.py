@@ -6,6 +6,7 @@ Diseñado para escalabilidad y mantenibilidad a largo plazo.
 from abc import ABC, abstractmethod
 from typing import Optional, List, Tuple, Any
 from game.core.event_system import event_system, EventTypes
+from game.core.logger import combat_log
 
 
 class ActionContext:
@@ -41,6 +42,9 @@ class ActionContext:
     
     def get_entity_at_position(self, position: Tuple[int, int]):
         """Obtiene entidad en una posición específica"""
+        grid_system = self.extra_data.get('grid_system')
+        if grid_system is not None:
+            return grid_system.get_entity_at(position)
         return next((e for e in self.entities if e.position == position), None)
 
 
@@ -148,11 +152,11 @@ class BaseAction(ABC):
     
     def _on_failure(self, context: ActionContext):
         """Hook llamado después de ejecución fallida"""
-        print(f"❌ {self.name} falló al ejecutarse")
+        combat_log.warning("%s falló al ejecutarse", self.name)
     
     def _on_error(self, context: ActionContext, error: Exception):
         """Hook llamado cuando ocurre un error"""
-        print(f"💥 Error en {self.name}: {error}")
+        combat_log.error("💥 Error en %s: %s", self.name, error)
     
     def start_cooldown(self):
         """Inicia el cooldown de la acción"""
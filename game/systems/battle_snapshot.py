@@ -0,0 +1,197 @@
+"""
+Snapshots de batalla baratos: capturar y restaurar sin deepcopy
+Cada entidad se codifica como una tupla plana (su fila de entity_store con
+stats, energía y flags del turno, posición y cooldowns). Los efectos se comparten: se guardan
+las mismas instancias de GenericEffect junto a sus campos mutables y al
+restaurar se les reasignan. Un snapshot es inmutable y se puede restaurar
+tantas veces como se quiera (lookahead de IA, deshacer, previsualizaciones).
+Tomarlos en puntos de vaciado del bus (sin eventos diferidos pendientes).
+Benchmark: python -m game.systems.battle_snapshot
+"""
+import copy
+
+from game.entities.entity_store import entity_store
+
+
+class BattleSnapshot:
+    """Estado completo de una batalla en tuplas planas"""
+    
+    __slots__ = ('entities', 'records', 'effects', 'turn', 'extra')
+    
+    def __init__(self, entities, records, effects, turn, extra=None):
+        self.entities = entities  # Tupla de entidades vivas en el momento de la captura
+        self.records = records    # Una tupla plana por entidad (ver _capture_entity)
+        self.effects = effects    # ((entidad, ((efecto, campos...), ...)), ...)
+        self.turn = turn          # (equipo activo, contador) o None
+        self.extra = extra        # Estado propio de quien captura (simulador, escena...)
+    
+    def __repr__(self):
+        return f"BattleSnapshot({len(self.entities)} entidades, turno {self.turn})"
+
+
+def _capture_entity(entity):
+    return (
+        entity,
+        entity_store.capture_row(entity._row),  # Stats, energía y flags del turno de su fila
+        entity.position,
+        tuple(action.current_cooldown for action in entity.actions.values())
+    )
+
+
+def _restore_entity(record):
+    entity, row_state, position, cooldowns = record
+    
+    entity_store.restore_row(entity._row, row_state)
+    entity.position = position  # El setter mantiene el índice del grid
+    for action, cooldown in zip(entity.actions.values(), cooldowns):
+        action.current_cooldown = cooldown
+
+
+def capture(entities, effect_system=None, turn_system=None, extra=None) -> BattleSnapshot:
+    """Captura entidades, efectos activos y turno"""
+    entities = tuple(entities)
+    records = tuple(_capture_entity(entity) for entity in entities)
+    
+    effects = ()
+    if effect_system is not None:
+        effects = tuple(
+            (entity, tuple((effect, effect.current_turn, effect.stacks, effect.is_active,
+                            effect.duration, effect._state.copy() if effect._state else None)
+                           for effect in entity_effects))
+            for entity, entity_effects in effect_system.entity_effects.items() if entity_effects
+        )
+    
+    turn = (turn_system.current_turn, turn_system.turn_count) if turn_system is not None else None
+    return BattleSnapshot(entities, records, effects, turn, extra)
+
+
+def restore(snapshot: BattleSnapshot, effect_system=None, turn_system=None):
+    """Devuelve entidades, efectos y turno al estado capturado"""
+    for record in snapshot.records:
+        _restore_entity(record)
+    
+    if effect_system is not None:
+        effect_system.clear()
+        for entity, saved_effects in snapshot.effects:
+            restored = []
+            for effect, current_turn, stacks, is_active, duration, state in saved_effects:
+                effect.current_turn = current_turn
+                effect.stacks = stacks
+                effect.is_active = is_active
+                effect.duration = duration
+                effect._state.clear()
+                if state:
+                    effect._state.update(state)
+                restored.append(effect)
+            effect_system.set_effects(entity, restored)
+    
+    if turn_system is not None and snapshot.turn is not None:
+        turn_system.current_turn, turn_system.turn_count = snapshot.turn
+
+
+def transfer(snapshot: BattleSnapshot, entities, effect_system=None, turn_system=None):
+    """
+    Aplica el snapshot de otra batalla sobre entidades equivalentes (mismo reparto,
+    emparejadas por orden). Los efectos se clonan con origen y destino remapeados.
+    Así la IA copia la escena a su simulador headless sin compartir objetos.
+    Acepta también snapshots portables (ver portable): sus índices se resuelven
+    contra `entities`. Retorna las entidades destino que aparecían en el snapshot.
+    """
+    entities = tuple(entities)
+    if snapshot.entities and isinstance(snapshot.entities[0], int):
+        mapping = dict(enumerate(entities))
+    elif len(entities) != len(snapshot.entities):
+        raise ValueError(f"El snapshot tiene {len(snapshot.entities)} entidades y el destino {len(entities)}")
+    else:
+        mapping = dict(zip(snapshot.entities, entities))
+    
+    for record in snapshot.records:
+        _restore_entity((mapping[record[0]],) + record[1:])
+    
+    if effect_system is not None:
+        effect_system.clear()
+        for entity, saved_effects in snapshot.effects:
+            target = mapping.get(entity)
+            if target is None:
+                continue
+            clones = []
+            for effect, current_turn, stacks, is_active, duration, state in saved_effects:
+                clone = copy.copy(effect)
+                clone.source = mapping.get(effect.source, effect.source)
+                clone.current_turn = current_turn
+                clone.stacks = stacks
+                clone.is_active = is_active
+                clone.duration = duration
+                clone._state = dict(state) if state else {}
+                clones.append(clone)
+            effect_system.set_effects(target, clones)
+    
+    if turn_system is not None and snapshot.turn is not None:
+        turn_system.current_turn, turn_system.turn_count = snapshot.turn
+    
+    return tuple(mapping[entity] for entity in snapshot.entities)
+
+
+def portable(snapshot: BattleSnapshot, roster=None) -> BattleSnapshot:
+    """
+    Copia serializable con pickle para enviarla a otro proceso: las entidades
+    pasan a ser su índice en roster (por defecto, en el propio snapshot) y los
+    efectos se clonan apuntando a índices. Se aplica en el destino con transfer()
+    """
+    index = {id(entity): i for i, entity in enumerate(roster if roster is not None else snapshot.entities)}
+    records = tuple((index[id(record[0])],) + record[1:] for record in snapshot.records)
+    
+    effects = []
+    for entity, saved_effects in snapshot.effects:
+        if id(entity) not in index:
+            continue
+        detached = []
+        for saved in saved_effects:
+            clone = copy.copy(saved[0])
+            clone.source = index.get(id(clone.source))
+            detached.append((clone,) + saved[1:])
+        effects.append((index[id(entity)], tuple(detached)))
+    
+    return BattleSnapshot(tuple(index[id(entity)] for entity in snapshot.entities), records,
+                          tuple(effects), snapshot.turn)
+
+
+def benchmark(iterations=10000, seed=0) -> dict:
+    """Captura/restauración de una batalla del simulador frente a copy.deepcopy"""
+    import time
+    from game.core.logger import logger, SILENT
+    from game.sim.battle_simulator import BattleSimulator
+    
+    logger.set_level(SILENT)
+    simulator = BattleSimulator(seed=seed)
+    for _ in range(6):
+        simulator.step()
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        snapshot = simulator.snapshot()
+    capture_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(iterations):
+        simulator.restore(snapshot)
+    restore_time = time.perf_counter() - start
+    
+    deep_iterations = max(1, iterations // 100)
+    state = (simulator.entities, simulator.effect_system.entity_effects)
+    start = time.perf_counter()
+    for _ in range(deep_iterations):
+        copy.deepcopy(state)
+    deepcopy_time = time.perf_counter() - start
+    
+    return {
+        'capture_us': capture_time / iterations * 1e6,
+        'restore_us': restore_time / iterations * 1e6,
+        'deepcopy_us': deepcopy_time / deep_iterations * 1e6
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark()
+    print(f"📸 snapshot {stats['capture_us']:.1f}µs | restore {stats['restore_us']:.1f}µs | "
+          f"deepcopy {stats['deepcopy_us']:.0f}µs")
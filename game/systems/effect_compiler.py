@@ -0,0 +1,62 @@
+"""
+Compilador de efectos: cada config se valida una sola vez y se convierte en una llamada
+con sus constantes ya ligadas.
+Los componentes de habilidad (ability_factory) y las acciones de los efectos persistentes
+(effect_system) se registran por tipo en un EffectRegistry. Al crear un prototipo de
+habilidad o cargar el registro de efectos se comprueban tipo y campos; en ejecución ya
+no se consulta ningún diccionario de config.
+"""
+from typing import Any, Callable, Dict, Iterable
+
+from game.core.logger import logger
+
+
+class EffectCompileError(ValueError):
+    """Config de efecto inválida: tipo desconocido o campo obligatorio ausente"""
+
+
+class EffectRegistry:
+    """Tipos de efecto registrados: tipo -> (compilador, campos admitidos, campos obligatorios)"""
+    
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._entries: Dict[str, tuple] = {}
+    
+    def register(self, effect_type: str, fields: Iterable[str] = (), required: Iterable[str] = ()):
+        """
+        Decorador: registra un compilador config -> callable (una clase sirve).
+        Los campos fuera de `fields` se avisan al compilar; los de `required` son obligatorios
+        """
+        required = tuple(required)
+        
+        def decorator(compiler):
+            self._entries[effect_type] = (compiler, frozenset(fields) | set(required) | {'type'}, required)
+            return compiler
+        return decorator
+    
+    def __contains__(self, effect_type):
+        return effect_type in self._entries
+    
+    def types(self):
+        return tuple(self._entries)
+    
+    def compile(self, config: Dict[str, Any], where: str = "") -> Callable:
+        effect_type = config.get('type')
+        entry = self._entries.get(effect_type)
+        if entry is None:
+            raise EffectCompileError(f"{where}: {self.kind} de tipo desconocido {effect_type!r} "
+                                     f"(registrados: {', '.join(self._entries)})")
+        
+        compiler, fields, required = entry
+        missing = [field for field in required if field not in config]
+        if missing:
+            raise EffectCompileError(f"{where}: a {self.kind} '{effect_type}' le faltan campos {missing}")
+        
+        unknown = sorted(set(config) - fields)
+        if unknown:
+            logger.warning("%s: campos no reconocidos en %s '%s' (se ignoran): %s",
+                           where, self.kind, effect_type, unknown)
+        try:
+            return compiler(config)
+        except EffectCompileError as e:  # Validaciones propias del compilador (valores de un campo)
+            raise EffectCompileError(f"{where}: {self.kind} '{effect_type}': {e}") from None
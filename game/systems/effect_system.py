@@ -1,13 +1,28 @@
 """
 Sistema de efectos - VERSIÓN CORREGIDA SIN IMPORTACIONES CIRCULARES
+Las acciones de cada efecto se compilan una vez al cargar el registro
+(EFFECT_ACTIONS): en cada trigger solo se recorren funciones ya resueltas.
+EffectSystem indexa los efectos vivos por trigger y por (entidad, id): cada trigger
+visita solo los efectos que lo definen y los turnos se cuentan con el reloj de la
+entidad (TurnClock), sin recorrer sus efectos. Cada expiración se programa en una
+rueda indexada por el tick en que vence: el fin de turno solo visita los efectos
+que expiran de verdad (una duración de 999 no cuesta nada hasta entonces).
+Benchmark: python -m game.systems.effect_system
 """
+import time
 from typing import Dict, List, Any
-from game.core.logger import logger
+from game.core.logger import logger, effects_log
+from game.systems.effect_compiler import EffectCompileError, EffectRegistry
+from game.systems.formulas import compile_formula
+from game.systems.turn_system import TurnClock
+
+_UNBOUND_CLOCK = TurnClock()  # Efectos aún sin entidad: su turno no avanza
+
 
 class GenericEffect:
     """Efecto genérico que se configura completamente por datos"""
     
-    def __init__(self, effect_data: Dict[str, Any], source):
+    def __init__(self, effect_data: Dict[str, Any], source, triggers=None):
         self.effect_id = effect_data['id']
         self.name = effect_data['name']
         self.duration = effect_data.get('duration', 1)
@@ -15,22 +30,56 @@ class GenericEffect:
         self.source = source
         self.config = effect_data
         self.stacks = 1
-        self.current_turn = 0
+        self._clock = _UNBOUND_CLOCK
+        self._turn_mark = 0  # Tick del reloj en que current_turn valía 0
+        self._expires_at = None  # Tick programado en la rueda de EffectSystem (None: sin entidad)
         self.is_active = True
         
         # Estado interno para efectos complejos
         self._state = {}
+        # Acciones compiladas por trigger, compartidas por todas las instancias del efecto
+        self.triggers = triggers if triggers is not None else compile_effect_definition(effect_data)
+    
+    def __copy__(self):
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        return clone
+    
+    def __getstate__(self):
+        # Las acciones compiladas son closures: no viajan con pickle y se recompilan al cargar
+        state = self.__dict__.copy()
+        state['triggers'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.triggers = compile_effect_definition(self.config)
     
     def on_apply(self, target):
-        logger.info(f"{target.name} recibe {self.name}")
+        effects_log.info("%s recibe %s", target.name, self.name)
         self._execute_actions('on_apply', target)
         from game.core.event_system import event_system, EventTypes
         event_system.emit(EventTypes.EFFECT_APPLIED, {
             'target': target, 'effect': self, 'source': self.source
         })
     
+    @property
+    def current_turn(self):
+        """Inicios de turno de la entidad desde que se aplicó (o se volvió a apilar) el efecto"""
+        return self._clock.ticks - self._turn_mark
+    
+    @current_turn.setter
+    def current_turn(self, value):
+        self._turn_mark = self._clock.ticks - value
+    
+    def bind_clock(self, clock: TurnClock):
+        """Pasa a contar con el reloj de su entidad conservando el turno actual"""
+        turn = self.current_turn
+        self._clock = clock
+        self._turn_mark = clock.ticks - turn
+    
     def on_turn_start(self, target):
-        self.current_turn += 1
+        """El turno ya lo cuenta el reloj de la entidad (TurnSystem.start_entity_turn)"""
         self._execute_actions('on_turn_start', target)
     
     def on_turn_end(self, target):
@@ -41,147 +90,23 @@ class GenericEffect:
     
     def on_remove(self, target):
         self._execute_actions('on_remove', target)
-        logger.debug(f"{target.name} pierde {self.name}")
+        effects_log.debug("%s pierde %s", target.name, self.name)
         from game.core.event_system import event_system, EventTypes
         event_system.emit(EventTypes.EFFECT_REMOVED, {
             'target': target, 'effect': self, 'source': self.source
         })
     
     def _execute_actions(self, trigger: str, target, extra_data=None):
-        """Ejecuta todas las acciones para un trigger dado"""
-        actions = self.config.get('actions', {}).get(trigger, [])
-        
-        for action in actions:
-            self._execute_action(action, target, extra_data)
-    
-    def _execute_action(self, action: Dict[str, Any], target, extra_data=None):
-        """Ejecuta una acción individual"""
-        action_type = action['type']
-        
-        if action_type == 'damage':
-            self._action_damage(action, target)
-        elif action_type == 'heal':
-            self._action_heal(action, target)
-        elif action_type == 'modify_stat':
-            self._action_modify_stat(action, target)
-        elif action_type == 'modify_damage':
-            self._action_modify_damage(action, target, extra_data)
-        elif action_type == 'custom':
-            self._action_custom(action, target, extra_data)
-    
-    def _action_damage(self, action, target):
-        """Acción: aplicar daño SIMPLIFICADO - sin tipos de daño"""
-        base_damage = action.get('value', 0)
-        
-        # Calcular daño final
-        damage = self._calculate_value(base_damage, action.get('calculation'), target)
-        damage *= self.stacks
-        
-        if damage > 0:
-            target.stats['current_hp'] -= damage
-            logger.combat_event(f"Efecto {self.name}", self.source, target, damage=damage)
-            
-            from game.core.event_system import event_system, EventTypes
-            event_system.emit(EventTypes.ENTITY_DAMAGED, {
-                'attacker': self.source,
-                'target': target,
-                'damage': damage,
-                'source_effect': self.name
-            })
-    
-    def _action_heal(self, action, target):
-        """Acción: curar"""
-        heal_amount = action.get('value', 0)
-        heal_amount = self._calculate_value(heal_amount, action.get('calculation'), target)
-        heal_amount *= self.stacks
-        
-        if heal_amount > 0:
-            old_hp = target.stats['current_hp']
-            target.stats['current_hp'] = min(
-                target.stats['max_hp'], 
-                old_hp + heal_amount
-            )
-            actual_heal = target.stats['current_hp'] - old_hp
-            
-            logger.combat_event(f"Efecto {self.name}", self.source, target, healing=actual_heal)
-            
-            from game.core.event_system import event_system, EventTypes
-            event_system.emit(EventTypes.ENTITY_HEALED, {
-                'healer': self.source,
-                'target': target,
-                'amount': actual_heal,
-                'source_effect': self.name
-            })
-    
-    def _action_modify_stat(self, action, target):
-        """Acción: modificar estadística"""
-        stat = action['stat']
-        modifier = action['value']
-        operation = action.get('operation', 'add')  # add, multiply, set
-        
-        # Guardar valor original si es la primera vez
-        if f'original_{stat}' not in self._state:
-            self._state[f'original_{stat}'] = target.stats.get(stat, 0)
-        
-        current_value = target.stats.get(stat, 0)
-        original_value = self._state[f'original_{stat}']
-        
-        if operation == 'add':
-            target.stats[stat] = original_value + (modifier * self.stacks)
-        elif operation == 'multiply':
-            target.stats[stat] = int(original_value * (1 + modifier))
-        elif operation == 'set':
-            target.stats[stat] = modifier
-        
-        logger.debug(f"{target.name} {stat}: {original_value} → {target.stats[stat]}")
-    
-    def _action_modify_damage(self, action, target, damage_data):
-        """Acción: modificar daño entrante/saliente"""
-        if not damage_data:
-            return
-            
-        modifier_type = action.get('modifier_type', 'incoming')  # incoming, outgoing
-        value = action.get('value', 0)
-        operation = action.get('operation', 'reduce')  # reduce, increase, set
-        
-        if modifier_type == 'incoming':
-            if operation == 'reduce':
-                damage_data['damage'] = max(0, damage_data['damage'] - value)
-            elif operation == 'reduce_percent':
-                reduction = int(damage_data['damage'] * value)
-                damage_data['damage'] -= reduction
-                logger.debug(f"{self.name} redujo {reduction} daño")
-    
-    def _action_custom(self, action, target, extra_data):
-        """Acción: lógica personalizada - VERSIÓN MEJORADA"""
-        callback_name = action.get('callback')
-        if callback_name:
-            logger.debug(f"Ejecutando callback personalizado: {callback_name}")
-            return self._execute_custom_callback(callback_name, target, extra_data)
-        return False
-    
-    def _execute_custom_callback(self, callback_name, target, extra_data):
-        """Ejecuta callbacks usando duck typing en lugar de imports específicos"""
-        try:
-            if callback_name == "enable_improved_dash":
-                return self._callback_enable_improved_dash(target)
-            elif callback_name == "recharge_ultimate":
-                return self._callback_recharge_ultimate(target)
-            elif callback_name == "apply_hyper_speed":
-                return self._callback_hyper_speed(target)
-            else:
-                logger.warning(f"Callback desconocido: {callback_name}")
-                return False
-        except Exception as e:
-            logger.error(f"Error en callback {callback_name}", exception=e)
-            return False
+        """Ejecuta todas las acciones (ya compiladas) para un trigger dado"""
+        for action in self.triggers.get(trigger, ()):
+            action(self, target, extra_data)
     
     def _callback_enable_improved_dash(self, target):
         """Usa hasattr en lugar de asumir el tipo específico"""
         if hasattr(target, 'pending_post_action_move'):
             target.pending_post_action_move = True
             target.post_action_move_range = 3
-            logger.info(f"⚡ {target.name} obtiene embestida mejorada!")
+            effects_log.info("⚡ %s obtiene embestida mejorada!", target.name)
             return True
         return False
     
@@ -189,7 +114,7 @@ class GenericEffect:
         """Verifica la existencia de energy_stats dinámicamente"""
         if hasattr(target, 'energy_stats'):
             target.energy_stats['current_energy'] = target.energy_stats['max_energy']
-            logger.info(f"✨ {target.name} recarga energía ultimate al máximo!")
+            effects_log.info("✨ %s recarga energía ultimate al máximo!", target.name)
             return True
         return False
     
@@ -198,36 +123,10 @@ class GenericEffect:
         if hasattr(target, 'stats') and 'speed' in target.stats:
             original_speed = target.stats.get('speed', 10)
             target.stats['speed'] = original_speed + 50
-            logger.info(f"🌀 {target.name} obtiene hipervelocidad! (+50 velocidad)")
+            effects_log.info("🌀 %s obtiene hipervelocidad! (+50 velocidad)", target.name)
             return True
         return False
     
-    def _calculate_value(self, base_value, calculation_config, target):
-        """Calcula valores basado en fórmulas"""
-        if not calculation_config:
-            return base_value
-        
-        formula = calculation_config.get('formula', 'static')
-        
-        if formula == 'scales_with_source_stat':
-            stat = calculation_config.get('stat', 'attack')
-            multiplier = calculation_config.get('multiplier', 1.0)
-            return int(base_value * self.source.stats.get(stat, 1) * multiplier)
-        
-        elif formula == 'percentage_of_target_max':
-            stat = calculation_config.get('stat', 'max_hp')
-            return int(base_value * target.stats.get(stat, 100) / 100)
-        
-        elif formula == 'percentage_of_source_stat':
-            stat = calculation_config.get('stat', 'attack') 
-            return int(base_value * self.source.stats.get(stat, 1))
-        
-        elif formula == 'scales_with_turn':
-            multiplier = calculation_config.get('multiplier', 1.0)
-            return int(base_value * self.current_turn * multiplier)
-        
-        return base_value
-    
     def is_expired(self):
         return self.current_turn >= self.duration
     
@@ -239,6 +138,192 @@ class GenericEffect:
         self.current_turn = 0
 
 
+# ----------------------------------------------------------------------
+# Compilación de acciones: cada acción de la config pasa a ser una función
+# (efecto, objetivo, extra_data) con sus constantes ya resueltas
+# ----------------------------------------------------------------------
+EFFECT_TRIGGERS = ('on_apply', 'on_turn_start', 'on_turn_end', 'on_damage_taken', 'on_remove')
+INDEXED_TRIGGERS = ('on_turn_start', 'on_turn_end', 'on_damage_taken')  # Con índice propio en EffectSystem
+EFFECT_ACTIONS = EffectRegistry("acción de efecto")
+
+# Callbacks de las acciones 'custom' -> método de GenericEffect
+EFFECT_CALLBACKS = {
+    'enable_improved_dash': GenericEffect._callback_enable_improved_dash,
+    'recharge_ultimate': GenericEffect._callback_recharge_ultimate,
+    'apply_hyper_speed': GenericEffect._callback_hyper_speed,
+}
+
+
+def compile_effect_definition(effect_data: Dict[str, Any]) -> Dict[str, tuple]:
+    """{trigger: (acción compilada, ...)} de un efecto. EffectCompileError si la config es inválida"""
+    where = f"efecto '{effect_data.get('id', '?')}'"
+    triggers = {}
+    for trigger, actions in effect_data.get('actions', {}).items():
+        if trigger not in EFFECT_TRIGGERS:
+            raise EffectCompileError(f"{where}: trigger desconocido {trigger!r} (admitidos: {', '.join(EFFECT_TRIGGERS)})")
+        triggers[trigger] = tuple(EFFECT_ACTIONS.compile(action, where) for action in actions)
+    return triggers
+
+
+def _compile_calculation(calculation_config):
+    """
+    Fórmula de valor como función (efecto, objetivo, valor_base) -> valor.
+    Además de las fórmulas con nombre admite una expresión (ver game.systems.formulas),
+    p. ej. "base * src.speed * 1.5 + turn * 2" con base, turn, stacks, src.<stat> y tgt.<stat>
+    """
+    if not calculation_config:
+        return lambda effect, target, base_value: base_value
+    
+    formula = calculation_config.get('formula', 'static')
+    
+    if formula == 'scales_with_source_stat':
+        stat = calculation_config.get('stat', 'attack')
+        multiplier = calculation_config.get('multiplier', 1.0)
+        return lambda effect, target, base_value: int(base_value * effect.source.stats.get(stat, 1) * multiplier)
+    
+    elif formula == 'percentage_of_target_max':
+        stat = calculation_config.get('stat', 'max_hp')
+        return lambda effect, target, base_value: int(base_value * target.stats.get(stat, 100) / 100)
+    
+    elif formula == 'percentage_of_source_stat':
+        stat = calculation_config.get('stat', 'attack')
+        return lambda effect, target, base_value: int(base_value * effect.source.stats.get(stat, 1))
+    
+    elif formula == 'scales_with_turn':
+        multiplier = calculation_config.get('multiplier', 1.0)
+        return lambda effect, target, base_value: int(base_value * effect.current_turn * multiplier)
+    
+    elif formula == 'static':
+        return lambda effect, target, base_value: base_value
+    
+    expression = compile_formula(formula).evaluate
+    return lambda effect, target, base_value: int(expression(effect.source.stats, target.stats, 1.0, base_value,
+                                                             effect.current_turn, effect.stacks))
+
+
+@EFFECT_ACTIONS.register('damage', fields=('value', 'calculation'))
+def _compile_damage(action):
+    """Acción: aplicar daño SIMPLIFICADO - sin tipos de daño"""
+    from game.core.event_system import event_system, EventTypes
+    base_damage = action.get('value', 0)
+    calculate = _compile_calculation(action.get('calculation'))
+    
+    def damage_action(effect, target, extra_data):
+        damage = calculate(effect, target, base_damage) * effect.stacks
+        
+        if damage > 0:
+            target.stats['current_hp'] -= damage
+            logger.combat_event(f"Efecto {effect.name}", effect.source, target, damage=damage)
+            
+            event_system.emit(EventTypes.ENTITY_DAMAGED, {
+                'attacker': effect.source,
+                'target': target,
+                'damage': damage,
+                'source_effect': effect.name
+            })
+    return damage_action
+
+
+@EFFECT_ACTIONS.register('heal', fields=('value', 'calculation'))
+def _compile_heal(action):
+    """Acción: curar"""
+    from game.core.event_system import event_system, EventTypes
+    base_heal = action.get('value', 0)
+    calculate = _compile_calculation(action.get('calculation'))
+    
+    def heal_action(effect, target, extra_data):
+        heal_amount = calculate(effect, target, base_heal) * effect.stacks
+        
+        if heal_amount > 0:
+            old_hp = target.stats['current_hp']
+            target.stats['current_hp'] = min(
+                target.stats['max_hp'], 
+                old_hp + heal_amount
+            )
+            actual_heal = target.stats['current_hp'] - old_hp
+            
+            logger.combat_event(f"Efecto {effect.name}", effect.source, target, healing=actual_heal)
+            
+            event_system.emit(EventTypes.ENTITY_HEALED, {
+                'healer': effect.source,
+                'target': target,
+                'amount': actual_heal,
+                'source_effect': effect.name
+            })
+    return heal_action
+
+
+@EFFECT_ACTIONS.register('modify_stat', fields=('operation',), required=('stat', 'value'))
+def _compile_modify_stat(action):
+    """Acción: modificar estadística (add, multiply, set)"""
+    stat = action['stat']
+    modifier = action['value']
+    operation = action.get('operation', 'add')
+    original_key = f'original_{stat}'
+    
+    if operation == 'add':
+        compute = lambda effect, original_value: original_value + (modifier * effect.stacks)
+    elif operation == 'multiply':
+        compute = lambda effect, original_value: int(original_value * (1 + modifier))
+    elif operation == 'set':
+        compute = lambda effect, original_value: modifier
+    else:
+        raise EffectCompileError(f"operación desconocida {operation!r} (admitidas: add, multiply, set)")
+    
+    def modify_stat_action(effect, target, extra_data):
+        # Guardar valor original si es la primera vez
+        if original_key not in effect._state:
+            effect._state[original_key] = target.stats.get(stat, 0)
+        original_value = effect._state[original_key]
+        
+        target.stats[stat] = compute(effect, original_value)
+        effects_log.debug("%s %s: %s → %s", target.name, stat, original_value, target.stats[stat])
+    return modify_stat_action
+
+
+@EFFECT_ACTIONS.register('modify_damage', fields=('modifier_type', 'value', 'operation'))
+def _compile_modify_damage(action):
+    """Acción: modificar daño entrante/saliente"""
+    modifier_type = action.get('modifier_type', 'incoming')  # incoming, outgoing
+    value = action.get('value', 0)
+    operation = action.get('operation', 'reduce')  # reduce, reduce_percent
+    
+    if modifier_type != 'incoming' or operation not in ('reduce', 'reduce_percent'):
+        # Sin implementar (p. ej. daño saliente): la acción no hace nada, como hasta ahora
+        return lambda effect, target, damage_data: None
+    
+    if operation == 'reduce':
+        def reduce_action(effect, target, damage_data):
+            if damage_data:
+                damage_data['damage'] = max(0, damage_data['damage'] - value)
+        return reduce_action
+    
+    def reduce_percent_action(effect, target, damage_data):
+        if damage_data:
+            reduction = int(damage_data['damage'] * value)
+            damage_data['damage'] -= reduction
+            effects_log.debug("%s redujo %s daño", effect.name, reduction)
+    return reduce_percent_action
+
+
+@EFFECT_ACTIONS.register('custom', required=('callback',))
+def _compile_custom(action):
+    """Acción: lógica personalizada por callback con nombre (ver EFFECT_CALLBACKS)"""
+    callback_name = action['callback']
+    callback = EFFECT_CALLBACKS.get(callback_name)
+    if callback is None:
+        raise EffectCompileError(f"callback desconocido {callback_name!r} (registrados: {', '.join(EFFECT_CALLBACKS)})")
+    
+    def custom_action(effect, target, extra_data):
+        effects_log.debug("Ejecutando callback personalizado: %s", callback_name)
+        try:
+            return callback(effect, target)
+        except Exception as e:
+            effects_log.error(f"Error en callback {callback_name}", exception=e)
+            return False
+    return custom_action
+
+
 class EffectSystem:
     """Sistema para manejar efectos persistentes - VERSIÓN MEJORADA"""
     
@@ -246,94 +331,287 @@ class EffectSystem:
         self.game_context = game_context
         self.entity_effects: Dict[str, List[GenericEffect]] = {}
         self.effects_registry = {}
-        logger.debug("EffectSystem inicializado")
+        self._compiled = {}
+        # Índices sobre entity_effects: modificarlo solo con apply/remove_effect, set_effects, clear y drop_entity
+        self._by_trigger = {trigger: {} for trigger in INDEXED_TRIGGERS}  # trigger -> entidad -> [efectos]
+        self._by_id = {}    # (entidad, effect_id) -> efecto (uno por par: aplicarlo de nuevo apila)
+        self._clocks = {}   # entidad sin turn_clock propio -> TurnClock
+        self._expiry = {}   # entidad -> {tick: [efectos que vencen en ese tick]}
+        self._expiring = {} # entidad -> [efectos vencidos]: los retira el próximo update_effects
+        self._swept = {}    # entidad -> último tick de su rueda ya revisado
+        effects_log.debug("EffectSystem inicializado")
+    
+    # ------------------------------------------------------------------
+    # Índices
+    # ------------------------------------------------------------------
+    def _clock(self, entity):
+        clock = getattr(entity, 'turn_clock', None)
+        if clock is None:
+            clock = self._clocks.get(entity)
+            if clock is None:
+                clock = self._clocks[entity] = TurnClock()
+        return clock
+    
+    def _attach(self, entity, effect):
+        effect.bind_clock(self._clock(entity))
+        effects = self.entity_effects.get(entity)
+        if effects is None:
+            effects = self.entity_effects[entity] = []
+        effects.append(effect)
+        self._by_id.setdefault((entity, effect.effect_id), effect)
+        self._index_triggers(entity, effect)
+        self._schedule_expiry(entity, effect)
+    
+    def _detach(self, entity, effect):
+        effect._expires_at = None
+        self.entity_effects[entity].remove(effect)
+        key = (entity, effect.effect_id)
+        if self._by_id.get(key) is effect:
+            del self._by_id[key]
+        self._unindex_triggers(entity, effect)
+    
+    def _index_triggers(self, entity, effect):
+        triggers = effect.triggers
+        for trigger in INDEXED_TRIGGERS:
+            if trigger in triggers:
+                indexed = self._by_trigger[trigger]
+                if entity in indexed:
+                    indexed[entity].append(effect)
+                else:
+                    indexed[entity] = [effect]
     
+    def _unindex_triggers(self, entity, effect):
+        for trigger in INDEXED_TRIGGERS:
+            indexed = self._by_trigger[trigger].get(entity)
+            if indexed and effect in indexed:
+                indexed.remove(effect)
+    
+    def _schedule_expiry(self, entity, effect):
+        """
+        Programa la expiración en el tick absoluto del reloj en que current_turn alcanza duration.
+        Las entradas viejas (el efecto se apiló, se recargó o salió) se descartan al vencer:
+        solo cuenta la que coincide con effect._expires_at
+        """
+        due = effect._turn_mark + effect.duration
+        effect._expires_at = due
+        if due <= effect._clock.ticks or not effect.is_active:
+            expiring = self._expiring.get(entity)
+            if expiring is None:
+                self._expiring[entity] = [effect]
+            else:
+                expiring.append(effect)
+            return
+        wheel = self._expiry.get(entity)
+        if wheel is None:
+            wheel = self._expiry[entity] = {}
+            self._swept.setdefault(entity, effect._clock.ticks)
+        bucket = wheel.get(due)
+        if bucket is None:
+            wheel[due] = [effect]
+        else:
+            bucket.append(effect)
+    
+    def set_effects(self, entity, effects):
+        """Reemplaza los efectos de una entidad (snapshots) manteniendo los índices"""
+        for effect in self.entity_effects.get(entity, ()):
+            effect._expires_at = None
+            key = (entity, effect.effect_id)
+            if self._by_id.get(key) is effect:
+                del self._by_id[key]
+        for indexed in self._by_trigger.values():
+            indexed.pop(entity, None)
+        self._expiry.pop(entity, None)
+        self._expiring.pop(entity, None)
+        self._swept.pop(entity, None)
+        self.entity_effects[entity] = []
+        for effect in effects:
+            self._attach(entity, effect)
+    
+    def drop_entity(self, entity):
+        """Olvida una entidad (sale de la batalla) sin disparar on_remove"""
+        for effect in self.entity_effects.pop(entity, ()):
+            key = (entity, effect.effect_id)
+            if self._by_id.get(key) is effect:
+                del self._by_id[key]
+        for indexed in self._by_trigger.values():
+            indexed.pop(entity, None)
+        self._expiry.pop(entity, None)
+        self._expiring.pop(entity, None)
+        self._swept.pop(entity, None)
+        self._clocks.pop(entity, None)
+    
+    def clear(self):
+        """Sin efectos activos (los relojes se conservan: restaurar un snapshot mantiene cada turno)"""
+        self.entity_effects.clear()
+        self._by_id.clear()
+        for indexed in self._by_trigger.values():
+            indexed.clear()
+        self._expiry.clear()
+        self._expiring.clear()
+        self._swept.clear()
+    
+    # ------------------------------------------------------------------
+    # Registro de efectos
+    # ------------------------------------------------------------------
     def load_effects_config(self, effects_config: Dict):
-        """Carga la configuración de efectos"""
+        """Carga y compila la configuración de efectos (EffectCompileError con todos los fallos)"""
+        compiled, errors = {}, []
+        for effect_id, effect_config in effects_config.items():
+            try:
+                compiled[effect_id] = compile_effect_definition(effect_config)
+            except EffectCompileError as e:
+                errors.append(str(e))
+        if errors:
+            raise EffectCompileError("Configuración de efectos inválida:\n  " + "\n  ".join(errors))
+        
         self.effects_registry = effects_config
-        logger.info(f"EffectSystem cargó {len(effects_config)} efectos")
+        self._compiled = compiled
+        effects_log.info("EffectSystem cargó %s efectos", len(effects_config))
+    
+    def reload_effects(self, effects_config: Dict, effect_ids) -> int:
+        """
+        Recarga en caliente: recompila los efectos de effect_ids (si alguno falla no cambia nada)
+        y los efectos vivos pasan a la definición nueva conservando turno, stacks y estado.
+        Un efecto eliminado de la config sigue activo hasta expirar. Retorna los efectos vivos actualizados
+        """
+        compiled = {effect_id: compile_effect_definition(effects_config[effect_id])
+                    for effect_id in effect_ids if effect_id in effects_config}
+        
+        self.effects_registry = effects_config
+        self._compiled = {**{effect_id: triggers for effect_id, triggers in self._compiled.items()
+                             if effect_id in effects_config}, **compiled}
+        
+        updated = 0
+        for entity, effects in self.entity_effects.items():
+            for effect in effects:
+                triggers = compiled.get(effect.effect_id)
+                if triggers is None:
+                    continue
+                effect_data = effects_config[effect.effect_id]
+                self._unindex_triggers(entity, effect)
+                effect.config = effect_data
+                effect.triggers = triggers
+                effect.name = effect_data['name']
+                effect.duration = effect_data.get('duration', 1)
+                effect.effect_type = effect_data.get('type', 'neutral')
+                self._index_triggers(entity, effect)
+                self._schedule_expiry(entity, effect)  # La duración pudo cambiar
+                updated += 1
+        effects_log.info("EffectSystem recargó %s efectos (%s activos actualizados)", len(compiled), updated)
+        return updated
     
     def apply_effect(self, target, effect_id: str, source):
         """Aplica un efecto por su ID - VERSIÓN COMPLETA"""
         if effect_id not in self.effects_registry:
-            logger.error(f"Efecto no encontrado: {effect_id}")
+            effects_log.error(f"Efecto no encontrado: {effect_id}")
             return False
         
         try:
             effect_config = self.effects_registry[effect_id]
-            effect = GenericEffect(effect_config, source)
-            
-            if target not in self.entity_effects:
-                self.entity_effects[target] = []
+            effect = GenericEffect(effect_config, source, self._compiled.get(effect_id))
             
-            # Stacking - verificar si ya existe el efecto
-            existing_effect = next(
-                (e for e in self.entity_effects[target] 
-                 if e.effect_id == effect_id), None
-            )
+            # Stacking - verificar si ya existe el efecto (índice por entidad e id)
+            existing_effect = self._by_id.get((target, effect_id))
             
             if existing_effect and existing_effect.can_stack(effect):
                 existing_effect.add_stack()
-                logger.info(f"📚 {effect.name} stackeado a {existing_effect.stacks} en {target.name}")
+                self._schedule_expiry(target, existing_effect)  # El turno vuelve a 0: vence más tarde
+                effects_log.info("📚 %s stackeado a %s en %s", effect.name, existing_effect.stacks, target.name)
                 return True
             else:
-                self.entity_effects[target].append(effect)
+                self._attach(target, effect)
                 effect.on_apply(target)
                 return True
                 
         except Exception as e:
-            logger.error(f"Error aplicando efecto {effect_id} a {target.name}", exception=e)
+            effects_log.error(f"Error aplicando efecto {effect_id} a {target.name}", exception=e)
             return False
     
     def update_effects(self, entities):
-        """Actualiza todos los efectos al final del turno - MEJORADO"""
+        """
+        Actualiza todos los efectos al final del turno: on_turn_end solo a los que lo definen
+        y retira solo los que la rueda marcó como vencidos (en su orden de aplicación).
+        is_active=False se detecta al adjuntar el efecto (snapshots); para quitar uno vivo, remove_effect
+        """
         effects_to_remove = []
+        turn_end = self._by_trigger['on_turn_end']
         
         for entity in entities:
-            if entity not in self.entity_effects:
+            effects = self.entity_effects.get(entity)
+            if not effects:
                 continue
-                
-            for effect in self.entity_effects[entity]:
+            
+            for effect in turn_end.get(entity, ()):
                 effect.on_turn_end(entity)
-                
+            
+            expiring = self._expiring.pop(entity, None)
+            if not expiring:
+                continue
+            if len(expiring) > 1:
+                due = {id(effect) for effect in expiring}  # Sin duplicados y en orden de aplicación
+                expiring = [effect for effect in effects if id(effect) in due]
+            
+            for effect in expiring:
+                if effect._expires_at is None:
+                    continue  # Ya retirado
                 if effect.is_expired():
                     effect.on_remove(entity)
                     effects_to_remove.append((entity, effect))
-                    logger.debug(f"⌛ {effect.name} expiró en {entity.name}")
+                    effects_log.debug("⌛ %s expiró en %s", effect.name, entity.name)
                 elif not effect.is_active:
                     effect.on_remove(entity)
                     effects_to_remove.append((entity, effect))
-                    logger.debug(f"🚫 {effect.name} desactivado en {entity.name}")
+                    effects_log.debug("🚫 %s desactivado en %s", effect.name, entity.name)
         
         # Remover efectos expirados
         for entity, effect in effects_to_remove:
             if entity in self.entity_effects:
-                self.entity_effects[entity].remove(effect)
+                self._detach(entity, effect)
         
         if effects_to_remove:
-            logger.info(f"🔄 EffectSystem actualizado: {len(effects_to_remove)} efectos removidos")
+            effects_log.info("🔄 EffectSystem actualizado: %s efectos removidos", len(effects_to_remove))
     
     def on_turn_start(self, entity):
-        """Llamar al inicio del turno de una entidad - MEJORADO"""
-        if entity in self.entity_effects:
-            for effect in self.entity_effects[entity]:
-                effect.on_turn_start(entity)
-            
-            active_effects = len(self.entity_effects[entity])
-            if active_effects > 0:
-                logger.debug(f"🔄 {entity.name} tiene {active_effects} efectos activos al inicio del turno")
+        """
+        Llamar al inicio del turno de una entidad, después de TurnSystem.start_entity_turn
+        (que avanza su reloj): pasa a vencidos los efectos programados hasta el tick actual
+        y dispara solo on_turn_start. Las entidades sin turn_clock usan un reloj del
+        sistema que se avanza aquí
+        """
+        clock = getattr(entity, 'turn_clock', None)
+        if clock is None:
+            clock = self._clocks.get(entity)
+            if clock is None:
+                return
+            clock.ticks += 1
+        wheel = self._expiry.get(entity)
+        if wheel is not None:
+            self._sweep(entity, wheel, clock.ticks)
+        for effect in self._by_trigger['on_turn_start'].get(entity, ()):
+            effect.on_turn_start(entity)
+        
+        if effects_log.debug_enabled and self.entity_effects.get(entity):
+            effects_log.debug("🔄 %s tiene %s efectos activos al inicio del turno",
+                              entity.name, len(self.entity_effects[entity]))
+    
+    def _sweep(self, entity, wheel, now):
+        """Cubetas de la rueda con tick <= now (normalmente solo la de now) -> vencidos"""
+        start = min(self._swept.get(entity, now - 1) + 1, now)  # El reloj puede volver atrás (snapshots)
+        self._swept[entity] = now
+        for tick in range(start, now + 1):
+            due = wheel.pop(tick, None)
+            if due:
+                due = [effect for effect in due if effect._expires_at == tick]
+                if due:
+                    self._expiring.setdefault(entity, []).extend(due)
     
     def on_damage_taken(self, target, damage_data):
-        """Notificar a efectos sobre daño entrante - MEJORADO"""
-        if target in self.entity_effects:
-            effects_triggered = 0
-            for effect in self.entity_effects[target]:
-                if hasattr(effect, 'on_damage_taken'):
-                    effect.on_damage_taken(target, damage_data)
-                    effects_triggered += 1
-            
-            if effects_triggered > 0:
-                logger.debug(f"💥 {effects_triggered} efectos activados por daño en {target.name}")
+        """Notificar a efectos sobre daño entrante: solo los que reaccionan al daño"""
+        effects = self._by_trigger['on_damage_taken'].get(target)
+        if effects:
+            for effect in effects:
+                effect.on_damage_taken(target, damage_data)
+            effects_log.debug("💥 %s efectos activados por daño en %s", len(effects), target.name)
     
     def get_entity_effects(self, entity):
         """Obtiene efectos activos de una entidad"""
@@ -341,20 +619,17 @@ class EffectSystem:
     
     def has_effect(self, entity, effect_id):
         """Verifica si una entidad tiene un efecto específico"""
-        if entity not in self.entity_effects:
-            return False
-        return any(e.effect_id == effect_id for e in self.entity_effects[entity])
+        return (entity, effect_id) in self._by_id
     
     def remove_effect(self, entity, effect_id):
         """Remueve un efecto específico de una entidad - MEJORADO"""
-        if entity in self.entity_effects:
-            for effect in self.entity_effects[entity][:]:
-                if effect.effect_id == effect_id:
-                    effect.on_remove(entity)
-                    self.entity_effects[entity].remove(effect)
-                    logger.info(f"🧹 {effect.name} removido de {entity.name}")
-                    return True
-        return False
+        effect = self._by_id.get((entity, effect_id))
+        if effect is None:
+            return False
+        effect.on_remove(entity)
+        self._detach(entity, effect)
+        effects_log.info("🧹 %s removido de %s", effect.name, entity.name)
+        return True
     
     def get_effect_stats(self):
         """Obtiene estadísticas del sistema de efectos"""
@@ -364,4 +639,91 @@ class EffectSystem:
             "total_effects_active": total_effects,
             "entities_affected": affected_entities,
             "effects_loaded": len(self.effects_registry)
-        }
\ No newline at end of file
+        }
+
+def _stress_effects(count):
+    """Efectos sintéticos para el benchmark: 1 de cada 10 por trigger indexado, el resto solo on_apply"""
+    heal = [{'type': 'heal', 'value': 1}]
+    effects = {}
+    for i in range(count):
+        kind = i % 10
+        if kind == 0:
+            actions = {'on_turn_start': heal}
+        elif kind == 1:
+            actions = {'on_turn_end': heal}
+        elif kind == 2:
+            actions = {'on_damage_taken': [{'type': 'modify_damage', 'operation': 'reduce', 'value': 1}]}
+        else:
+            actions = {'on_apply': [{'type': 'modify_stat', 'stat': 'speed', 'value': 0}]}
+        effects[f"stress_{i}"] = {'id': f"stress_{i}", 'name': f"Estrés {i}", 'type': 'buff',
+                                  'duration': 10 ** 6, 'actions': actions}
+    return effects
+
+
+def benchmark(n_entities=300, effects_per_entity=40, rounds=20) -> dict:
+    """
+    Un turno completo (inicio, daño recibido, fin) y consultas has_effect sobre
+    n_entities con effects_per_entity efectos cada una: índices, reloj y rueda de
+    expiraciones frente al recorrido de todos los efectos y cooldowns de cada entidad
+    (el comportamiento anterior)
+    """
+    from game.core.logger import SILENT
+    from game.entities.enemy import Enemy
+    from game.systems.turn_system import TurnSystem
+    
+    logger.set_level(SILENT)
+    system = EffectSystem()
+    turn_system = TurnSystem()
+    system.load_effects_config(_stress_effects(effects_per_entity))
+    effect_ids = list(system.effects_registry)
+    entities = [Enemy((i % 10, i // 10)) for i in range(n_entities)]
+    for entity in entities:
+        for effect_id in effect_ids:
+            system.apply_effect(entity, effect_id, entity)
+    damage_data = {'damage': 10}
+    
+    def scan_round():
+        for entity in entities:
+            for action in entity.actions.values():
+                if action.current_cooldown > 0:
+                    action.current_cooldown -= 1
+            for effect in system.entity_effects[entity]:
+                effect.current_turn += 1
+                effect._execute_actions('on_turn_start', entity)
+            for effect in system.entity_effects[entity]:
+                effect._execute_actions('on_damage_taken', entity, damage_data)
+            any(effect.effect_id == effect_ids[-1] for effect in system.entity_effects[entity])
+        for entity in entities:
+            for effect in system.entity_effects[entity]:
+                effect._execute_actions('on_turn_end', entity)
+                effect.is_expired()
+    
+    def indexed_round():
+        for entity in entities:
+            turn_system.start_entity_turn(entity)
+            system.on_turn_start(entity)
+            system.on_damage_taken(entity, damage_data)
+            system.has_effect(entity, effect_ids[-1])
+        system.update_effects(entities)
+    
+    timings = {}
+    for name, run in (('scan', scan_round), ('indexed', indexed_round)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        timings[name] = (time.perf_counter() - start) / rounds
+    
+    return {
+        'entities': n_entities,
+        'effects': n_entities * effects_per_entity,
+        'scan_ms': timings['scan'] * 1000,
+        'indexed_ms': timings['indexed'] * 1000
+    }
+
+
+if __name__ == "__main__":
+    for size in (100, 300):
+        stats = benchmark(n_entities=size)
+        print(f"🧪 {stats['entities']} entidades, {stats['effects']} efectos | turno: recorrido completo "
+              f"{stats['scan_ms']:.1f}ms → índices {stats['indexed_ms']:.1f}ms "
+              f"(x{stats['scan_ms'] / stats['indexed_ms']:.1f})")
@@ -0,0 +1,266 @@
+"""
+Fórmulas de daño y escalado escritas como expresiones en la config
+"(src.attack - tgt.defense // 2) * multiplier" se analiza una sola vez con una lista
+blanca de nodos ast y se compila a una función Python, cacheada por texto.
+La misma expresión evaluada con arrays NumPy (stats de los objetivos leídos por
+columna de entity_store) calcula el daño de muchos objetivos en una sola
+operación vectorial (Formula.damage_many).
+Sin potencias (9**9**9 no termina) y con división segura: x / 0, x // 0 y x % 0
+valen 0 en las dos evaluaciones; un divisor constante 0 se rechaza al compilar.
+Benchmark: python -m game.systems.formulas
+"""
+import ast
+import time
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él damage_many evalúa objetivo a objetivo
+    np = None
+
+from game.entities.entity_store import entity_store, ABSENT, STAT_INDEX
+from game.systems.effect_compiler import EffectCompileError
+from game.systems.targeting import VECTORIZE_MIN_ENTITIES
+
+# Fórmulas del juego (antes repetidas en efectos, movimiento y ataques básicos)
+BASE_DAMAGE_FORMULA = "(src.attack - tgt.defense // 2) * multiplier"
+DASH_DAMAGE_FORMULA = "src.attack * 0.1"
+
+# Vocabulario: stats con src./tgt. y estas variables (en este orden, con estos valores por defecto)
+PARAMETERS = ('src', 'tgt', 'multiplier', 'base', 'turn', 'stacks')
+DEFAULTS = (None, 1.0, 0, 0, 1)
+ENTITIES = ('src', 'tgt')
+VARIABLES = PARAMETERS[2:]
+FUNCTION_ARITY = {'min': 2, 'max': 2, 'abs': 1, 'int': 1}
+OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.USub, ast.UAdd)
+# Divisiones con divisor variable: pasan a llamar a la versión segura (0 si el divisor es 0)
+SAFE_DIVISIONS = {ast.Div: '_div', ast.FloorDiv: '_floordiv', ast.Mod: '_mod'}
+
+_SCALAR_FUNCTIONS = {'min': min, 'max': max, 'abs': abs, 'int': int,
+                     '_div': lambda a, b: a / b if b else 0,
+                     '_floordiv': lambda a, b: a // b if b else 0,
+                     '_mod': lambda a, b: a % b if b else 0}
+
+
+def _safe_vector(operation):
+    """operation de NumPy con 0 donde el divisor es 0 (sin inf/nan que rompan el paso a int64)"""
+    def safe(a, b):
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+        return operation(a, b, out=np.zeros(a.shape), where=b != 0)
+    return safe
+
+
+class _NotVectorizable(Exception):
+    """Un stat sin columna (o fuera del bloque int64): se evalúa objetivo a objetivo"""
+
+
+class _FormulaParser:
+    """Valida el árbol de la expresión y cambia src.stat por src['stat']"""
+    
+    def __init__(self, expression):
+        self.expression = expression
+        self.stats = {'src': set(), 'tgt': set()}
+    
+    def fail(self, message):
+        raise EffectCompileError(f"fórmula {self.expression!r}: {message}")
+    
+    def visit(self, node):
+        method = getattr(self, 'visit_' + type(node).__name__, None)
+        if method is None:
+            self.fail(f"construcción no admitida ({type(node).__name__})")
+        return method(node)
+    
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+    
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, OPERATORS):
+            self.fail(f"operador no admitido ({type(node.op).__name__})")
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        safe = SAFE_DIVISIONS.get(type(node.op))
+        if safe is None:
+            return node
+        if isinstance(node.right, ast.Constant):  # Divisor fijo: operador nativo (camino caliente)
+            if node.right.value == 0:
+                self.fail("división por cero")
+            return node
+        call = ast.Call(func=ast.Name(safe, ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+    
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, OPERATORS):
+            self.fail(f"operador no admitido ({type(node.op).__name__})")
+        node.operand = self.visit(node.operand)
+        return node
+    
+    def visit_Constant(self, node):
+        if type(node.value) not in (int, float):
+            self.fail(f"constante no numérica {node.value!r}")
+        return node
+    
+    def visit_Name(self, node):
+        if node.id not in VARIABLES:
+            self.fail(f"nombre desconocido {node.id!r} (variables: {', '.join(VARIABLES)}; stats: src.<stat>, tgt.<stat>)")
+        return node
+    
+    def visit_Attribute(self, node):
+        if not (isinstance(node.value, ast.Name) and node.value.id in ENTITIES):
+            self.fail("solo se leen stats de src o tgt (p. ej. src.attack)")
+        self.stats[node.value.id].add(node.attr)
+        subscript = ast.Subscript(value=ast.Name(node.value.id, ast.Load()), slice=ast.Constant(node.attr),
+                                  ctx=ast.Load())
+        return ast.copy_location(subscript, node)
+    
+    def visit_Call(self, node):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name not in FUNCTION_ARITY or node.keywords:
+            self.fail(f"función no admitida (admitidas: {', '.join(FUNCTION_ARITY)})")
+        if len(node.args) != FUNCTION_ARITY[name]:
+            self.fail(f"{name}() recibe {FUNCTION_ARITY[name]} argumento(s)")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+class _TargetColumns:
+    """tgt en la evaluación vectorial: cada stat es un array con un valor por objetivo"""
+    
+    __slots__ = ('rows',)
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def __getitem__(self, stat):
+        if stat not in STAT_INDEX:
+            raise _NotVectorizable(stat)
+        values = entity_store.column_view(stat)[self.rows]  # Indexado con array: copia, la vista se suelta
+        if (values == ABSENT).any():
+            raise _NotVectorizable(stat)
+        return values
+
+
+class Formula:
+    """
+    Expresión compilada. evaluate(src, tgt, multiplier, base, turn, stacks) recibe los
+    diccionarios de stats (entity.stats) y las variables; damage() y damage_many()
+    aplican el redondeo de los golpes (entero, mínimo 1)
+    """
+    
+    __slots__ = ('expression', 'src_stats', 'tgt_stats', 'evaluate', '_vector')
+    
+    def __init__(self, expression):
+        parser = _FormulaParser(expression)
+        try:
+            tree = ast.parse(expression.strip(), mode='eval')
+        except SyntaxError as e:
+            raise EffectCompileError(f"fórmula {expression!r}: sintaxis inválida ({e.msg})") from None
+        tree = parser.visit(tree)
+        
+        arguments = ast.arguments(posonlyargs=[], args=[ast.arg(name) for name in PARAMETERS], kwonlyargs=[],
+                                  kw_defaults=[], defaults=[ast.Constant(value) for value in DEFAULTS])
+        code = compile(ast.fix_missing_locations(ast.Expression(ast.Lambda(arguments, tree.body))),
+                       f"<fórmula {expression}>", 'eval')
+        
+        self.expression = expression
+        self.src_stats = frozenset(parser.stats['src'])
+        self.tgt_stats = frozenset(parser.stats['tgt'])
+        self.evaluate = eval(code, {'__builtins__': {}, **_SCALAR_FUNCTIONS})
+        self._vector = None
+        if np is not None:
+            self._vector = eval(code, {'__builtins__': {}, 'min': np.minimum, 'max': np.maximum,
+                                       'abs': np.abs, 'int': np.trunc,
+                                       '_div': _safe_vector(np.true_divide),
+                                       '_floordiv': _safe_vector(np.floor_divide),
+                                       '_mod': _safe_vector(np.remainder)})
+    
+    def __call__(self, src, tgt=None, multiplier=1.0, base=0, turn=0, stacks=1):
+        return self.evaluate(src, tgt, multiplier, base, turn, stacks)
+    
+    def damage(self, src, tgt, multiplier=1.0):
+        """Daño de un golpe: entero y nunca menos de 1"""
+        return max(1, int(self.evaluate(src, tgt, multiplier)))
+    
+    def damage_many(self, src, targets, multipliers):
+        """
+        damage() de cada objetivo (multipliers: uno por objetivo). Con NumPy y
+        VECTORIZE_MIN_ENTITIES objetivos o más, una sola evaluación sobre columnas
+        """
+        if self._vector is not None and len(targets) >= VECTORIZE_MIN_ENTITIES:
+            damages = self._damage_vector(src, targets, multipliers)
+            if damages is not None:
+                return damages
+        evaluate = self.evaluate
+        return [max(1, int(evaluate(src, target.stats, multiplier)))
+                for target, multiplier in zip(targets, multipliers)]
+    
+    def _damage_vector(self, src, targets, multipliers):
+        rows = np.fromiter((target._row for target in targets), dtype=np.intp, count=len(targets))
+        try:
+            values = self._vector(src, _TargetColumns(rows), np.asarray(multipliers, dtype=np.float64))
+        except _NotVectorizable:
+            return None
+        values = np.broadcast_to(np.maximum(1, np.trunc(values)), (len(targets),))
+        return values.astype(np.int64).tolist()
+    
+    def __repr__(self):
+        return f"Formula({self.expression!r})"
+
+
+@lru_cache(maxsize=None)
+def compile_formula(expression: str) -> Formula:
+    """Formula compartida por texto: cada expresión se analiza y compila una sola vez"""
+    return Formula(expression)
+
+
+BASE_DAMAGE = compile_formula(BASE_DAMAGE_FORMULA)
+DASH_DAMAGE = compile_formula(DASH_DAMAGE_FORMULA)
+
+
+def benchmark(sizes=(10, 100, 1000), repeats=200):
+    """Daño por objetivo: expresión en línea frente a fórmula compilada frente a damage_many"""
+    from game.core.logger import logger, SILENT
+    from game.entities.enemy import Enemy
+    
+    logger.set_level(SILENT)
+    caster = Enemy((0, 0), team="player")
+    results = []
+    for size in sizes:
+        targets = [Enemy((i % 10, i // 10)) for i in range(size)]
+        multipliers = [1.0 + (i % 3) * 0.25 for i in range(size)]
+        
+        start = time.perf_counter()
+        for _ in range(repeats):
+            expected = [max(1, int((caster.stats['attack'] - target.stats['defense'] // 2) * multiplier))
+                        for target, multiplier in zip(targets, multipliers)]
+        inline_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in range(repeats):
+            got = [BASE_DAMAGE.damage(caster.stats, target.stats, multiplier)
+                   for target, multiplier in zip(targets, multipliers)]
+        scalar_time = time.perf_counter() - start
+        assert got == expected, "La fórmula compilada no coincide con la expresión original"
+        
+        start = time.perf_counter()
+        for _ in range(repeats):
+            got = BASE_DAMAGE.damage_many(caster.stats, targets, multipliers)
+        batch_time = time.perf_counter() - start
+        assert got == expected, "damage_many no coincide con la expresión original"
+        
+        results.append({
+            'targets': size,
+            'inline_us': inline_time / repeats * 1e6,
+            'formula_us': scalar_time / repeats * 1e6,
+            'batch_us': batch_time / repeats * 1e6
+        })
+        del targets
+    return results
+
+
+if __name__ == "__main__":
+    backend = "NumPy " + np.__version__ if np is not None else "Python puro (NumPy no instalado)"
+    print(f"🧪 Backend de fórmulas: {backend}")
+    for row in benchmark():
+        print(f"   {row['targets']:>5} objetivos | en línea {row['inline_us']:8.1f}µs | "
+              f"fórmula {row['formula_us']:8.1f}µs | damage_many {row['batch_us']:8.1f}µs")
@@ -1,4 +1,4 @@
-import pygame
+from typing import Dict, List, Tuple, Optional
 
 class GridSystem:
     def __init__(self, width=10, height=8, cell_size=60):
@@ -7,6 +7,12 @@ class GridSystem:
         self.cell_size = cell_size
         self.offset_x = 100
         self.offset_y = 80
+        
+        # 🗺️ Índice de ocupación: casilla -> entidades (normalmente una)
+        # Se mantiene sincronizado desde el setter de GameEntity.position
+        self._occupancy: Dict[Tuple[int, int], List] = {}
+        self._team_occupancy: Dict[str, Dict[Tuple[int, int], List]] = {}
+        self.version = 0  # Cambia con cada alta/baja/movimiento: invalida cachés de rutas
     
     def get_grid_position(self, screen_pos):
         x, y = screen_pos
@@ -24,7 +30,89 @@ class GridSystem:
         x, y = grid_pos
         return 0 <= x < self.width and 0 <= y < self.height
     
+    # ------------------------------------------------------------------
+    # Índice de ocupación
+    # ------------------------------------------------------------------
+    def register_entity(self, entity):
+        """Empieza a seguir la posición de una entidad"""
+        current = getattr(entity, '_grid', None)
+        if current is self:
+            return  # Ya seguida: no duplicar su entrada en el índice
+        if current is not None:
+            current.unregister_entity(entity)
+        entity._grid = self
+        self._add(entity, entity.position)
+    
+    def register_entities(self, entities):
+        for entity in entities:
+            self.register_entity(entity)
+    
+    def unregister_entity(self, entity):
+        """Deja de seguir una entidad (muerte o fin de batalla)"""
+        if getattr(entity, '_grid', None) is self:
+            self._remove(entity, entity.position)
+            entity._grid = None
+    
+    def clear_entities(self):
+        """Vacía el índice y desvincula todas las entidades"""
+        for cell in list(self._occupancy.values()):
+            for entity in cell:
+                entity._grid = None
+        self._occupancy.clear()
+        self._team_occupancy.clear()
+        self.version += 1
+    
+    def on_entity_moved(self, entity, old_position, new_position):
+        """Llamado por GameEntity cuando cambia su posición"""
+        self._remove(entity, old_position)
+        self._add(entity, new_position)
+    
+    def get_entities_at(self, grid_pos, team=None) -> List:
+        """Entidades en una casilla - O(1)"""
+        if team is None:
+            return list(self._occupancy.get(grid_pos, ()))
+        return list(self._team_occupancy.get(team, {}).get(grid_pos, ()))
+    
+    def get_entity_at(self, grid_pos, team=None) -> Optional[object]:
+        cell = (self._occupancy.get(grid_pos) if team is None
+                else self._team_occupancy.get(team, {}).get(grid_pos))
+        return cell[0] if cell else None
+    
+    def is_occupied(self, grid_pos, team=None, exclude=None) -> bool:
+        """True si hay alguna entidad (del equipo indicado) distinta de exclude"""
+        cell = (self._occupancy.get(grid_pos) if team is None
+                else self._team_occupancy.get(team, {}).get(grid_pos))
+        if not cell:
+            return False
+        return any(entity is not exclude for entity in cell)
+    
+    def get_team_positions(self, team):
+        """Casillas ocupadas por un equipo (vista, no copiar si no hace falta)"""
+        return self._team_occupancy.get(team, {}).keys()
+    
+    def get_occupied_positions(self):
+        return self._occupancy.keys()
+    
+    def _add(self, entity, grid_pos):
+        if grid_pos is None:
+            return
+        self.version += 1
+        self._occupancy.setdefault(grid_pos, []).append(entity)
+        self._team_occupancy.setdefault(entity.team, {}).setdefault(grid_pos, []).append(entity)
+    
+    def _remove(self, entity, grid_pos):
+        if grid_pos is None:
+            return
+        self.version += 1
+        for index in (self._occupancy, self._team_occupancy.get(entity.team, {})):
+            cell = index.get(grid_pos)
+            if cell and entity in cell:
+                cell.remove(entity)
+                if not cell:
+                    del index[grid_pos]
+    
     def draw(self, screen):
+        import pygame
         for x in range(self.width):
             for y in range(self.height):
                 rect = pygame.Rect(
@@ -32,4 +120,4 @@ class GridSystem:
                     y * self.cell_size + self.offset_y,
                     self.cell_size, self.cell_size
                 )
-                pygame.draw.rect(screen, (50, 50, 80), rect, 1)
\ No newline at end of file
+                pygame.draw.rect(screen, (50, 50, 80), rect, 1)
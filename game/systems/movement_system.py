@@ -1,7 +1,10 @@
 # game/systems/movement_system.py
-import pygame
 from typing import List, Tuple, Optional
 from game.core.event_system import event_system, EventTypes
+from game.systems.formulas import DASH_DAMAGE
+from game.systems.pathfinding import Pathfinder
+from game.ui.text_cache import text_cache
+from game.core.logger import movement_log, combat_log
 
 class MovementSystem:
     """
@@ -11,12 +14,15 @@ class MovementSystem:
     
     def __init__(self, grid_system):
         self.grid = grid_system
+        self.pathfinder = Pathfinder(grid_system)
+        self.recorder = None  # ReplayRecorder: graba la ruta confirmada de cada movimiento
         self.reset()
     
     def reset(self):
         """Reinicia completamente el estado del movimiento"""
         self.entity = None
         self.movement_path = []
+        self.preview_path = []
         self.dash_targets = []
         self.movement_range = 0
         self.is_active = False
@@ -27,20 +33,21 @@ class MovementSystem:
         Retorna True si se pudo iniciar correctamente.
         """
         if not entity:
-            print("❌ No hay entidad seleccionada")
+            movement_log.info("❌ No hay entidad seleccionada")
             return False
-            
+        
         if entity.has_moved:
-            print(f"❌ {entity.name} ya se movió este turno")
+            movement_log.info("❌ %s ya se movió este turno", entity.name)
             return False
         
         self.entity = entity
-        self.movement_range = getattr(entity, 'movement_range', 3)
+        self.movement_range = int(getattr(entity, 'movement_range', 3))
         self.movement_path = [entity.position]
+        self.preview_path = []
         self.dash_targets = []
         self.is_active = True
         
-        print(f"🎯 Modo movimiento: {entity.name} (Rango: {self.movement_range})")
+        movement_log.info("🎯 Modo movimiento: %s (Rango: %s)", entity.name, self.movement_range)
         return True
     
     def handle_click(self, grid_pos: Tuple[int, int], all_entities: List) -> bool:
@@ -51,7 +58,7 @@ class MovementSystem:
         if not self.is_active or not self.entity:
             return False
         
-        clicked_entity = next((e for e in all_entities if e.position == grid_pos), None)
+        clicked_entity = self.grid.get_entity_at(grid_pos)
         
         if clicked_entity and clicked_entity.team == "enemy":
             return self._mark_dash_target(clicked_entity)
@@ -61,11 +68,11 @@ class MovementSystem:
     def _mark_dash_target(self, enemy) -> bool:
         """Marca un enemigo para embestida"""
         if enemy in self.dash_targets:
-            print(f"❌ {enemy.name} ya está marcado para embestida")
+            movement_log.info("❌ %s ya está marcado para embestida", enemy.name)
             return False
         
         self.dash_targets.append(enemy)
-        print(f"🎯 {enemy.name} marcado para embestida")
+        movement_log.info("🎯 %s marcado para embestida", enemy.name)
         return True
     
     def _add_to_path(self, grid_pos: Tuple[int, int], all_entities: List) -> bool:
@@ -78,58 +85,44 @@ class MovementSystem:
             idx = self.movement_path.index(grid_pos)
             if idx < len(self.movement_path) - 1:
                 self.movement_path = self.movement_path[:idx + 1]
-                print(f"↩️ Retrocediendo a {grid_pos}")
+                movement_log.debug("↩️ Retrocediendo a %s", grid_pos)
                 return True
             return False
         
         # Calcular nueva ruta desde la última posición
         start_pos = self.movement_path[-1]
+        remaining_moves = self.get_remaining_moves()
         new_segment = self._calculate_path_segment(start_pos, grid_pos, all_entities)
         
         if not new_segment or len(new_segment) < 2:
-            return False
-        
-        # Verificar que no exceda el movimiento disponible
-        remaining_moves = self.movement_range - (len(self.movement_path) - 1)
-        if len(new_segment) - 1 > remaining_moves:
-            print("❌ Movimiento excede el rango disponible")
+            movement_log.info("❌ Movimiento excede el rango disponible o la casilla está bloqueada")
             return False
         
         # Actualizar ruta
         self.movement_path = self.movement_path[:-1] + new_segment
+        self.preview_path = []
         moves_used = len(new_segment) - 1
-        print(f"📍 Ruta actualizada: {moves_used} movimientos usados, {remaining_moves - moves_used} restantes")
+        movement_log.debug("📍 Ruta actualizada: %d movimientos usados, %d restantes",
+                          moves_used, remaining_moves - moves_used)
         return True
     
+    def get_remaining_moves(self) -> int:
+        """Movimientos que quedan tras la ruta ya confirmada"""
+        return self.movement_range - (len(self.movement_path) - 1)
+    
+    def get_reachable_positions(self, start: Optional[Tuple[int, int]] = None):
+        """Casillas alcanzables (-> pasos) con el movimiento restante - cacheado"""
+        start = start or self.movement_path[-1]
+        return self.pathfinder.reachable(self.entity, start, self.get_remaining_moves())
+    
     def _calculate_path_segment(self, start: Tuple[int, int], end: Tuple[int, int], 
                               all_entities: List) -> List[Tuple[int, int]]:
         """
-        Calcula un segmento de ruta en línea recta entre dos puntos.
-        Considera obstáculos (aliados).
+        Ruta más corta entre dos puntos rodeando obstáculos (solo aliados bloquean).
+        Retorna [] si el destino no es alcanzable con el movimiento restante.
         """
-        path = [start]
-        current = start
-        
-        while current != end and len(path) <= self.movement_range:
-            # Calcular dirección
-            dx, dy = 0, 0
-            if current[0] < end[0]: dx = 1
-            elif current[0] > end[0]: dx = -1
-            elif current[1] < end[1]: dy = 1  
-            elif current[1] > end[1]: dy = -1
-            else: break
-            
-            next_pos = (current[0] + dx, current[1] + dy)
-            
-            # Verificar obstáculos (solo aliados bloquean)
-            if any(e.position == next_pos and e.team == self.entity.team 
-                   and e != self.entity for e in all_entities):
-                break
-            
-            path.append(next_pos)
-            current = next_pos
-        
-        return path
+        path = self.pathfinder.find_path(self.entity, start, end, self.get_remaining_moves())
+        return path or []
     
     def execute_movement(self) -> bool:
         """
@@ -137,9 +130,12 @@ class MovementSystem:
         Retorna True si el movimiento fue exitoso.
         """
         if not self.is_active or len(self.movement_path) < 2:
-            print("❌ No hay movimiento que ejecutar")
+            movement_log.info("❌ No hay movimiento que ejecutar")
             return False
         
+        if self.recorder is not None:
+            self.recorder.record_move(self.entity, self.movement_path, self.dash_targets)
+        
         # Aplicar daño de embestidas
         dash_damage = 0
         dash_hits = []
@@ -147,18 +143,19 @@ class MovementSystem:
         for pos in self.movement_path[1:]:
             for enemy in self.dash_targets:
                 if enemy.position == pos and enemy not in dash_hits:
-                    damage = int(self.entity.stats['attack'] * 0.1)
+                    damage = int(DASH_DAMAGE(self.entity.stats, enemy.stats))
                     enemy.stats['current_hp'] -= damage
                     dash_damage += damage
                     dash_hits.append(enemy)
-                    print(f"💥 Embistió a {enemy.name} por {damage} daño!")
+                    combat_log.info("💥 Embistió a %s por %s daño!", enemy.name, damage)
         
         # Mover entidad
         final_position = self.movement_path[-1]
         self.entity.position = final_position
         self.entity.has_moved = True
         
-        print(f"✅ Movimiento completado a {final_position}. Embestidas: {len(dash_hits)} ({dash_damage} daño total)")
+        movement_log.info("✅ Movimiento completado a %s. Embestidas: %d (%s daño total)",
+                         final_position, len(dash_hits), dash_damage)
         
         self.reset()
         return True
@@ -172,22 +169,28 @@ class MovementSystem:
         if not self.grid.is_valid_position(grid_pos):
             return
         
-        start_pos = self.movement_path[-1]
-        preview_segment = self._calculate_path_segment(start_pos, grid_pos, all_entities)
-        
-        if not preview_segment or len(preview_segment) < 2:
+        # ✅ Cursor fuera del área alcanzable (consulta O(1) sobre el BFS cacheado)
+        if grid_pos not in self.get_reachable_positions():
+            self.preview_path = []
             return
         
-        # Limitar por movimiento restante
-        remaining = self.movement_range - (len(self.movement_path) - 1)
-        if len(preview_segment) - 1 > remaining:
-            preview_segment = preview_segment[:remaining + 1]
-        
-        self.movement_path = self.movement_path[:-1] + preview_segment
+        # La previsualización NO modifica la ruta confirmada: solo el clic la confirma
+        self.preview_path = self._calculate_path_segment(self.movement_path[-1], grid_pos, all_entities)
     
     def draw(self, screen):
         """Dibuja la ruta de movimiento y embestidas"""
-        if not self.is_active or len(self.movement_path) < 2:
+        import pygame
+        if not self.is_active:
+            return
+        
+        # Previsualización hacia el cursor (más tenue que la ruta confirmada)
+        for pos in self.preview_path[1:]:
+            screen_pos = self.grid.get_screen_position(pos)
+            highlight = pygame.Surface((self.grid.cell_size, self.grid.cell_size), pygame.SRCALPHA)
+            highlight.fill((100, 255, 100, 40))
+            screen.blit(highlight, screen_pos)
+        
+        if len(self.movement_path) < 2:
             return
         
         # Línea de trayectoria
@@ -213,17 +216,16 @@ class MovementSystem:
             center = (screen_pos[0] + self.grid.cell_size // 2, screen_pos[1] + self.grid.cell_size // 2)
             pygame.draw.circle(screen, (255, 50, 50), center, 25, 4)
             
-            damage = int(self.entity.stats['attack'] * 0.1)
-            font = pygame.font.SysFont(None, 20)
-            screen.blit(font.render(f"-{damage}", True, (255, 100, 100)), 
+            damage = int(DASH_DAMAGE(self.entity.stats, enemy.stats))
+            screen.blit(text_cache.render(f"-{damage}", (255, 100, 100), 20), 
                        (center[0] - 10, center[1] - 35))
-            screen.blit(font.render("EMBESTIDA", True, (255, 100, 100)), 
+            screen.blit(text_cache.render("EMBESTIDA", (255, 100, 100), 20), 
                        (center[0] - 30, center[1] + 20))
     
     def cancel(self):
         """Cancela el movimiento en curso"""
         if self.is_active:
-            print("❌ Movimiento cancelado")
+            movement_log.info("❌ Movimiento cancelado")
             self.reset()
     
     def get_state_info(self) -> dict:
@@ -1,4 +1,5 @@
 from game.core.event_system import event_system, EventTypes
+from game.core.logger import combat_log, effects_log
 
 class PassiveSystem:
     """Sistema para gestionar pasivas de todos los personajes de forma modular"""
@@ -6,23 +7,31 @@ class PassiveSystem:
     def __init__(self):
         self.registered_passives = {}  # entity_id -> list of passive functions
     
-    def register_passive(self, entity, passive_name, event_type, callback):
-        """Registra una pasiva para una entidad"""
+    def register_passive(self, entity, passive_name, event_type, callback, key_field=None):
+        """
+        Registra una pasiva para una entidad.
+        key_field: campo de data que debe ser la propia entidad ('killer', 'entity'...);
+        con él la pasiva se suscribe por clave y no recibe los eventos de los demás.
+        """
         entity_id = id(entity)
         
         if entity_id not in self.registered_passives:
             self.registered_passives[entity_id] = []
         
         # Registrar el callback para el evento específico
-        event_system.subscribe(event_type, callback)
+        if key_field:
+            event_system.subscribe_keyed(event_type, key_field, entity, callback)
+        else:
+            event_system.subscribe(event_type, callback)
         
         self.registered_passives[entity_id].append({
             'name': passive_name,
             'event_type': event_type,
-            'callback': callback
+            'callback': callback,
+            'key_field': key_field
         })
         
-        print(f"🔔 Pasiva registrada: {passive_name} para {entity.name}")
+        effects_log.debug("🔔 Pasiva registrada: %s para %s", passive_name, entity.name)
     
     def unregister_passives(self, entity):
         """Remueve todas las pasivas de una entidad"""
@@ -30,10 +39,14 @@ class PassiveSystem:
         
         if entity_id in self.registered_passives:
             for passive in self.registered_passives[entity_id]:
-                event_system.unsubscribe(passive['event_type'], passive['callback'])
+                if passive['key_field']:
+                    event_system.unsubscribe_keyed(passive['event_type'], passive['key_field'],
+                                                   entity, passive['callback'])
+                else:
+                    event_system.unsubscribe(passive['event_type'], passive['callback'])
             
             del self.registered_passives[entity_id]
-            print(f"🔕 Todas las pasivas removidas de {entity.name}")
+            effects_log.debug("🔕 Todas las pasivas removidas de %s", entity.name)
     
     def get_entity_passives(self, entity):
         """Obtiene todas las pasivas de una entidad"""
@@ -42,28 +55,31 @@ class PassiveSystem:
 
 # Fábrica de pasivas predefinidas
 class PassiveFactory:
-    """Factory para crear pasivas comunes sin duplicar código"""
+    """
+    Factory para crear pasivas comunes sin duplicar código.
+    Cada método retorna (nombre, evento, callback, key_field) listo para
+    passive_system.register_passive(entity, *pasiva)
+    """
     
     @staticmethod
     def create_ph_regen_on_kill(entity, ph_amount=50, passive_name="Instinto del Vacío"):
         """Crea una pasiva que regenera PH al matar enemigos"""
         def on_entity_died(data):
-            killer = data.get('killer')
-            if killer == entity:
-                old_ph = entity.stats['current_ph']
-                entity.stats['current_ph'] = min(entity.stats['max_ph'], old_ph + ph_amount)
-                
-                print(f"🎯 {passive_name}: {entity.name} regenera {ph_amount} PH!")
-                
-                event_system.emit(EventTypes.PH_CHANGED, {
-                    'entity': entity,
-                    'old_ph': old_ph,
-                    'new_ph': entity.stats['current_ph'],
-                    'change': ph_amount,
-                    'reason': passive_name
-                })
+            # Solo llega cuando killer es esta entidad (suscripción por clave)
+            old_ph = entity.stats['current_ph']
+            entity.stats['current_ph'] = min(entity.stats['max_ph'], old_ph + ph_amount)
+            
+            combat_log.info("🎯 %s: %s regenera %s PH!", passive_name, entity.name, ph_amount)
+            
+            event_system.emit(EventTypes.PH_CHANGED, {
+                'entity': entity,
+                'old_ph': old_ph,
+                'new_ph': entity.stats['current_ph'],
+                'change': ph_amount,
+                'reason': passive_name
+            })
         
-        return passive_name, EventTypes.ENTITY_DIED, on_entity_died
+        return passive_name, EventTypes.ENTITY_DIED, on_entity_died, 'killer'
     
     @staticmethod
     def create_ph_regen_on_ally_attack(entity, ph_amount=10, ult_charge_percent=4, passive_name="Corazón Tempestuoso"):
@@ -76,7 +92,7 @@ class PassiveFactory:
                 old_ph = entity.stats['current_ph']
                 entity.stats['current_ph'] = min(entity.stats['max_ph'], old_ph + ph_amount)
                 
-                print(f"💙 {passive_name}: {entity.name} recupera {ph_amount} PH por {caster.name}")
+                combat_log.info("💙 %s: %s recupera %s PH por %s", passive_name, entity.name, ph_amount, caster.name)
                 
                 event_system.emit(EventTypes.PH_CHANGED, {
                     'entity': entity,
@@ -89,19 +105,18 @@ class PassiveFactory:
                 # Aquí podríamos agregar la recarga de ultimate después
                 # Por ahora solo el PH
         
-        return passive_name, EventTypes.ABILITY_USED, on_ability_used
+        # Depende del equipo del lanzador, no de una entidad concreta: difusión normal
+        return passive_name, EventTypes.ABILITY_USED, on_ability_used, None
     
     @staticmethod
     def create_movement_buff(entity, evasion_bonus=0.8, dash_damage_multiplier=1.0, passive_name="Red Aura"):
         """Crea una pasiva que da beneficios durante el movimiento"""
         def on_entity_moved(data):
-            moved_entity = data.get('entity')
-            if moved_entity == entity:
-                # Aquí aplicamos los beneficios de Red Aura
-                # Por ahora solo un mensaje, luego implementaremos los efectos reales
-                print(f"🔴 {passive_name} activa: {entity.name} obtiene bonuses de movimiento")
-                
-                # En el futuro: aplicar efecto de evasión y aumento de daño de embestida
-                # self.effect_system.add_effect(entity, some_effect)
+            # Aquí aplicamos los beneficios de Red Aura
+            # Por ahora solo un mensaje, luego implementaremos los efectos reales
+            effects_log.debug("🔴 %s activa: %s obtiene bonuses de movimiento", passive_name, entity.name)
+            
+            # En el futuro: aplicar efecto de evasión y aumento de daño de embestida
+            # self.effect_system.add_effect(entity, some_effect)
         
-        return passive_name, EventTypes.ENTITY_MOVED, on_entity_moved
\ No newline at end of file
+        return passive_name, EventTypes.ENTITY_MOVED, on_entity_moved, 'entity'
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Búsqueda de caminos sobre el grid - BFS para el área alcanzable, A* para la ruta al cursor
+Los resultados se cachean por (entidad, posición, versión del tablero, movimientos)
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+Position = Tuple[int, int]
+
+NEIGHBOR_OFFSETS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class Pathfinder:
+    """
+    Pathfinder con caché ligado a un GridSystem.
+    Solo los aliados bloquean el paso (los enemigos se atraviesan para embestir).
+    """
+    
+    def __init__(self, grid_system, max_cache_entries=64):
+        self.grid = grid_system
+        self.max_cache_entries = max_cache_entries
+        self._reachable_cache: Dict[tuple, Dict[Position, int]] = {}
+        self._path_cache: Dict[tuple, Optional[List[Position]]] = {}
+        self.stats = {'reachable_hits': 0, 'reachable_misses': 0, 'path_hits': 0, 'path_misses': 0}
+    
+    def _cache_key(self, entity, start, max_steps):
+        return (id(entity), start, self.grid.version, max_steps)
+    
+    def _is_blocked(self, entity, position):
+        return self.grid.is_occupied(position, team=entity.team, exclude=entity)
+    
+    def reachable(self, entity, start: Position, max_steps: int) -> Dict[Position, int]:
+        """
+        Flood fill BFS: casilla -> pasos mínimos desde start (incluye start con 0).
+        Se calcula una vez por (entidad, posición, versión del tablero, movimientos).
+        """
+        max_steps = int(max_steps)
+        key = self._cache_key(entity, start, max_steps)
+        cached = self._reachable_cache.get(key)
+        if cached is not None:
+            self.stats['reachable_hits'] += 1
+            return cached
+        
+        self.stats['reachable_misses'] += 1
+        distances = {start: 0}
+        frontier = [start]
+        for steps in range(1, max_steps + 1):
+            next_frontier = []
+            for x, y in frontier:
+                for dx, dy in NEIGHBOR_OFFSETS:
+                    cell = (x + dx, y + dy)
+                    if cell in distances or not self.grid.is_valid_position(cell):
+                        continue
+                    if self._is_blocked(entity, cell):
+                        continue
+                    distances[cell] = steps
+                    next_frontier.append(cell)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        
+        if len(self._reachable_cache) >= self.max_cache_entries:
+            self._reachable_cache.clear()
+        self._reachable_cache[key] = distances
+        return distances
+    
+    def find_path(self, entity, start: Position, goal: Position, max_steps: int) -> Optional[List[Position]]:
+        """
+        Ruta más corta [start, ..., goal] con A* (heurística Manhattan), o None si
+        goal no es alcanzable con max_steps. Usa el área BFS cacheada como poda.
+        """
+        max_steps = int(max_steps)
+        if start == goal:
+            return [start]
+        
+        key = self._cache_key(entity, start, max_steps) + (goal,)
+        if key in self._path_cache:
+            self.stats['path_hits'] += 1
+            return self._path_cache[key]
+        
+        self.stats['path_misses'] += 1
+        area = self.reachable(entity, start, max_steps)
+        path = self._astar(start, goal, area) if goal in area else None
+        
+        if len(self._path_cache) >= self.max_cache_entries * 8:
+            self._path_cache.clear()
+        self._path_cache[key] = path
+        return path
+    
+    def _astar(self, start, goal, area):
+        def heuristic(cell):
+            return abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+        
+        # (f, g, contador, casilla) - el contador mantiene el orden FIFO entre empates
+        open_heap = [(heuristic(start), 0, 0, start)]
+        came_from = {start: None}
+        best_cost = {start: 0}
+        counter = 0
+        
+        while open_heap:
+            _, cost, _, current = heapq.heappop(open_heap)
+            if current == goal:
+                break
+            if cost > best_cost[current]:
+                continue
+            for dx, dy in NEIGHBOR_OFFSETS:
+                cell = (current[0] + dx, current[1] + dy)
+                if cell not in area:
+                    continue
+                new_cost = cost + 1
+                if new_cost < best_cost.get(cell, float('inf')):
+                    best_cost[cell] = new_cost
+                    came_from[cell] = current
+                    counter += 1
+                    heapq.heappush(open_heap, (new_cost + heuristic(cell), new_cost, counter, cell))
+        
+        if goal not in came_from:
+            return None
+        
+        path = [goal]
+        while path[-1] != start:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+    
+    def clear_cache(self):
+        self._reachable_cache.clear()
+        self._path_cache.clear()
@@ -1,5 +1,7 @@
-import pygame
 from game.core.event_system import event_system, EventTypes
+from game.core.logger import ui_log
+from game.systems.targeting import cells_in_range, entities_in_radius
+from game.ui.text_cache import text_cache
 
 class SelectionMode:
     """Clase base para todos los modos de selección"""
@@ -88,19 +90,20 @@ class AllySelectionMode(SelectionMode):
                 self.calculate_distance(caster.position, entity.position) <= range_distance)
         ]
         
-        print(f"🛡️ Modo ALIADO: {len(self.targets)} aliados encontrados")
+        ui_log.info("🛡️ Modo ALIADO: %s aliados encontrados", len(self.targets))
         return len(self.targets) > 0
     
     def handle_click(self, grid_pos, entities):
-        for entity in entities:
-            if entity.position == grid_pos and entity in self.targets:
+        for entity in self.ability_system.grid_system.get_entities_at(grid_pos):
+            if entity in self.targets:
                 context = self.ability_system.create_context(target_entity=entity)
                 return self.ability_system.execute_ability_directly(context)
         
-        print("❌ No hay un aliado válido en esta posición")
+        ui_log.info("No hay un aliado válido en esta posición")
         return False
     
     def draw_indicators(self, screen):
+        import pygame
         for target in self.targets:
             screen_pos = self.ability_system.grid_system.get_screen_position(target.position)
             center_x = screen_pos[0] + self.ability_system.grid_system.cell_size // 2
@@ -128,19 +131,20 @@ class EnemySelectionMode(SelectionMode):
                 self.calculate_distance(caster.position, entity.position) <= range_distance)
         ]
         
-        print(f"🎯 Modo ENEMIGO: {len(self.targets)} objetivos encontrados")
+        ui_log.info("🎯 Modo ENEMIGO: %s objetivos encontrados", len(self.targets))
         return len(self.targets) > 0
     
     def handle_click(self, grid_pos, entities):
-        for entity in entities:
-            if entity.position == grid_pos and entity in self.targets:
+        for entity in self.ability_system.grid_system.get_entities_at(grid_pos):
+            if entity in self.targets:
                 context = self.ability_system.create_context(target_entity=entity)
                 return self.ability_system.execute_ability_directly(context)
         
-        print("❌ No hay un objetivo válido en esta posición")
+        ui_log.info("No hay un objetivo válido en esta posición")
         return False
     
     def draw_indicators(self, screen):
+        import pygame
         for target in self.targets:
             screen_pos = self.ability_system.grid_system.get_screen_position(target.position)
             center_x = screen_pos[0] + self.ability_system.grid_system.cell_size // 2
@@ -162,18 +166,9 @@ class PositionSelectionMode(SelectionMode):
         super().activate(ability_data, caster, entities)
         
         range_distance = ability_data.get('range', 1)
-        caster_x, caster_y = caster.position
-        self.targets = []
-        
-        for x in range(caster_x - range_distance, caster_x + range_distance + 1):
-            for y in range(caster_y - range_distance, caster_y + range_distance + 1):
-                distance = abs(x - caster_x) + abs(y - caster_y)
-                if (distance <= range_distance and 
-                    self.ability_system.grid_system.is_valid_position((x, y)) and
-                    (x, y) != caster.position):
-                    self.targets.append((x, y))
+        self.targets = cells_in_range(caster.position, range_distance, self.ability_system.grid_system)
         
-        print(f"📍 Modo POSICIÓN: {len(self.targets)} posiciones válidas")
+        ui_log.info("📍 Modo POSICIÓN: %s posiciones válidas", len(self.targets))
         return len(self.targets) > 0
     
     def handle_click(self, grid_pos, entities):
@@ -181,10 +176,11 @@ class PositionSelectionMode(SelectionMode):
             context = self.ability_system.create_context(target_position=grid_pos)
             return self.ability_system.execute_ability_directly(context)
         
-        print("❌ Posición fuera de rango")
+        ui_log.info("Posición fuera de rango")
         return False
     
     def draw_indicators(self, screen):
+        import pygame
         for pos in self.targets:
             screen_pos = self.ability_system.grid_system.get_screen_position(pos)
             rect = pygame.Rect(
@@ -216,11 +212,9 @@ class ChainSelectionMode(SelectionMode):
         self.selected_targets = []
         self.available_targets = self.calculate_initial_targets(entities)
         
-        print(f"⛓️ Modo CADENA: Selecciona de {self.min_targets} a {self.max_targets} objetivos")
-        print(f"   Objetivos iniciales: {len(self.available_targets)}")
-        print("   CLIC en enemigo: Añadir objetivo")
-        print("   CLIC en vacío: Confirmar con objetivos actuales")
-        print("   ESC: Cancelar habilidad")
+        ui_log.info("⛓️ Modo CADENA: Selecciona de %s a %s objetivos (iniciales: %s) | "
+                    "CLIC en enemigo: añadir, CLIC en vacío: confirmar, ESC: cancelar",
+                    self.min_targets, self.max_targets, len(self.available_targets))
         return len(self.available_targets) >= self.min_targets
     
     def calculate_initial_targets(self, entities):
@@ -233,7 +227,7 @@ class ChainSelectionMode(SelectionMode):
                 self.calculate_distance(self.caster.position, entity.position) <= range_distance)
         ]
         
-        print(f"🎯 Objetivos iniciales encontrados: {len(initial_targets)}")
+        ui_log.debug("🎯 Objetivos iniciales encontrados: %s", len(initial_targets))
         return initial_targets
     
     def calculate_next_targets(self, last_target, entities):
@@ -248,43 +242,39 @@ class ChainSelectionMode(SelectionMode):
         ]
     
     def handle_click(self, grid_pos, entities):
-        clicked_entity = None
-        for entity in entities:
-            if entity.position == grid_pos:
-                clicked_entity = entity
-                break
+        clicked_entity = self.ability_system.grid_system.get_entity_at(grid_pos)
         
         # CONFIRMAR CON CLIC EN VACÍO SI TENEMOS AL MENOS EL MÍNIMO
         if not clicked_entity:
             if len(self.selected_targets) >= self.min_targets:
                 return self.execute_chain_attack()
             else:
-                print(f"❌ Necesitas al menos {self.min_targets} objetivo(s)")
+                ui_log.info("Necesitas al menos %s objetivo(s)", self.min_targets)
                 return False
         
         if clicked_entity and clicked_entity in self.available_targets:
             self.selected_targets.append(clicked_entity)
-            print(f"⛓️ Objetivo {len(self.selected_targets)} seleccionado: {clicked_entity.name}")
+            ui_log.info("⛓️ Objetivo %s seleccionado: %s", len(self.selected_targets), clicked_entity.name)
             
             # EJECUTAR INMEDIATAMENTE SI ALCANZAMOS EL MÁXIMO
             if len(self.selected_targets) >= self.max_targets:
                 return self.execute_chain_attack()
             else:
                 self.available_targets = self.calculate_next_targets(clicked_entity, entities)
-                print(f"   Próximos objetivos disponibles: {len(self.available_targets)}")
+                ui_log.debug("   Próximos objetivos disponibles: %s", len(self.available_targets))
                 
                 # SI NO HAY MÁS OBJETIVOS PERO TENEMOS EL MÍNIMO, PERMITIR CONFIRMAR
                 if not self.available_targets and len(self.selected_targets) >= self.min_targets:
-                    print("   ⚠️  No hay más objetivos en cadena. Clíc en vacío para confirmar.")
+                    ui_log.info("No hay más objetivos en cadena. Clic en vacío para confirmar.")
                 
                 return False
         
-        print("❌ Objetivo no válido para la cadena")
+        ui_log.info("Objetivo no válido para la cadena")
         return False
     
     def execute_chain_attack(self):
         """EJECUTAR ATAQUE EN CADENA CON LOS OBJETIVOS SELECCIONADOS"""
-        print(f"🎯 Ejecutando cadena con {len(self.selected_targets)} objetivos")
+        ui_log.info("🎯 Ejecutando cadena con %s objetivos", len(self.selected_targets))
         context = self.ability_system.create_context()
         context.entities = self.selected_targets
         success = self.ability_system.execute_ability_directly(context)
@@ -292,6 +282,7 @@ class ChainSelectionMode(SelectionMode):
         return success
     
     def draw_indicators(self, screen):
+        import pygame
         for target in self.available_targets:
             screen_pos = self.ability_system.grid_system.get_screen_position(target.position)
             center_x = screen_pos[0] + self.ability_system.grid_system.cell_size // 2
@@ -308,12 +299,11 @@ class ChainSelectionMode(SelectionMode):
             radius = self.ability_system.grid_system.cell_size // 2 + 6
             pygame.draw.circle(screen, (255, 215, 0), (center_x, center_y), radius, 4)
             
-            font = pygame.font.SysFont(None, 24)
-            order_text = font.render(str(i+1), True, (255, 215, 0))
+            order_text = text_cache.render(str(i+1), (255, 215, 0), 24)
             screen.blit(order_text, (center_x - order_text.get_width() // 2, center_y - 10))
     
     def cancel_selection(self):
-        print("❌ Selección en cadena cancelada")
+        ui_log.info("Selección en cadena cancelada")
         self.deactivate()
         return True
     
@@ -334,19 +324,20 @@ class GlobalAllySelectionMode(SelectionMode):
             if entity.team == caster.team and entity != caster
         ]
         
-        print(f"🌍 Modo ALIADO GLOBAL: {len(self.targets)} aliados disponibles")
+        ui_log.info("🌍 Modo ALIADO GLOBAL: %s aliados disponibles", len(self.targets))
         return len(self.targets) > 0
     
     def handle_click(self, grid_pos, entities):
-        for entity in entities:
-            if entity.position == grid_pos and entity in self.targets:
+        for entity in self.ability_system.grid_system.get_entities_at(grid_pos):
+            if entity in self.targets:
                 context = self.ability_system.create_context(target_entity=entity)
                 return self.ability_system.execute_ability_directly(context)
         
-        print("❌ No hay un aliado válido en esta posición")
+        ui_log.info("No hay un aliado válido en esta posición")
         return False
     
     def draw_indicators(self, screen):
+        import pygame
         for target in self.targets:
             screen_pos = self.ability_system.grid_system.get_screen_position(target.position)
             center_x = screen_pos[0] + self.ability_system.grid_system.cell_size // 2
@@ -401,11 +392,10 @@ class SelectionSystem:
             self.active_mode = self.modes[mode_name]
             success = self.active_mode.activate(ability_data, caster, entities)
             if not success:
-                print(f"❌ No se pudo activar el modo {mode_name} - no hay objetivos válidos")
+                ui_log.info("No se pudo activar el modo %s - no hay objetivos válidos", mode_name)
             return success
         
-        print(f"❌ Modo de selección desconocido: {mode_name}")
-        print(f"   Modos disponibles: {list(self.modes.keys())}")
+        ui_log.warning("Modo de selección desconocido: %s (disponibles: %s)", mode_name, list(self.modes))
         return False
     
     def handle_click(self, grid_pos, entities):
@@ -439,7 +429,7 @@ class LineSelectionMode(SelectionMode):
     def activate(self, ability_data, caster, entities):
         super().activate(ability_data, caster, entities)
         
-        print(f"➖ Modo LÍNEA: Selecciona dirección para {ability_data['name']}")
+        ui_log.info("➖ Modo LÍNEA: Selecciona dirección para %s", ability_data['name'])
         return True
     
     def handle_click(self, grid_pos, entities):
@@ -469,9 +459,7 @@ class LineSelectionMode(SelectionMode):
                 break
             
             # 🎯 BUSCAR TODAS LAS ENTIDADES, NO SOLO ENEMIGOS
-            for entity in entities:
-                if entity.position == current_pos:
-                    line_targets.append(entity)
+            line_targets.extend(self.ability_system.grid_system.get_entities_at(current_pos))
         
         # 🎯 CORRECCIÓN: Ejecutar la habilidad aunque no haya objetivos
         # Las habilidades de movilidad deben funcionar igual
@@ -479,22 +467,22 @@ class LineSelectionMode(SelectionMode):
         context.entities = line_targets  # Puede estar vacío
         
         # 🎯 AÑADIR LA DIRECCIÓN AL CONTEXTO PARA EFECTOS DE MOVIMIENTO
-        context.extra_data = {
+        # (update, no reemplazar: conserva effect_system y grid_system inyectados)
+        context.extra_data.update({
             'direction': direction,
             'line_length': min(range_distance, self._calculate_line_length(caster_pos, direction, range_distance))
-        }
+        })
         
         success = self.ability_system.execute_ability_directly(context)
         
         if not success:
-            print("⚠️  Habilidad ejecutada sin objetivos - movimiento puro")
+            ui_log.info("Habilidad ejecutada sin objetivos - movimiento puro")
         
         return success
     
     def _calculate_line_length(self, start_pos, direction, max_range):
         """Calcula cuánto puede avanzar en la dirección sin obstáculos"""
-        from game.systems.grid_system import GridSystem
-        grid_system = GridSystem()
+        grid_system = self.ability_system.grid_system
         
         current_pos = start_pos
         length = 0
@@ -515,6 +503,7 @@ class LineSelectionMode(SelectionMode):
         return length
     
     def draw_indicators(self, screen):
+        import pygame
         # Dibujar líneas en las 4 direcciones principales
         caster_pos = self.caster.position
         screen_pos = self.ability_system.grid_system.get_screen_position(caster_pos)
@@ -548,11 +537,7 @@ class AoeSelectionMode(SelectionMode):
         
         # Ejecutar inmediatamente en área alrededor del caster
         aoe_radius = ability_data.get('aoe_radius', 1)
-        targets = [
-            entity for entity in entities
-            if (entity.team != caster.team and 
-                self.calculate_distance(caster.position, entity.position) <= aoe_radius)
-        ]
+        targets = entities_in_radius(entities, caster.position, aoe_radius, caster, 'enemies')
         
         context = self.ability_system.create_context()
         context.entities = targets
@@ -564,6 +549,7 @@ class AoeSelectionMode(SelectionMode):
         return False  # No necesita clic
     
     def draw_indicators(self, screen):
+        import pygame
         # Dibujar área AOE alrededor del caster
         caster_pos = self.caster.position
         screen_pos = self.ability_system.grid_system.get_screen_position(caster_pos)
@@ -571,20 +557,16 @@ class AoeSelectionMode(SelectionMode):
         
         aoe_radius = self.ability_data.get('aoe_radius', 1)
         
-        for dx in range(-aoe_radius, aoe_radius + 1):
-            for dy in range(-aoe_radius, aoe_radius + 1):
-                if abs(dx) + abs(dy) <= aoe_radius:
-                    pos = (caster_pos[0] + dx, caster_pos[1] + dy)
-                    if self.ability_system.grid_system.is_valid_position(pos):
-                        target_screen_pos = self.ability_system.grid_system.get_screen_position(pos)
-                        rect = pygame.Rect(
-                            target_screen_pos[0], target_screen_pos[1],
-                            cell_size, cell_size
-                        )
-                        highlight = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
-                        highlight.fill((255, 100, 100, 80))
-                        screen.blit(highlight, rect)
-                        pygame.draw.rect(screen, (255, 50, 50), rect, 2)
+        for pos in cells_in_range(caster_pos, aoe_radius, self.ability_system.grid_system, include_center=True):
+            target_screen_pos = self.ability_system.grid_system.get_screen_position(pos)
+            rect = pygame.Rect(
+                target_screen_pos[0], target_screen_pos[1],
+                cell_size, cell_size
+            )
+            highlight = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+            highlight.fill((255, 100, 100, 80))
+            screen.blit(highlight, rect)
+            pygame.draw.rect(screen, (255, 50, 50), rect, 2)
     
     def calculate_distance(self, pos1, pos2):
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
\ No newline at end of file
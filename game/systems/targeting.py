@@ -0,0 +1,256 @@
+"""
+Consultas de objetivos por lotes - radios AoE y casillas en rango
+Un único vocabulario de filtros compartido por efectos y modos de selección.
+Usa NumPy si está instalado (vectoriza a partir de VECTORIZE_MIN_ENTITIES entidades)
+y recurre a Python puro si no lo está.
+Benchmark: python -m game.systems.targeting
+"""
+import time
+from functools import lru_cache
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: el juego funciona igual sin él
+    np = None
+
+# 🎯 Vocabulario común de filtros de objetivo
+TARGET_FILTERS = ('enemies', 'allies', 'all_allies', 'self', 'selected', 'all')
+# Singulares usados por algunas configs
+FILTER_ALIASES = {'enemy': 'enemies', 'ally': 'allies'}
+
+# Por debajo de este tamaño crear arrays cuesta más que el bucle en Python
+VECTORIZE_MIN_ENTITIES = 64
+VECTORIZE_MIN_CELLS = 64
+
+
+def normalize_filter(target_filter, default='enemies') -> str:
+    """Traduce alias y filtros desconocidos al vocabulario común"""
+    target_filter = FILTER_ALIASES.get(target_filter, target_filter)
+    return target_filter if target_filter in TARGET_FILTERS else default
+
+
+def matches_filter(entity, caster, target_filter, selected=None) -> bool:
+    """
+    enemies: otro equipo | allies: mismo equipo sin el lanzador | all_allies: mismo equipo
+    self: el lanzador | selected: el objetivo elegido | all: cualquiera
+    """
+    target_filter = normalize_filter(target_filter)
+    if target_filter == 'enemies':
+        return entity.team != caster.team
+    if target_filter == 'allies':
+        return entity.team == caster.team and entity is not caster
+    if target_filter == 'all_allies':
+        return entity.team == caster.team
+    if target_filter == 'self':
+        return entity is caster
+    if target_filter == 'selected':
+        return selected is not None and entity is selected
+    return True
+
+
+def filter_predicate(caster, target_filter, selected=None):
+    """matches_filter resuelto una sola vez: una función de un argumento por consulta"""
+    target_filter = normalize_filter(target_filter)
+    team = caster.team
+    if target_filter == 'enemies':
+        return lambda entity: entity.team != team
+    if target_filter == 'allies':
+        return lambda entity: entity.team == team and entity is not caster
+    if target_filter == 'all_allies':
+        return lambda entity: entity.team == team
+    if target_filter == 'self':
+        return lambda entity: entity is caster
+    if target_filter == 'selected':
+        return lambda entity: selected is not None and entity is selected
+    return lambda entity: True
+
+
+def filter_entities(entities, caster, target_filter, selected=None) -> List:
+    return list(filter(filter_predicate(caster, target_filter, selected), entities))
+
+
+class TargetingIndex:
+    """
+    Posiciones y equipos de un conjunto de entidades en arrays paralelos.
+    Construir una vez y consultar muchas (IA, simulador, previsualización de AoE).
+    """
+    
+    def __init__(self, entities=()):
+        self.refresh(entities)
+    
+    def refresh(self, entities):
+        """Reconstruye los arrays tras movimientos, muertes o altas"""
+        self.entities = list(entities)
+        self._slot = {id(entity): i for i, entity in enumerate(self.entities)}
+        self._team_codes = {}
+        teams = [self._team_codes.setdefault(e.team, len(self._team_codes)) for e in self.entities]
+        
+        self.vectorized = np is not None and len(self.entities) >= VECTORIZE_MIN_ENTITIES
+        if self.vectorized:
+            positions = np.array([e.position for e in self.entities], dtype=np.int32).reshape(-1, 2)
+            self._xs = positions[:, 0]
+            self._ys = positions[:, 1]
+            self._teams = np.array(teams, dtype=np.int32)
+    
+    def query(self, caster, target_filter, center=None, radius=None, selected=None) -> List:
+        """Entidades que cumplen el filtro y, si se da center, a distancia Manhattan <= radius"""
+        target_filter = normalize_filter(target_filter)
+        
+        if not self.vectorized:
+            predicate = filter_predicate(caster, target_filter, selected)
+            if center is None:
+                return list(filter(predicate, self.entities))
+            cx, cy = center
+            targets = []
+            for entity in self.entities:
+                x, y = entity.position
+                if abs(x - cx) + abs(y - cy) <= radius and predicate(entity):
+                    targets.append(entity)
+            return targets
+        
+        mask = self._filter_mask(caster, target_filter, selected)
+        if center is not None:
+            mask &= (np.abs(self._xs - center[0]) + np.abs(self._ys - center[1])) <= radius
+        entities = self.entities
+        return [entities[i] for i in np.flatnonzero(mask)]
+    
+    def _filter_mask(self, caster, target_filter, selected):
+        count = len(self.entities)
+        if target_filter in ('self', 'selected'):
+            mask = np.zeros(count, dtype=bool)
+            slot = self._slot.get(id(caster if target_filter == 'self' else selected))
+            if slot is not None:
+                mask[slot] = True
+            return mask
+        if target_filter == 'all':
+            return np.ones(count, dtype=bool)
+        
+        same_team = self._teams == self._team_codes.get(caster.team, -1)
+        if target_filter == 'enemies':
+            return ~same_team
+        if target_filter == 'allies':
+            slot = self._slot.get(id(caster))
+            if slot is not None:
+                same_team[slot] = False
+        return same_team
+
+
+def entities_in_radius(entities, center, radius, caster, target_filter, selected=None) -> List:
+    """Atajo de una sola consulta: entidades en el radio que cumplen el filtro"""
+    return TargetingIndex(entities).query(caster, target_filter, center, radius, selected)
+
+
+@lru_cache(maxsize=32)
+def _diamond_offsets(radius) -> Tuple[Tuple[int, int], ...]:
+    """Desplazamientos (dx, dy) con |dx|+|dy| <= radius, en el orden x-mayor de los bucles originales"""
+    return tuple((dx, dy)
+                 for dx in range(-radius, radius + 1)
+                 for dy in range(-radius, radius + 1)
+                 if abs(dx) + abs(dy) <= radius)
+
+
+@lru_cache(maxsize=32)
+def _diamond_array(radius):
+    offsets = np.array(_diamond_offsets(radius), dtype=np.int32)
+    offsets.setflags(write=False)
+    return offsets
+
+
+def cells_in_range(center, radius, grid_system, include_center=False) -> List[Tuple[int, int]]:
+    """Casillas válidas del grid a distancia Manhattan <= radius de center"""
+    radius = int(radius)
+    cx, cy = center
+    width, height = grid_system.width, grid_system.height
+    offsets = _diamond_offsets(radius)
+    
+    if np is not None and len(offsets) >= VECTORIZE_MIN_CELLS:
+        deltas = _diamond_array(radius)
+        cells = deltas + np.array(center, dtype=np.int32)
+        mask = ((cells[:, 0] >= 0) & (cells[:, 0] < width) &
+                (cells[:, 1] >= 0) & (cells[:, 1] < height))
+        if not include_center:
+            mask &= (deltas[:, 0] != 0) | (deltas[:, 1] != 0)
+        return [tuple(cell) for cell in cells[mask].tolist()]
+    
+    return [(cx + dx, cy + dy) for dx, dy in offsets
+            if 0 <= cx + dx < width and 0 <= cy + dy < height
+            and (include_center or dx or dy)]
+
+
+# ----------------------------------------------------------------------
+# Benchmark frente a los bucles originales
+# ----------------------------------------------------------------------
+def _legacy_aoe(entities, center, radius, caster):
+    targets = []
+    for entity in entities:
+        distance = abs(center[0] - entity.position[0]) + abs(center[1] - entity.position[1])
+        if distance <= radius and entity.team != caster.team:
+            targets.append(entity)
+    return targets
+
+
+def _legacy_cells(center, radius, grid_system):
+    cells = []
+    for x in range(center[0] - radius, center[0] + radius + 1):
+        for y in range(center[1] - radius, center[1] + radius + 1):
+            distance = abs(x - center[0]) + abs(y - center[1])
+            if distance <= radius and grid_system.is_valid_position((x, y)) and (x, y) != center:
+                cells.append((x, y))
+    return cells
+
+
+def benchmark(sizes=(10, 100, 1000), radius=3, repeats=200, seed=0):
+    """Compara consultas AoE y de casillas en rango con los bucles originales"""
+    import random
+    from types import SimpleNamespace
+    from game.systems.grid_system import GridSystem
+    
+    rng = random.Random(seed)
+    results = []
+    for size in sizes:
+        side = max(8, int(size ** 0.5) * 2)
+        grid = GridSystem(side, side)
+        entities = [SimpleNamespace(team="player" if i % 2 else "enemy",
+                                    position=(rng.randrange(side), rng.randrange(side)))
+                    for i in range(size)]
+        caster = entities[1] if size > 1 else entities[0]
+        centers = [(rng.randrange(side), rng.randrange(side)) for _ in range(repeats)]
+        
+        start = time.perf_counter()
+        expected = [_legacy_aoe(entities, c, radius, caster) for c in centers]
+        legacy_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        index = TargetingIndex(entities)
+        got = [index.query(caster, 'enemies', c, radius) for c in centers]
+        indexed_time = time.perf_counter() - start
+        assert got == expected, "TargetingIndex no coincide con el bucle original"
+        
+        cell_radius = max(radius, side // 4)
+        start = time.perf_counter()
+        legacy_cells = [_legacy_cells(c, cell_radius, grid) for c in centers]
+        legacy_cells_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        new_cells = [cells_in_range(c, cell_radius, grid) for c in centers]
+        cells_time = time.perf_counter() - start
+        assert new_cells == legacy_cells, "cells_in_range no coincide con el bucle original"
+        
+        results.append({
+            'entities': size,
+            'aoe_legacy_us': legacy_time / repeats * 1e6,
+            'aoe_indexed_us': indexed_time / repeats * 1e6,
+            'cell_radius': cell_radius,
+            'cells_legacy_us': legacy_cells_time / repeats * 1e6,
+            'cells_new_us': cells_time / repeats * 1e6
+        })
+    return results
+
+
+if __name__ == "__main__":
+    backend = "NumPy " + np.__version__ if np is not None else "Python puro (NumPy no instalado)"
+    print(f"🎯 Backend de targeting: {backend}")
+    for row in benchmark():
+        print(f"   {row['entities']:>5} entidades | AoE: {row['aoe_legacy_us']:8.1f}µs → {row['aoe_indexed_us']:8.1f}µs"
+              f" | casillas r={row['cell_radius']}: {row['cells_legacy_us']:8.1f}µs → {row['cells_new_us']:8.1f}µs")
@@ -1,3 +1,18 @@
+from game.core.logger import turn_log
+
+class TurnClock:
+    """
+    Inicios de turno de una entidad (lo avanza TurnSystem.start_entity_turn).
+    Duraciones de efectos y cooldowns guardan el tick absoluto en que vencen y
+    se cuentan contra él: pasar de turno no visita ninguno de ellos
+    """
+    
+    __slots__ = ('ticks',)
+    
+    def __init__(self):
+        self.ticks = 0
+
+
 class TurnSystem:
     def __init__(self):
         self.current_turn = "player"
@@ -5,11 +20,11 @@ class TurnSystem:
     
     def start_player_turn(self):
         self.current_turn = "player"
-        print(f"=== TURNO {self.turn_count} - JUGADOR ===")
+        turn_log.info("=== TURNO %d - JUGADOR ===", self.turn_count)
     
     def start_enemy_turn(self):
         self.current_turn = "enemy"
-        print(f"=== TURNO {self.turn_count} - ENEMIGO ===")
+        turn_log.info("=== TURNO %d - ENEMIGO ===", self.turn_count)
     
     def end_turn(self):
         if self.current_turn == "player":
@@ -18,5 +33,9 @@ class TurnSystem:
             self.turn_count += 1
             self.start_player_turn()
     
+    def start_entity_turn(self, entity):
+        """Inicio del turno de una entidad: avanza su reloj (cooldowns y duraciones de efectos)"""
+        entity.turn_clock.ticks += 1
+    
     def can_select(self, entity):
         return entity.team == self.current_turn and not (entity.has_moved and entity.has_acted)
\ No newline at end of file
@@ -1,4 +1,6 @@
 import pygame
+from game.core.logger import ui_log
+from game.ui.text_cache import text_cache
 
 class AbilityMenu:
     def __init__(self, screen, entity, position):
@@ -27,7 +29,7 @@ class AbilityMenu:
                 "selection_mode": getattr(action, 'selection_mode', 'enemy')  # 🆕 NUEVO
             })
         
-        print(f"📋 {self.entity.name} tiene {len(abilities)} habilidades: {[a['name'] for a in abilities]}")
+        ui_log.debug(lambda: f"📋 {self.entity.name} tiene {len(abilities)} habilidades: {[a['name'] for a in abilities]}")
         return abilities
     
     def get_action_description(self, action):
@@ -45,7 +47,7 @@ class AbilityMenu:
             return f"{getattr(action, 'name', 'Habilidad')} - Costo: {getattr(action, 'cost_ph', 0)} PH"
         
         except Exception as e:
-            print(f"⚠️ Error obteniendo descripción: {e}")
+            ui_log.warning("Error obteniendo descripción: %s", e)
             return f"{getattr(action, 'name', 'Habilidad')} - Costo: {getattr(action, 'cost_ph', 0)} PH"
     
     def get_action_range(self, action):
@@ -74,13 +76,8 @@ class AbilityMenu:
         self.screen.blit(panel, (menu_x, menu_y))
         pygame.draw.rect(self.screen, (255, 215, 0), (menu_x, menu_y, menu_width, menu_height), 3)
         
-        # Fuentes
-        font_title = pygame.font.SysFont('Arial', 24, bold=True)
-        font_ability = pygame.font.SysFont('Arial', 20)
-        font_desc = pygame.font.SysFont('Arial', 16)
-        
         # Título
-        title_text = font_title.render(f"HABILIDADES - {self.entity.name}", True, (255, 215, 0))
+        title_text = text_cache.render(f"HABILIDADES - {self.entity.name}", (255, 215, 0), 24, 'Arial', bold=True)
         self.screen.blit(title_text, (menu_x + 10, menu_y + 10))
         
         # Línea separadora
@@ -98,21 +95,21 @@ class AbilityMenu:
             
             # Nombre y tecla
             color = (255, 215, 0) if i == self.selected_index else (255, 255, 255)
-            ability_text = font_ability.render(f"[{i+1}] {ability['name']}", True, color)
+            ability_text = text_cache.render(f"[{i+1}] {ability['name']}", color, 20, 'Arial')
             self.screen.blit(ability_text, (menu_x + 15, y_pos))
             
             # Stats de la habilidad
-            stats_text = font_desc.render(f"PH: {ability['cost_ph']} | Rango: {ability['range']}", True, (150, 200, 255))
+            stats_text = text_cache.render(f"PH: {ability['cost_ph']} | Rango: {ability['range']}", (150, 200, 255), 16, 'Arial')
             self.screen.blit(stats_text, (menu_x + 200, y_pos))
             
             # Descripción (solo para la seleccionada)
             if i == self.selected_index:
-                desc_text = font_desc.render(ability['description'], True, (200, 200, 200))
+                desc_text = text_cache.render(ability['description'], (200, 200, 200), 16, 'Arial')
                 self.screen.blit(desc_text, (menu_x + 15, y_pos + 20))
         
         # 🆕 Instrucciones en la parte inferior
-        instructions = font_desc.render("ENTER/ESPACIO: Seleccionar | ESC: Cancelar | FLECHAS: Navegar", 
-                                      True, (150, 150, 150))
+        instructions = text_cache.render("ENTER/ESPACIO: Seleccionar | ESC: Cancelar | FLECHAS: Navegar", 
+                                        (150, 150, 150), 16, 'Arial')
         self.screen.blit(instructions, (menu_x + 10, menu_y + menu_height - 25))
     
     def handle_input(self, key):
@@ -151,9 +148,9 @@ class AbilityMenu:
         """Muestra el menú"""
         self.visible = True
         self.selected_index = 0
-        print("📋 Menú de habilidades abierto")
+        ui_log.debug("📋 Menú de habilidades abierto")
     
     def hide(self):
         """Oculta el menú"""
         self.visible = False
-        print("❌ Menú de habilidades cerrado")
\ No newline at end of file
+        ui_log.debug("Menú de habilidades cerrado")
\ No newline at end of file
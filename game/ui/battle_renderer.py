@@ -0,0 +1,96 @@
+"""
+Render con caché para BattleScene
+- Fondo + grid pre-horneados en una Surface (se reconstruye solo si cambia la geometría)
+- Sprites de entidad cacheados en GameEntity (se invalidan al cambiar sus stats)
+- Rectángulos sucios para pygame.display.update(rects) en lugar de flip()
+"""
+
+BACKGROUND_COLOR = (30, 30, 60)
+
+
+class BattleRenderer:
+    """
+    Decide qué redibujar cada frame comparando firmas del tablero y de la UI.
+    Si nada cambió no se dibuja nada y la escena retorna una lista vacía.
+    """
+    
+    def __init__(self, screen, grid_system):
+        self.screen = screen
+        self.grid = grid_system
+        
+        self._background = None
+        self._background_key = None
+        
+        self._board_signature = None
+        self._ui_signature = None
+        self._board_changed = True
+        self._ui_changed = True
+        self._full_redraw = True
+        self._overlay_active = False
+        
+        # Rectángulos del frame anterior: hay que repintarlos para borrar lo que se movió
+        self._last_entity_rects = []
+        self._last_ui_rects = []
+        
+        self.stats = {'frames_drawn': 0, 'frames_skipped': 0, 'full_updates': 0, 'background_builds': 0}
+    
+    def invalidate(self):
+        """Fuerza un redibujado completo en el próximo frame (resize, errores, cambio de escena)"""
+        self._full_redraw = True
+    
+    def get_background(self):
+        """Superficie con fondo y líneas del grid; 80+ rects dibujados una sola vez"""
+        import pygame
+        key = (self.screen.get_size(), self.grid.width, self.grid.height,
+               self.grid.cell_size, self.grid.offset_x, self.grid.offset_y)
+        if self._background is None or self._background_key != key:
+            self._background = pygame.Surface(self.screen.get_size()).convert()
+            self._background.fill(BACKGROUND_COLOR)
+            self.grid.draw(self._background)
+            self._background_key = key
+            self.stats['background_builds'] += 1
+        return self._background
+    
+    def begin_frame(self, board_signature, ui_signature, overlay_active=False, input_received=False) -> bool:
+        """
+        Compara las firmas con las del frame anterior.
+        Retorna False si no hace falta dibujar nada este frame.
+        overlay_active: hay menús, rutas o indicadores encima del tablero; como pueden
+        ocupar cualquier zona, sus frames (y el primero sin ellos) se actualizan completos.
+        """
+        self._board_changed = board_signature != self._board_signature
+        self._ui_changed = ui_signature != self._ui_signature
+        self._board_signature = board_signature
+        self._ui_signature = ui_signature
+        
+        if overlay_active != self._overlay_active:
+            self._full_redraw = True
+        elif overlay_active and (input_received or self._board_changed or self._ui_changed):
+            self._full_redraw = True
+        self._overlay_active = overlay_active
+        
+        if not (self._full_redraw or self._board_changed or self._ui_changed):
+            self.stats['frames_skipped'] += 1
+            return False
+        
+        self.stats['frames_drawn'] += 1
+        return True
+    
+    def end_frame(self, entity_rects, ui_rects):
+        """Rectángulos que cambiaron en pantalla: los de este frame más los del anterior"""
+        dirty = []
+        if self._full_redraw:
+            dirty.append(self.screen.get_rect())
+            self._full_redraw = False
+            self.stats['full_updates'] += 1
+        else:
+            if self._board_changed:
+                dirty.extend(self._last_entity_rects)
+                dirty.extend(entity_rects)
+            if self._ui_changed:
+                dirty.extend(self._last_ui_rects)
+                dirty.extend(ui_rects)
+        
+        self._last_entity_rects = entity_rects
+        self._last_ui_rects = ui_rects
+        return dirty
@@ -0,0 +1,74 @@
+"""
+Caché de fuentes y textos renderizados compartida por toda la UI
+pygame.font.SysFont recorre las fuentes del sistema en cada llamada: aquí se crea
+cada fuente una sola vez y los textos ya renderizados se reutilizan (LRU acotado).
+Registrada en GameContext como sistema 'text'.
+"""
+from collections import OrderedDict
+
+
+class TextCache:
+    """Fuentes por (nombre, tamaño, negrita) y Surfaces de texto por (fuente, texto, color)"""
+    
+    def __init__(self, max_surfaces=512):
+        self.max_surfaces = max_surfaces
+        self._fonts = {}
+        self._surfaces = OrderedDict()
+        self.stats = {
+            'font_hits': 0, 'font_misses': 0,
+            'text_hits': 0, 'text_misses': 0,
+            'evictions': 0
+        }
+    
+    def get_font(self, name=None, size=24, bold=False):
+        """Equivalente cacheado a pygame.font.SysFont(name, size, bold=bold)"""
+        key = (name, size, bold)
+        font = self._fonts.get(key)
+        if font is not None:
+            self.stats['font_hits'] += 1
+            return font
+        
+        import pygame
+        self.stats['font_misses'] += 1
+        font = pygame.font.SysFont(name, size, bold=bold)
+        self._fonts[key] = font
+        return font
+    
+    def render(self, text, color=(255, 255, 255), size=24, name=None, bold=False, antialias=True):
+        """
+        Surface del texto; la misma Surface se devuelve mientras siga en el LRU,
+        así que quien la reciba no debe modificarla.
+        """
+        key = (name, size, bold, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.stats['text_hits'] += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        
+        self.stats['text_misses'] += 1
+        surface = self.get_font(name, size, bold).render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_surfaces:
+            self._surfaces.popitem(last=False)
+            self.stats['evictions'] += 1
+        return surface
+    
+    def get_stats(self):
+        """Contadores + tasa de aciertos de textos (para verificar el coste por frame)"""
+        lookups = self.stats['text_hits'] + self.stats['text_misses']
+        return {
+            **self.stats,
+            'fonts': len(self._fonts),
+            'surfaces': len(self._surfaces),
+            'text_hit_rate': self.stats['text_hits'] / lookups if lookups else 0.0
+        }
+    
+    def clear(self):
+        """Vacía las cachés (p. ej. tras pygame.font.quit())"""
+        self._fonts.clear()
+        self._surfaces.clear()
+
+
+# Instancia global compartida
+text_cache = TextCache()
@@ -1,13 +1,23 @@
-import pygame
-from game.game import Game
+import sys
 
 def main():
+    # ⏱️ --profile-startup: tiempos de import por módulo y de cada fase hasta el primer frame
+    profiler = None
+    if "--profile-startup" in sys.argv[1:]:
+        from game.core.startup_profiler import ImportProfiler
+        profiler = ImportProfiler().install()
+    
     # ✅ INICIALIZAR CONTEXTO GLOBAL ANTES DE TODO
     from game.core.game_context import game_context
     game_context.initialize()
+    if profiler is not None:
+        profiler.mark("GameContext.initialize")
     
+    from game.game import Game
+    if profiler is not None:
+        profiler.mark("import game.game (pygame, escena)")
     print("🎮 Iniciando juego con arquitectura mejorada...")
-    game = Game()
+    game = Game(profiler=profiler)
     game.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+"""
+Configuración común de pytest: raíz del repo en sys.path y logger en SILENT
+(las pruebas no escriben en consola ni en logs/)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from game.core.logger import logger, SILENT
+
+
+@pytest.fixture(autouse=True)
+def silent_logger():
+    previous = logger.level
+    logger.set_level(SILENT)
+    yield
+    logger.set_level(previous)
@@ -0,0 +1,60 @@
+"""AbilityFactory: caché de prototipos por config completa y acotada por habilidad"""
+import pytest
+
+from game.systems.ability_factory import MAX_PROTOTYPE_VERSIONS, AbilityFactory
+
+
+def _config(multiplier):
+    return {'name': "Golpe", 'cost_ph': 0, 'effects': [{'type': 'damage', 'multiplier': multiplier}]}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    AbilityFactory.clear_prototypes()
+    yield
+    AbilityFactory.clear_prototypes()
+
+
+def test_same_config_shares_prototype():
+    first = AbilityFactory.get_prototype("tester", "golpe", _config(1.0))
+    assert AbilityFactory.get_prototype("tester", "golpe", _config(1.0)) is first
+    assert AbilityFactory.get_prototype("tester", "golpe", _config(2.0)) is not first
+    assert AbilityFactory.get_prototype("otro", "golpe", _config(1.0)) is not first
+
+
+def test_cache_key_is_the_config_not_its_hash(monkeypatch):
+    import game.systems.ability_factory as ability_factory
+    
+    class Colliding(tuple):
+        def __hash__(self):
+            return 0
+    
+    monkeypatch.setattr(ability_factory, '_freeze', lambda config: Colliding((config['effects'][0]['multiplier'],)))
+    first = AbilityFactory.get_prototype("tester", "golpe", _config(1.0))
+    second = AbilityFactory.get_prototype("tester", "golpe", _config(2.0))
+    assert second is not first
+    assert second.ability_config['effects'][0]['multiplier'] == 2.0
+
+
+def test_versions_per_ability_are_bounded():
+    for i in range(MAX_PROTOTYPE_VERSIONS * 3):
+        AbilityFactory.get_prototype("tester", "golpe", _config(1.0 + i))
+    assert len(AbilityFactory._prototypes[("tester", "golpe")]) == MAX_PROTOTYPE_VERSIONS
+    
+    AbilityFactory.drop_owner("tester")
+    assert ("tester", "golpe") not in AbilityFactory._prototypes
+
+
+def test_chain_movement_without_grid_does_not_land_on_a_target():
+    from game.entities.enemy import Enemy
+    from game.systems.ability_factory import ChainMovementEffect
+    from game.systems.base_action import ActionContext
+    
+    caster, far, near = Enemy((0, 0)), Enemy((2, 0)), Enemy((1, 0))
+    effect = ChainMovementEffect({'type': 'chain_movement', 'multiplier': [1.0]})
+    # Sin grid inyectado la casilla tras el último objetivo (2, 0) la ocupa otro objetivo
+    assert effect.apply(ActionContext(caster, entities=[far, near]))
+    assert caster.position == (0, 0)
+    
+    assert effect.apply(ActionContext(caster, entities=[near]))
+    assert caster.position == (2, 0)
@@ -0,0 +1,17 @@
+"""run_batch: el resultado no depende del número de workers ni del reparto en bloques"""
+from game.sim.batch import run_batch, summarize
+from game.sim.battle_simulator import BattleSimulator
+
+
+def test_batch_matches_sequential_runs_for_any_worker_count():
+    simulator = BattleSimulator(seed=0)
+    expected = []
+    for seed in range(6):
+        simulator.reset(seed)
+        result = simulator.run()
+        expected.append((seed, result['winner'], result['turns'], result['damage_by_ability']))
+    
+    for workers, chunk_size in ((1, 6), (2, 2)):
+        records = sorted(run_batch(6, workers=workers, chunk_size=chunk_size), key=lambda record: record.seed)
+        assert [tuple(record) for record in records] == expected
+        assert summarize(records)['battles'] == 6
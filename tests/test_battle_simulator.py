@@ -0,0 +1,35 @@
+"""BattleSimulator: la política codiciosa elige lo mismo que filtrando legal_actions()"""
+from game.sim.battle_simulator import BattleSimulator, SimAction, greedy_policy
+
+
+def _reference_greedy(simulator):
+    """La política sobre la lista completa de acciones legales (la definición de referencia)"""
+    actions = simulator.legal_actions()
+    abilities = [a for a in actions if a.kind == SimAction.ABILITY]
+    if abilities:
+        return simulator.rng.choice(abilities)
+    moves = [a for a in actions if a.kind == SimAction.MOVE]
+    if moves:
+        def distance_to_enemy(action):
+            enemies = [e for e in simulator.entities if e.team != action.entity.team]
+            return min((simulator._distance(action.path[-1], e.position) for e in enemies), default=0)
+        best = min(distance_to_enemy(a) for a in moves)
+        return simulator.rng.choice([a for a in moves if distance_to_enemy(a) == best])
+    return actions[-1]
+
+
+def _describe(action):
+    return (action.kind, action.entity, action.ability_key, action.target, action.target_position,
+            tuple(action.path or ()), tuple(action.targets or ()), action.direction)
+
+
+def test_greedy_policy_matches_reference_choices():
+    for seed in range(3):
+        simulator = BattleSimulator(seed=seed)
+        while not simulator.is_over():
+            state = simulator.rng.getstate()
+            expected = _reference_greedy(simulator)
+            simulator.rng.setstate(state)
+            chosen = greedy_policy(simulator)
+            assert _describe(chosen) == _describe(expected)
+            simulator.apply_action(chosen)
@@ -0,0 +1,45 @@
+"""Snapshots de batalla: restaurar devuelve exactamente el estado capturado"""
+from game.sim.battle_simulator import BattleSimulator
+
+
+def _state(simulator):
+    """Huella comparable de la batalla: entidades vivas, vida, posición, cooldowns, efectos y turno"""
+    effects = simulator.effect_system.entity_effects
+    return (
+        tuple((entity.name, entity.position, entity.stats['current_hp'],
+               tuple(action.current_cooldown for action in entity.actions.values()),
+               tuple((effect.effect_id, effect.current_turn, effect.stacks)
+                     for effect in effects.get(entity, ())))
+              for entity in simulator.entities),
+        simulator.turn_system.current_turn,
+        simulator.turn_system.turn_count,
+        simulator.actions_applied,
+    )
+
+
+def test_restore_round_trip_after_playing_on():
+    simulator = BattleSimulator(seed=2)
+    for _ in range(6):
+        simulator.step()
+    snapshot = simulator.snapshot()
+    before = _state(simulator)
+    
+    simulator.run()
+    assert _state(simulator) != before
+    simulator.restore(snapshot)
+    assert _state(simulator) == before
+    
+    simulator.run()  # El mismo snapshot se puede restaurar otra vez
+    simulator.restore(snapshot)
+    assert _state(simulator) == before
+
+
+def test_restored_battle_replays_the_same_outcome():
+    simulator = BattleSimulator(seed=5)
+    for _ in range(4):
+        simulator.step()
+    snapshot = simulator.snapshot(include_rng=True)
+    
+    first = simulator.run()
+    simulator.restore(snapshot)
+    assert simulator.run() == first
@@ -0,0 +1,61 @@
+"""ConfigManager: las configs entregadas son de solo lectura en profundidad"""
+import copy
+import copyreg
+import pickle
+from types import MappingProxyType
+
+import pytest
+
+from game.core.config_manager import ConfigManager, freeze_config, thaw_config
+from game.systems.effect_system import GenericEffect
+
+
+def test_freeze_config_is_deep():
+    frozen = freeze_config({'stats': {'attack': 10}, 'chain': [1.0, {'x': [2]}]})
+    
+    with pytest.raises(TypeError):
+        frozen['stats']['attack'] = 99
+    assert frozen['chain'] == (1.0, freeze_config({'x': [2]}))
+    assert thaw_config(frozen) == {'stats': {'attack': 10}, 'chain': [1.0, {'x': [2]}]}
+
+
+def test_character_config_nested_values_are_read_only():
+    manager = ConfigManager.get_instance()
+    character_id = manager.get_character_ids()[0]
+    config = manager.get_character_config(character_id)
+    
+    with pytest.raises(TypeError):
+        config['stats']['attack'] = 0
+    ability_key = next(iter(config['abilities']))
+    with pytest.raises(TypeError):
+        config['abilities'][ability_key]['name'] = "otra"
+    assert manager.get_ability_config(character_id, ability_key) == config['abilities'][ability_key]
+    
+    attack = config['stats']['attack']
+    editable = thaw_config(config)
+    editable['stats']['attack'] = attack + 1
+    assert manager.get_character_config(character_id)['stats']['attack'] == attack
+    assert manager.bundle['characters'][character_id]['stats']['attack'] == attack
+
+
+def test_effect_configs_are_read_only_and_effects_pickle():
+    effects = ConfigManager.get_instance().get_all_effects()
+    effect_id, effect_config = next(iter(effects.items()))
+    with pytest.raises(TypeError):
+        effect_config['duration'] = 5
+    
+    effect = GenericEffect(effect_config, source=None)
+    clone = pickle.loads(pickle.dumps(effect))
+    assert clone.config == effect_config
+    assert clone.triggers.keys() == effect.triggers.keys()
+
+
+def test_frozen_configs_copy_and_pickle():
+    frozen = freeze_config({'stats': {'attack': 10}, 'chain': [1.0, {'x': [2]}]})
+    
+    for clone in (copy.deepcopy(frozen), pickle.loads(pickle.dumps(frozen))):
+        assert clone == frozen
+        with pytest.raises(TypeError):
+            clone['stats']['attack'] = 99
+    assert copy.deepcopy(frozen) is frozen  # Inmutable: la copia comparte la instancia
+    assert MappingProxyType not in copyreg.dispatch_table  # Sin registro global en pickle
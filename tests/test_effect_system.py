@@ -0,0 +1,52 @@
+"""EffectSystem: índices por trigger y por id, y retirada de los efectos vencidos"""
+from game.entities.enemy import Enemy
+from game.systems.effect_system import EffectSystem
+from game.systems.turn_system import TurnSystem
+
+
+def _effect(effect_id, duration, trigger):
+    return {'id': effect_id, 'name': effect_id, 'type': 'buff', 'duration': duration,
+            'actions': {trigger: [{'type': 'heal', 'value': 1}]}}
+
+
+def _system():
+    system = EffectSystem()
+    system.load_effects_config({
+        'regen': _effect('regen', 1, 'on_turn_start'),
+        'guard': _effect('guard', 1, 'on_turn_end'),
+        'aura': _effect('aura', 5, 'on_apply'),
+    })
+    return system
+
+
+def test_trigger_index_holds_only_effects_that_define_it():
+    entity = Enemy((0, 0))
+    system = _system()
+    for effect_id in ('regen', 'guard', 'aura'):
+        system.apply_effect(entity, effect_id, entity)
+    
+    assert [e.effect_id for e in system._by_trigger['on_turn_start'][entity]] == ['regen']
+    assert [e.effect_id for e in system._by_trigger['on_turn_end'][entity]] == ['guard']
+    assert system.has_effect(entity, 'aura')
+    
+    assert system.remove_effect(entity, 'regen')
+    assert not system.has_effect(entity, 'regen')
+    assert system._by_trigger['on_turn_start'][entity] == []
+
+
+def test_expired_effects_leave_once_in_application_order(monkeypatch):
+    entity = Enemy((0, 0))
+    system = _system()
+    for effect_id in ('guard', 'regen', 'aura'):
+        system.apply_effect(entity, effect_id, entity)
+    regen = system._by_id[(entity, 'regen')]
+    system._schedule_expiry(entity, regen)  # Entrada repetida en la rueda: se retira una sola vez
+    
+    removed = []
+    monkeypatch.setattr(type(regen), 'on_remove', lambda effect, target: removed.append(effect.effect_id))
+    TurnSystem().start_entity_turn(entity)
+    system.on_turn_start(entity)
+    system.update_effects([entity])
+    
+    assert removed == ['guard', 'regen']
+    assert [e.effect_id for e in system.entity_effects[entity]] == ['aura']
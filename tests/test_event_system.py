@@ -0,0 +1,117 @@
+"""EventSystem: suscripciones por clave y cola diferida"""
+import gc
+import weakref
+
+from game.core.event_system import EventIds, EventSystem
+
+
+class Key:
+    pass
+
+
+def test_keyed_subscription_fires_only_for_its_key():
+    bus = EventSystem(record_history=False)
+    mine, other = Key(), Key()
+    hits = []
+    bus.subscribe_keyed(EventIds.ENTITY_DAMAGED, 'attacker', mine, hits.append)
+    
+    bus.emit(EventIds.ENTITY_DAMAGED, {'attacker': other})
+    bus.emit(EventIds.ENTITY_DAMAGED, {'target': mine})
+    bus.emit(EventIds.ENTITY_DAMAGED, {'attacker': mine})
+    assert hits == [{'attacker': mine}]
+    assert bus.get_listener_count(EventIds.ENTITY_DAMAGED) == 1
+
+
+def test_subscribed_key_outlives_its_owner_until_unsubscribed():
+    # Mientras dure la suscripción su id no puede pasar a otro objeto
+    bus = EventSystem(record_history=False)
+    hits = []
+    key = Key()
+    ref = weakref.ref(key)
+    bus.subscribe_keyed(EventIds.ENTITY_DAMAGED, 'attacker', key, hits.append)
+    del key
+    gc.collect()
+    assert ref() is not None
+    
+    strangers = [Key() for _ in range(1000)]
+    for stranger in strangers:
+        bus.emit(EventIds.ENTITY_DAMAGED, {'attacker': stranger})
+    assert hits == []
+    
+    bus.unsubscribe_keyed(EventIds.ENTITY_DAMAGED, 'attacker', ref(), hits.append)
+    gc.collect()
+    assert ref() is None
+    assert bus.get_listener_count(EventIds.ENTITY_DAMAGED) == 0
+
+
+def test_keyed_listener_can_subscribe_a_new_field_during_emit():
+    bus = EventSystem(record_history=False)
+    key = Key()
+    hits = []
+    
+    def on_hit(data):
+        hits.append('target')
+    
+    def on_attack(data):
+        hits.append('attacker')
+        bus.subscribe_keyed(EventIds.ENTITY_DAMAGED, 'target', key, on_hit)
+    
+    bus.subscribe_keyed(EventIds.ENTITY_DAMAGED, 'attacker', key, on_attack)
+    bus.emit(EventIds.ENTITY_DAMAGED, {'attacker': key, 'target': key})
+    bus.emit(EventIds.ENTITY_DAMAGED, {'attacker': key, 'target': key})
+    assert hits == ['attacker', 'attacker', 'target']
+
+
+def test_queued_emits_wait_for_flush():
+    bus = EventSystem(record_history=False)
+    hits = []
+    bus.subscribe(EventIds.ENTITY_DAMAGED, hits.append)
+    bus.queued_mode = True
+    
+    bus.emit(EventIds.ENTITY_DAMAGED, {'damage': 1})
+    bus.emit(EventIds.ENTITY_DAMAGED, {'damage': 2})
+    assert hits == []
+    assert bus.get_pending_count() == 2
+    
+    assert bus.flush() == 2
+    assert hits == [{'damage': 1}, {'damage': 2}]
+    assert bus.get_pending_count() == 0
+    assert bus.stats['flushes'] == 1 and bus.stats['dispatched_deferred'] == 2
+
+
+def test_listener_emits_are_dispatched_as_the_next_generation():
+    bus = EventSystem(record_history=False)
+    order = []
+    
+    def on_damaged(data):
+        order.append(('damaged', data['damage']))
+        bus.emit(EventIds.ENTITY_HEALED, {'amount': data['damage']})
+    
+    bus.subscribe(EventIds.ENTITY_DAMAGED, on_damaged)
+    bus.subscribe(EventIds.ENTITY_HEALED, lambda data: order.append(('healed', data['amount'])))
+    bus.queued_mode = True
+    bus.emit(EventIds.ENTITY_DAMAGED, {'damage': 1})
+    bus.emit(EventIds.ENTITY_DAMAGED, {'damage': 2})
+    
+    assert bus.flush() == 4
+    assert order == [('damaged', 1), ('damaged', 2), ('healed', 1), ('healed', 2)]
+
+
+def test_cascade_beyond_max_depth_is_dropped_and_counted():
+    bus = EventSystem(record_history=False)
+    bus.max_cascade_depth = 3
+    hits = []
+    
+    def echo(data):
+        hits.append(data['depth'])
+        bus.emit(EventIds.ENTITY_DAMAGED, {'depth': data['depth'] + 1})
+    
+    bus.subscribe(EventIds.ENTITY_DAMAGED, echo)
+    bus.queued_mode = True
+    bus.emit(EventIds.ENTITY_DAMAGED, {'depth': 1})
+    
+    assert bus.flush() == 3
+    assert hits == [1, 2, 3]
+    assert bus.get_pending_count() == 0
+    assert bus.stats['cascades_capped'] == 1
+    assert bus.stats['dropped_events'] == 1
@@ -0,0 +1,52 @@
+"""Fórmulas: lista blanca del parser, división segura y damage_many igual al cálculo escalar"""
+import pytest
+
+from game.entities.enemy import Enemy
+from game.systems.effect_compiler import EffectCompileError
+from game.systems.formulas import compile_formula
+from game.systems.targeting import VECTORIZE_MIN_ENTITIES
+
+
+@pytest.mark.parametrize('expression, message', [
+    ("9 ** 9 ** 9", "operador no admitido (Pow)"),
+    ("src.attack / 0", "división por cero"),
+    ("src.attack <", "sintaxis inválida"),
+    ("src.attack if turn else 1", "construcción no admitida (IfExp)"),
+    ("'1' + 1", "constante no numérica '1'"),
+    ("hp * 2", "nombre desconocido 'hp'"),
+    ("src.stats.attack", "solo se leen stats de src o tgt"),
+    ("__import__('os')", "función no admitida"),
+    ("max(src.attack)", "max() recibe 2 argumento(s)"),
+])
+def test_rejected_constructs_name_the_formula(expression, message):
+    with pytest.raises(EffectCompileError) as error:
+        compile_formula(expression)
+    assert str(error.value).startswith(f"fórmula {expression!r}: ")
+    assert message in str(error.value)
+
+
+def test_division_by_a_zero_stat_is_zero():
+    src, tgt = {'attack': 12}, {'defense': 0}
+    assert compile_formula("src.attack / tgt.defense")(src, tgt) == 0
+    assert compile_formula("src.attack // tgt.defense")(src, tgt) == 0
+    assert compile_formula("src.attack % tgt.defense")(src, tgt) == 0
+    assert compile_formula("src.attack / tgt.defense")(src, {'defense': 8}) == 1.5
+
+
+@pytest.mark.parametrize('expression', [
+    "(src.attack - tgt.defense // 2) * multiplier",
+    "src.attack * multiplier / tgt.defense",
+    "src.attack // tgt.defense + src.attack % tgt.defense",
+    "max(src.attack - tgt.defense, 0) * -multiplier",
+])
+def test_damage_many_matches_scalar_damage(expression):
+    formula = compile_formula(expression)
+    caster = Enemy((0, 0), team="player")
+    targets = [Enemy((i % 10, i // 10)) for i in range(VECTORIZE_MIN_ENTITIES + 6)]
+    for i, target in enumerate(targets):
+        target.stats['defense'] = i % 7 - 2  # Incluye defensas 0 y negativas
+    multipliers = [0.5 + (i % 4) * 0.5 for i in range(len(targets))]
+    
+    expected = [formula.damage(caster.stats, target.stats, multiplier)
+                for target, multiplier in zip(targets, multipliers)]
+    assert formula.damage_many(caster.stats, targets, multipliers) == expected
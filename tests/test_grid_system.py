@@ -0,0 +1,36 @@
+"""GridSystem: índice de ocupación sincronizado con la posición de las entidades"""
+from game.entities.enemy import Enemy
+from game.systems.grid_system import GridSystem
+
+
+def test_occupancy_follows_moves_and_unregister():
+    grid = GridSystem()
+    goblin = Enemy((2, 3))
+    grid.register_entity(goblin)
+    version = grid.version
+    
+    assert grid.get_entity_at((2, 3)) is goblin
+    assert grid.is_occupied((2, 3), team=goblin.team)
+    assert not grid.is_occupied((2, 3), team=goblin.team, exclude=goblin)
+    
+    goblin.position = (4, 4)
+    assert grid.version > version
+    assert grid.get_entities_at((2, 3)) == []
+    assert grid.get_entity_at((4, 4), team=goblin.team) is goblin
+    assert list(grid.get_team_positions(goblin.team)) == [(4, 4)]
+    
+    grid.unregister_entity(goblin)
+    assert not grid.is_occupied((4, 4))
+    goblin.position = (0, 0)  # Ya no se sigue
+    assert not grid.get_occupied_positions()
+
+
+def test_registering_twice_keeps_one_entry():
+    grid = GridSystem()
+    goblin = Enemy((2, 3))
+    grid.register_entity(goblin)
+    grid.register_entity(goblin)
+    assert grid.get_entities_at((2, 3)) == [goblin]
+    
+    grid.unregister_entity(goblin)
+    assert not grid.is_occupied((2, 3))
@@ -0,0 +1,58 @@
+"""GameLogger: nivel por defecto, poda de logs compatible con la rotación y ganchos de proceso únicos"""
+import atexit
+import os
+
+from game.core import logger as logger_module
+from game.core.logger import GameLogger, INFO
+
+
+def test_cleanup_keeps_rotated_backups(tmp_path):
+    log_file = tmp_path / "game_log.txt"
+    managed = [log_file.name] + [f"game_log.txt.{index}" for index in range(1, 6)]
+    stale = ["game_log.txt.6", "game_log_2020.txt"]
+    for name in managed + stale + ["otro.txt"]:
+        (tmp_path / name).write_text("x")
+    
+    game_logger = GameLogger(log_to_file=False, backup_count=5, level=INFO)
+    game_logger.log_file = str(log_file)
+    game_logger._clear_old_logs()
+    
+    assert sorted(os.listdir(tmp_path)) == sorted(managed + ["otro.txt"])
+
+
+def test_rotation_then_cleanup_loses_no_backup(tmp_path):
+    game_logger = GameLogger(log_to_file=True, max_bytes=200, backup_count=5, level=INFO)
+    game_logger.log_file = str(tmp_path / "game_log.txt")
+    game_logger._log_dir_pending = False
+    for i in range(10):
+        game_logger.info("mensaje de relleno para rotar %d " + "x" * 200, i)
+        game_logger.flush()  # El escritor rota como mucho una vez por lote
+    game_logger.close()
+    
+    before = sorted(os.listdir(tmp_path))
+    assert before == ["game_log.txt"] + [f"game_log.txt.{index}" for index in range(1, 6)]
+    game_logger._clear_old_logs()
+    assert sorted(os.listdir(tmp_path)) == before
+
+
+def test_process_hooks_are_not_registered_per_instance(monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, 'register', lambda *args, **kwargs: registered.append(args))
+    monkeypatch.setattr(os, 'register_at_fork', lambda **kwargs: registered.append(kwargs), raising=False)
+    
+    game_logger = GameLogger(log_to_file=False, level=INFO)
+    
+    assert registered == []
+    assert game_logger in logger_module._LIVE_LOGGERS
+
+
+def test_default_level_is_info_and_debug_is_opt_in(monkeypatch):
+    monkeypatch.delenv("GAME_LOG_LEVEL", raising=False)
+    quiet = GameLogger(log_to_file=False)
+    assert quiet.level == INFO and not quiet.debug_enabled and quiet.info_enabled
+    quiet.close()
+    
+    monkeypatch.setenv("GAME_LOG_LEVEL", "DEBUG")
+    verbose = GameLogger(log_to_file=False)
+    assert verbose.debug_enabled
+    verbose.close()
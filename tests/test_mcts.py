@@ -0,0 +1,60 @@
+"""MCTSPlanner: partidas con semillas distintas y simulador intacto tras plan()"""
+from game.ai.mcts import MCTSPlanner
+from game.sim.battle_simulator import BattleSimulator
+
+
+def _enemy_turn_simulator(seed=0):
+    simulator = BattleSimulator(seed=seed)
+    while simulator.current_team != "enemy":
+        simulator.step()
+    return simulator
+
+
+def _record_rollouts(planner):
+    """Envuelve _rollout: estado del RNG del simulador al empezar cada partida y su recompensa"""
+    records = []
+    rollout = planner._rollout
+    
+    def recording_rollout(ended_turn):
+        state = planner.simulator.rng.getstate()
+        reward = rollout(ended_turn)
+        records.append((state, reward))
+        return reward
+    
+    planner._rollout = recording_rollout
+    return records
+
+
+def test_rollouts_use_different_rng_states():
+    planner = MCTSPlanner(_enemy_turn_simulator(), "enemy", budget_ms=10 ** 6, seed=1)
+    records = _record_rollouts(planner)
+    planner.plan(max_iterations=30)
+    
+    assert len(records) == 30
+    assert len({state for state, _ in records}) == 30
+
+
+def test_rollouts_of_same_node_can_differ():
+    # Batalla 1: la política codiciosa de los rollouts tiene empates que se deciden al azar
+    planner = MCTSPlanner(_enemy_turn_simulator(seed=1), "enemy", budget_ms=10 ** 6, seed=1)
+    records = _record_rollouts(planner)
+    # Solo el fin de turno como candidato: todas las partidas salen del mismo nodo
+    planner.candidate_actions = lambda: [action for action in planner.simulator.legal_actions()
+                                         if action.kind == action.END_TURN]
+    planner.plan(max_iterations=40)
+    
+    assert len({reward for _, reward in records}) > 1
+
+
+def test_plan_leaves_simulator_untouched():
+    simulator = _enemy_turn_simulator()
+    before = simulator.snapshot(include_rng=True)
+    positions = [entity.position for entity in simulator.entities]
+    hp = [entity.stats['current_hp'] for entity in simulator.entities]
+    
+    MCTSPlanner(simulator, "enemy", budget_ms=10 ** 6, seed=2).plan(max_iterations=20)
+    
+    assert simulator.rng.getstate() == before.extra[3]
+    assert [entity.position for entity in simulator.entities] == positions
+    assert [entity.stats['current_hp'] for entity in simulator.entities] == hp
+    assert simulator.current_team == "enemy"
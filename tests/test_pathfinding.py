@@ -0,0 +1,36 @@
+"""Pathfinder: área BFS y rutas A* cacheadas por versión del tablero"""
+from game.entities.enemy import Enemy
+from game.systems.grid_system import GridSystem
+from game.systems.pathfinding import Pathfinder
+
+
+def _board(*positions):
+    grid = GridSystem(width=6, height=5)
+    entities = [Enemy(position) for position in positions]
+    grid.register_entities(entities)
+    return grid, entities
+
+
+def test_reachable_area_is_cached_until_the_board_changes():
+    grid, (walker, ally) = _board((0, 0), (1, 0))
+    pathfinder = Pathfinder(grid)
+    
+    area = pathfinder.reachable(walker, walker.position, 2)
+    assert (1, 0) not in area  # Los aliados bloquean el paso
+    assert area[(0, 2)] == 2
+    assert pathfinder.reachable(walker, walker.position, 2) is area
+    assert pathfinder.stats['reachable_hits'] == 1
+    
+    ally.position = (5, 4)  # Mover una entidad cambia la versión del grid
+    assert (1, 0) in pathfinder.reachable(walker, walker.position, 2)
+    assert pathfinder.stats['reachable_misses'] == 2
+
+
+def test_find_path_goes_around_allies_and_respects_steps():
+    grid, (walker, _, _) = _board((0, 1), (1, 1), (1, 0))
+    pathfinder = Pathfinder(grid)
+    
+    path = pathfinder.find_path(walker, (0, 1), (2, 1), 4)
+    assert path == [(0, 1), (0, 2), (1, 2), (2, 2), (2, 1)]
+    assert pathfinder.find_path(walker, (0, 1), (2, 1), 4) is path
+    assert pathfinder.find_path(walker, (0, 1), (2, 1), 3) is None
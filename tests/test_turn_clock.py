@@ -0,0 +1,88 @@
+"""Reloj de turnos: cooldowns y expiración de efectos por tick, avanzados por TurnSystem"""
+from game.entities.enemy import Enemy
+from game.systems.ability_factory import AbilityFactory
+from game.systems.effect_system import EffectSystem
+from game.systems.turn_system import TurnSystem
+
+
+_GOLPE = {'name': "Golpe", 'cost_ph': 0, 'cooldown': 2, 'effects': [{'type': 'damage', 'multiplier': 1.0}]}
+
+
+def _effects(duration):
+    heal = [{'type': 'heal', 'value': 1}]
+    return {'regen': {'id': 'regen', 'name': "Regeneración", 'type': 'buff',
+                      'duration': duration, 'actions': {'on_turn_start': heal}}}
+
+
+def test_cooldown_counts_entity_turns_once():
+    entity = Enemy((0, 0))
+    turn_system = TurnSystem()
+    state = AbilityFactory.create_state("tester", "golpe", _GOLPE, entity.turn_clock)
+    
+    state.start_cooldown()
+    assert state.current_cooldown == 2
+    state.update_cooldown()  # Llamada heredada: con el reloj de la entidad no cuenta
+    assert state.current_cooldown == 2
+    turn_system.start_entity_turn(entity)
+    assert state.current_cooldown == 1
+    turn_system.start_entity_turn(entity)
+    assert state.current_cooldown == 0
+
+
+def test_cooldown_without_entity_uses_its_own_clock():
+    state = AbilityFactory.create_state("tester", "golpe", _GOLPE)
+    state.start_cooldown()
+    state.update_cooldown()
+    assert state.current_cooldown == 1
+
+
+def test_effect_expires_after_its_duration():
+    entity = Enemy((0, 0))
+    turn_system = TurnSystem()
+    system = EffectSystem()
+    system.load_effects_config(_effects(2))
+    system.apply_effect(entity, 'regen', entity)
+    
+    for _ in range(2):
+        assert system.has_effect(entity, 'regen')
+        turn_system.start_entity_turn(entity)
+        system.on_turn_start(entity)
+        system.update_effects([entity])
+    assert not system.has_effect(entity, 'regen')
+    assert system.entity_effects[entity] == []
+
+
+def test_skipped_turn_starts_still_expire():
+    # El reloj avanza sin on_turn_start (p. ej. turno saltado): la rueda no pierde cubetas
+    entity = Enemy((0, 0))
+    turn_system = TurnSystem()
+    system = EffectSystem()
+    system.load_effects_config(_effects(2))
+    system.apply_effect(entity, 'regen', entity)
+    
+    for _ in range(3):
+        turn_system.start_entity_turn(entity)
+    system.on_turn_start(entity)
+    system.update_effects([entity])
+    assert not system.has_effect(entity, 'regen')
+
+
+def test_restack_postpones_expiry():
+    entity = Enemy((0, 0))
+    turn_system = TurnSystem()
+    system = EffectSystem()
+    system.load_effects_config(_effects(2))
+    system.apply_effect(entity, 'regen', entity)
+    
+    turn_system.start_entity_turn(entity)
+    system.on_turn_start(entity)
+    system.apply_effect(entity, 'regen', entity)  # Vuelve al turno 0: vence en el tick 3
+    turn_system.start_entity_turn(entity)
+    system.on_turn_start(entity)
+    system.update_effects([entity])
+    assert system.has_effect(entity, 'regen')
+    
+    turn_system.start_entity_turn(entity)
+    system.on_turn_start(entity)
+    system.update_effects([entity])
+    assert not system.has_effect(entity, 'regen')